@@ -1,4 +1,6 @@
-from .config import AnalyzerConfig, AnalyzeAlgorithm
+from .config import AnalyzerConfig, AnalyzeAlgorithm, PageRankSolver
 from .analyzer import Analyzer
+from .incremental import IncrementalAnalyzer
+from .result import RankResult
 
-__all__ = ['AnalyzerConfig', 'AnalyzeAlgorithm', 'Analyzer']
\ No newline at end of file
+__all__ = ['AnalyzerConfig', 'AnalyzeAlgorithm', 'PageRankSolver', 'Analyzer', 'IncrementalAnalyzer', 'RankResult']
\ No newline at end of file
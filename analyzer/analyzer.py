@@ -1,9 +1,12 @@
 import dataclasses
-from typing import List, Tuple
+from typing import List, Optional
+
+import numpy as np
 
 from crawler import GraphManager
-from .config import AnalyzerConfig, AnalyzeAlgorithm
+from .config import AnalyzerConfig, AnalyzeAlgorithm, PageRankSolver
 from .pagerank import PageRank
+from .result import RankResult
 
 class Analyzer:
     def __init__(self,
@@ -11,34 +14,58 @@ class Analyzer:
                  config: AnalyzerConfig) -> None:
         self.__config = dataclasses.replace(config)
         self.__graph_manager = graph_manager
+        self.residuals: List[float] = []
+        '''L1 diff of weights in each iteration of the last `main` call.'''
+        self.__result: Optional[RankResult] = None
 
-    def main(self) -> List[Tuple[str, float]]:
+    def main(self) -> RankResult:
         """
         Main method to start the analysis process.
 
         Returns:
-            List[Tuple[str, float]]: List of tuples containing the URL and the
-            corresponding weight.
+            RankResult: Url ids and ranks of all urls, ranks are weights divided by the
+            largest one. Iterating it gives `(url, rank)` tuples.
         """
+        if self.__config.solver != PageRankSolver.POWER and self.__config.algorithm not in (
+                AnalyzeAlgorithm.PAGERANK_SPARSE, AnalyzeAlgorithm.PAGERANK_CUPY):
+            raise NotImplementedError(f'Solver {self.__config.solver} not implemented for {self.__config.algorithm}')
+        if self.__config.condense and (self.__config.solver != PageRankSolver.POWER or self.__config.algorithm not in (
+                AnalyzeAlgorithm.PAGERANK_SPARSE, AnalyzeAlgorithm.PAGERANK_CUPY)):
+            raise NotImplementedError(f'Condense not implemented for {self.__config.algorithm} with {self.__config.solver}')
+
         pr = PageRank(self.__graph_manager,
                       self.__config.damping,
-                      self.__config.convergence)
+                      self.__config.convergence,
+                      self.__config.solver,
+                      self.__config.max_iterations,
+                      self.__config.condense)
+        weights = self.__run(pr)
+        self.residuals = pr.residuals
+        self.__result = RankResult.from_weights(self.__graph_manager, weights)
+        return self.__result
+
+    def top_k(self, k: int) -> RankResult:
+        '''`k` urls of the highest ranks from the last `main` call, which is called first if not yet.
+        See `RankResult.top_k`.'''
+        return (self.__result if self.__result is not None else self.main()).top_k(k)
+
+    def quantize_priorities(self, levels: int = 11) -> RankResult:
+        '''Ranks of the last `main` call rounded to `levels` sitemap priorities, which is called first if not yet.
+        See `RankResult.quantize_priorities`.'''
+        return (self.__result if self.__result is not None else self.main()).quantize_priorities(levels)
 
+    def __run(self, pr: PageRank) -> np.ndarray:
         if self.__config.algorithm == AnalyzeAlgorithm.PAGERANK_PY:
-            url_and_weight = pr.pagerank_py()
-            weight_max = url_and_weight[0][1]
-            return [(url, weight / weight_max) for url, weight in url_and_weight]
+            return pr.pagerank_py()
         elif self.__config.algorithm == AnalyzeAlgorithm.PAGERANK_PYMAT:
-            url_and_weight = pr.pagerank_pymat()
-            weight_max = url_and_weight[0][1]
-            return [(url, weight / weight_max) for url, weight in url_and_weight]
+            return pr.pagerank_pymat()
         elif self.__config.algorithm == AnalyzeAlgorithm.PAGERANK_NP:
-            url_and_weight = pr.pagerank_np()
-            weight_max = float(url_and_weight[0][1])
-            return [(url, float(weight) / weight_max) for url, weight in url_and_weight]
+            return pr.pagerank_np()
         elif self.__config.algorithm == AnalyzeAlgorithm.PAGERANK_CUPY:
-            url_and_weight = pr.pagerank_cupy()
-            weight_max = float(url_and_weight[0][1])
-            return [(url, float(weight) / weight_max) for url, weight in url_and_weight]
+            return pr.pagerank_cupy()
+        elif self.__config.algorithm == AnalyzeAlgorithm.PAGERANK_SPARSE:
+            return pr.pagerank_sparse()
+        elif self.__config.algorithm == AnalyzeAlgorithm.PAGERANK_PARALLEL:
+            return pr.pagerank_parallel(self.__config.n_workers)
         else:
             raise NotImplementedError(f'Algorithm {self.__config.algorithm} not implemented')
\ No newline at end of file
@@ -0,0 +1,25 @@
+import importlib
+from functools import lru_cache
+from types import ModuleType
+
+@lru_cache(maxsize=None)
+def gpu_available() -> bool:
+    '''Check if CuPy is installed and sees at least one CUDA device.
+    CuPy is imported on first call only, it takes seconds to load and is absent on CPU-only nodes.'''
+    try:
+        cupy = importlib.import_module('cupy')
+        return cupy.cuda.runtime.getDeviceCount() > 0
+    except Exception:
+        # ImportError without CuPy, CUDARuntimeError without driver or device.
+        return False
+
+def get_array_module(gpu: bool = True) -> ModuleType:
+    '''**return** `cupy` if `gpu` and a CUDA device is available, `numpy` otherwise.
+    Both share the array API used by PageRank, so callers write `xp.bincount(...)` once for both.'''
+    if gpu and gpu_available():
+        return importlib.import_module('cupy')
+    return importlib.import_module('numpy')
+
+def to_numpy(array):
+    '''Copy device array to host, host arrays are returned as is.'''
+    return array.get() if hasattr(array, 'get') else array
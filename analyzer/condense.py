@@ -0,0 +1,73 @@
+import numpy as np
+
+from typing import List, Optional, Tuple
+
+from .backend import to_numpy
+
+def condensed_pagerank(xp,
+                       sources: np.ndarray,
+                       targets: np.ndarray,
+                       numNodes: int,
+                       damping: float,
+                       convergence: float,
+                       max_iterations: Optional[int] = None) -> Tuple[np.ndarray, List[float]]:
+    '''Power iteration on pages with outgoing links only, same iterates as on the whole graph.
+
+    Pages without outgoing links, mostly non-html resources, never pass weight to a particular page:
+    their weight only returns through the uniform dangling term. So only their total weight is carried
+    as a scalar, and each of them is assigned `damping * weight linked to it + uniform term` at the end.
+    Vectors hold html pages only and links into resources are read once.
+
+    **param** `xp`: array module, `numpy` or `cupy`.
+    **return** (weights on host, L1 diff of each iteration, bounded from above for pages without outgoing links).'''
+    max_iterations = max_iterations or float('inf')
+    residule_factor = (1-damping) / numNodes
+    sources, targets = xp.asarray(sources), xp.asarray(targets)
+    out_degrees = xp.bincount(sources, minlength=numNodes)
+    is_inner = out_degrees > 0
+    inner_ids = xp.nonzero(is_inner)[0]
+    n_inner, n_sinks = len(inner_ids), numNodes - len(inner_ids)
+    index = xp.full(numNodes, -1, dtype=xp.int32)
+    index[inner_ids] = xp.arange(n_inner, dtype=xp.int32)
+    inv_out_degrees = 1.0 / out_degrees[inner_ids]
+    del out_degrees
+
+    to_inner = is_inner[targets]
+    inner_sources, inner_targets = index[sources[to_inner]], index[targets[to_inner]]
+    to_inner = ~to_inner
+    sink_sources, sink_targets = index[sources[to_inner]], targets[to_inner]
+    del sources, targets, to_inner
+    # Share of weight of each inner page that flows into pages without outgoing links.
+    sink_share = xp.bincount(sink_sources, minlength=n_inner) * inv_out_degrees
+
+    weights = xp.full(n_inner, 1 / numNodes, dtype=xp.float64)
+    no_outgoing_weight = n_sinks / numNodes ** 2
+    residuals: List[float] = []
+    # Diff of pages without outgoing links is bounded by `damping * inflow of |diff| + n_sinks * |diff of uniform term|`,
+    # their first diff is computed exactly.
+    sink_weights = _sink_weights(xp, weights, inv_out_degrees, sink_sources, sink_targets, numNodes, damping, no_outgoing_weight)
+    sink_diff = float(xp.abs(sink_weights[~is_inner] - 1 / numNodes).sum())
+    del sink_weights
+    while len(residuals) < max_iterations:
+        rev_weights_sum = xp.bincount(inner_targets, weights=(weights * inv_out_degrees)[inner_sources], minlength=n_inner)
+        weights_new = damping * (rev_weights_sum + no_outgoing_weight) + residule_factor
+        sink_weight_new = damping * (float(weights @ sink_share) + n_sinks * no_outgoing_weight) + n_sinks * residule_factor
+        no_outgoing_weight_new = sink_weight_new / numNodes
+
+        delta = xp.abs(weights_new - weights)
+        residuals.append(float(delta.sum()) + sink_diff)
+        if residuals[-1] < convergence or len(residuals) >= max_iterations:
+            break
+        sink_diff = damping * (float(delta @ sink_share) + n_sinks * abs(no_outgoing_weight_new - no_outgoing_weight))
+        weights, no_outgoing_weight = weights_new, no_outgoing_weight_new
+
+    # Like the last step on the whole graph, pages without outgoing links are computed from the previous weights.
+    result = _sink_weights(xp, weights, inv_out_degrees, sink_sources, sink_targets, numNodes, damping, no_outgoing_weight)
+    result[inner_ids] = weights_new
+    return to_numpy(result), residuals
+
+def _sink_weights(xp, weights, inv_out_degrees, sink_sources, sink_targets, numNodes: int,
+                  damping: float, no_outgoing_weight: float):
+    '''Weights of all pages as if they have no outgoing links, only pages without outgoing links are correct.'''
+    rev_weights_sum = xp.bincount(sink_targets, weights=(weights * inv_out_degrees)[sink_sources], minlength=numNodes)
+    return damping * (rev_weights_sum + no_outgoing_weight) + (1 - damping) / numNodes
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 from enum import Enum
 
 class AnalyzeAlgorithm(Enum):
@@ -12,7 +13,26 @@ class AnalyzeAlgorithm(Enum):
     '''PageRank algorithm in numpy. Serial Implementation.'''
 
     PAGERANK_CUPY = 'pagerank_cupy'
-    '''PageRank algorithm in cupy. CUDA Implementation.'''
+    '''PageRank algorithm in cupy. CUDA Implementation, fall back to numpy without GPU.'''
+
+    PAGERANK_SPARSE = 'pagerank_sparse'
+    '''PageRank algorithm in numpy. Serial Implementation in sparse matrix-vector product.'''
+
+    PAGERANK_PARALLEL = 'pagerank_parallel'
+    '''PageRank algorithm in numpy. Multi-process Implementation on shared memory.'''
+
+class PageRankSolver(Enum):
+    POWER = 'power'
+    '''Jacobi power iteration, every page is updated from weights of the previous iteration.'''
+
+    GAUSS_SEIDEL = 'gauss_seidel'
+    '''Block Gauss-Seidel sweeps, pages read weights already updated in the same sweep.'''
+
+    EXTRAPOLATION = 'extrapolation'
+    '''Power iteration with periodic quadratic extrapolation.'''
+
+    ADAPTIVE = 'adaptive'
+    '''Power iteration that stops updating pages whose weight has converged. Approximate.'''
 
 @dataclass
 class AnalyzerConfig:
@@ -22,4 +42,20 @@ class AnalyzerConfig:
     convergence: float = 1e-7
     '''Convergence threshold for pagerank algorithm.'''
 
-    algorithm: AnalyzeAlgorithm = AnalyzeAlgorithm.PAGERANK_PY
\ No newline at end of file
+    algorithm: AnalyzeAlgorithm = AnalyzeAlgorithm.PAGERANK_PY
+    '''PageRank algorithm to use.'''
+
+    n_workers: Optional[int] = None
+    '''Number of worker processes for `AnalyzeAlgorithm.PAGERANK_PARALLEL`, `None` for number of CPUs.'''
+
+    solver: PageRankSolver = PageRankSolver.POWER
+    '''Iteration strategy of `AnalyzeAlgorithm.PAGERANK_SPARSE` and `AnalyzeAlgorithm.PAGERANK_CUPY`,
+    other algorithms support `PageRankSolver.POWER` only.'''
+
+    max_iterations: Optional[int] = None
+    '''Stop after this many iterations even if not converged, unlimited if `None`.'''
+
+    condense: bool = False
+    '''Iterate on pages with outgoing links only, pages without, mostly non-html resources, are computed afterwards.
+    Same result with less memory and time. `AnalyzeAlgorithm.PAGERANK_SPARSE` and `AnalyzeAlgorithm.PAGERANK_CUPY`
+    with `PageRankSolver.POWER` only.'''
@@ -0,0 +1,86 @@
+import dataclasses
+import threading
+from itertools import chain
+
+import numpy as np
+
+from typing import Callable
+
+from crawler import GraphManager
+from .config import AnalyzerConfig
+from .result import RankResult
+from .solvers import sparse_pagerank
+
+class IncrementalAnalyzer:
+    '''PageRank of a graph that is still growing.
+
+    Each `update` consumes links added since the previous one from `GraphManager.pipeline_get_update`,
+    and warm-starts power iteration from the previous weights, so it converges in a few iterations
+    when the graph changed little. `AnalyzerConfig.algorithm` is ignored, the sparse NumPy version is used
+    with `AnalyzerConfig.solver`.'''
+
+    def __init__(self,
+                 graph_manager: GraphManager,
+                 config: AnalyzerConfig,
+                 consumer: str = 'incremental_analyzer',
+                 provisional_convergence: float = 1e-4) -> None:
+        self.__config = dataclasses.replace(config)
+        self.__provisional_convergence = max(provisional_convergence, config.convergence)
+        '''Looser convergence threshold of provisional weights published during the crawl.'''
+        self.__graph_manager = graph_manager
+        self.__consumer = consumer
+        '''Pipeline consumer name, other consumers of the same graph are not affected.'''
+
+        self.__sources = np.zeros(0, dtype=np.int32)
+        self.__targets = np.zeros(0, dtype=np.int32)
+        self.__weights = np.zeros(0, dtype=np.float64)
+        self.__weights_convergence = float('inf')
+        '''Convergence threshold `self.__weights` was computed with.'''
+        self.n_iterations = 0
+        '''Total power iterations of all updates.'''
+
+    def update(self, provisional: bool = False) -> RankResult:
+        '''Add links since last update and recompute weights.
+        If `provisional`, iterate until `provisional_convergence` only, the next update continues from there.
+
+        Returns:
+            RankResult: Same as `Analyzer.main`, ranks of all urls known so far.
+        '''
+        update = self.__graph_manager.pipeline_get_update(self.__consumer)
+        n_new_links = len(update.new_links)
+        if n_new_links:
+            links = np.fromiter(chain.from_iterable(update.new_links), dtype=np.int32, count=2 * n_new_links)
+            links = links.reshape(n_new_links, 2)
+            self.__sources = np.concatenate((self.__sources, links[:, 0]))
+            self.__targets = np.concatenate((self.__targets, links[:, 1]))
+
+        numNodes = update.n_urls
+        if numNodes == 0:
+            return RankResult.from_weights(self.__graph_manager, self.__weights)
+        convergence = self.__provisional_convergence if provisional else self.__config.convergence
+        if n_new_links or numNodes != len(self.__weights) or convergence < self.__weights_convergence:
+            # New nodes start at uniform weight, known nodes keep their share of the remaining weight.
+            n_known = len(self.__weights)
+            weights = np.full(numNodes, 1 / numNodes, dtype=np.float64)
+            weights[:n_known] = self.__weights * (n_known / numNodes)
+            self.__weights, residuals = sparse_pagerank(np, self.__sources, self.__targets, numNodes,
+                                                        self.__config.damping, convergence, weights,
+                                                        self.__config.solver, self.__config.max_iterations)
+            self.__weights_convergence = convergence
+            self.n_iterations += len(residuals)
+
+        return RankResult.from_weights(self.__graph_manager, self.__weights)
+
+    def follow(self,
+               finished: threading.Event,
+               callback: Callable[[RankResult], None],
+               interval: float = 10.0) -> RankResult:
+        '''Call provisional `update` every `interval` seconds and pass weights to `callback`,
+        until `finished` is set, e.g. by the thread running `Crawler.main`.
+
+        Returns:
+            RankResult: Final ranks after the crawl finished.
+        '''
+        while not finished.wait(interval):
+            callback(self.update(provisional=True))
+        return self.update()
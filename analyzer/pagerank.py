@@ -1,24 +1,40 @@
-from typing import List, Tuple
+import os
+from typing import List, Optional
 import numpy as np
-import cupy as cp
 
 from crawler import GraphManager
+from .backend import get_array_module
+from .condense import condensed_pagerank
+from .config import PageRankSolver
+from .shared_pagerank import shared_pagerank
+from .solvers import sparse_pagerank
 
 class PageRank:
+    '''PageRank algorithms, each returns weights of urls in url id order.'''
+
     def __init__(self,
                  graphmanager: GraphManager,
                  damping: float,
-                 convergence: float) -> None:
+                 convergence: float,
+                 solver: PageRankSolver = PageRankSolver.POWER,
+                 max_iterations: Optional[int] = None,
+                 condense: bool = False) -> None:
         self.__graphmanager = graphmanager
         self.__damping = damping
         self.__covergence = convergence
-
-    def pagerank_py(self) -> List[Tuple[str, float]]:
+        self.__solver = solver
+        self.__max_iterations = max_iterations or float('inf')
+        self.__condense = condense
+        self.residuals: List[float] = []
+        '''L1 diff of weights in each iteration of the last run.'''
+
+    def pagerank_py(self) -> np.ndarray:
+        self.residuals = []
         numNodes = self.__graphmanager.get_url_count()
         weights = [1/numNodes for _ in range(numNodes)]
         weights_new = [0 for _ in range(numNodes)]
         
-        while True:
+        while len(self.residuals) < self.__max_iterations:
             no_outgoing_weight = 0.0
 
             for i in range(numNodes):
@@ -31,13 +47,15 @@ class PageRank:
                 weights_new[i] += no_outgoing_weight
             
             global_diff = sum([abs(weights_new[i] - weights[i]) for i in range(numNodes)])
+            self.residuals.append(global_diff)
             weights = weights_new.copy()
             if global_diff < self.__covergence:
                 break
         
-        return [(self.__graphmanager.get_url_by_id(i), weights[i]) for i in range(numNodes)]
+        return np.array(weights, dtype=np.float64)
     
-    def pagerank_pymat(self) -> List[Tuple[str, float]]:
+    def pagerank_pymat(self) -> np.ndarray:
+        self.residuals = []
         numNodes = self.__graphmanager.get_url_count()
         weights = [[1/numNodes for _ in range(numNodes)], None]
         residule_factor = (1-self.__damping) / numNodes
@@ -55,7 +73,7 @@ class PageRank:
         rev_weights = [0 for _ in range(numNodes)]
 
         step = 0
-        while True:
+        while len(self.residuals) < self.__max_iterations:
             curStep = step % 2
             nextStep = (step + 1) % 2
 
@@ -69,13 +87,15 @@ class PageRank:
             weights[nextStep] = list(map(lambda x: self.__damping * x + residule_factor, weights[nextStep]))
 
             global_diff = sum([abs(weights[nextStep][i] - weights[curStep][i]) for i in range(numNodes)])
+            self.residuals.append(global_diff)
             if global_diff < self.__covergence:
                 break
             step += 1
 
-        return [(self.__graphmanager.get_url_by_id(i), weights[curStep][i]) for i in range(numNodes)]
+        return weights[curStep]
     
-    def pagerank_np(self) -> List[Tuple[str, float]]:
+    def pagerank_np(self) -> np.ndarray:
+        self.residuals = []
         numNodes = self.__graphmanager.get_url_count()
         weights = [np.zeros(numNodes, dtype=np.float32) + (1 / numNodes), None]
         residule_factor = (1-self.__damping) / numNodes
@@ -93,7 +113,7 @@ class PageRank:
         rev_weights = np.zeros(numNodes, dtype=np.float32)
 
         step = 0
-        while True:
+        while len(self.residuals) < self.__max_iterations:
             curStep = step % 2
             nextStep = (step + 1) % 2
 
@@ -106,45 +126,45 @@ class PageRank:
             ) + residule_factor
             
             global_diff = np.sum(np.abs(np.subtract(weights[nextStep], weights[curStep])))
+            self.residuals.append(float(global_diff))
             if global_diff < self.__covergence:
                 break
             step += 1
 
-        return [(self.__graphmanager.get_url_by_id(i), weights[curStep][i]) for i in range(numNodes)]
+        return weights[curStep]
     
-    def pagerank_cupy(self) -> List[Tuple[str, float]]:
-        numNodes = self.__graphmanager.get_url_count()
-        weights = [cp.zeros(numNodes, dtype=cp.float32) + (1 / numNodes), None]
-        residule_factor = (1-self.__damping) / numNodes
-
-        out_degrees = np.array([len(self.__graphmanager.get_links_by_id(i)) for i in range(numNodes)], dtype=np.uint32)
-        no_outgoing_weight_row = np.array([int(out_degree == 0) for out_degree in out_degrees])
-        no_outgoing_weight_array = no_outgoing_weight_row.astype(np.float32) / numNodes
+    def pagerank_cupy(self) -> np.ndarray:
+        '''Sparse PageRank on GPU, links and weights stay on device and only the diff is copied back per iteration.
+        Fall back to NumPy if CuPy or a CUDA device is not available.'''
+        return self.__pagerank_sparse(get_array_module(gpu=True))
 
-        non_zero_out_degrees = out_degrees.copy()
-        non_zero_out_degrees[out_degrees == 0] = 1
-
-        rev_links = [self.__graphmanager.get_rev_links_by_id(i) for i in range(numNodes)]
+    def pagerank_sparse(self) -> np.ndarray:
+        return self.__pagerank_sparse(np)
 
-        rev_weights_sum = np.zeros(numNodes, dtype=np.float32)
-        rev_weights = np.zeros(numNodes, dtype=np.float32)
-
-        step = 0
-        while True:
-            curStep = step % 2
-            nextStep = (step + 1) % 2
-
-            rev_weights = weights[curStep].get() / non_zero_out_degrees
-            for i, rev_link in enumerate(rev_links):
-                rev_weights_sum[i] = sum(rev_weights[j] for j in rev_link)
-
-            weights[nextStep] = self.__damping * (
-                cp.array(rev_weights_sum) + cp.array(no_outgoing_weight_array) @ cp.array(weights[curStep])
-            ) + residule_factor
-            
-            global_diff = cp.sum(cp.abs(cp.subtract(weights[nextStep], weights[curStep])))
-            if global_diff < self.__covergence:
-                break
-            step += 1
-        
-        return [(self.__graphmanager.get_url_by_id(i), weights[curStep][i]) for i in range(numNodes)]
+    def __pagerank_sparse(self, xp) -> np.ndarray:
+        '''**param** `xp`: array module, `numpy` or `cupy`.'''
+        numNodes = self.__graphmanager.get_url_count()
+        sources, targets = self.__graphmanager.get_link_arrays()
+        if self.__condense:
+            weights, self.residuals = condensed_pagerank(xp, sources, targets, numNodes, self.__damping, self.__covergence,
+                                                         max_iterations=self.__max_iterations)
+        else:
+            weights, self.residuals = sparse_pagerank(xp, sources, targets, numNodes, self.__damping, self.__covergence,
+                                                      solver=self.__solver, max_iterations=self.__max_iterations)
+        return weights
+
+    def pagerank_parallel(self, n_workers: Optional[int] = None) -> np.ndarray:
+        numNodes = self.__graphmanager.get_url_count()
+        sources, targets = self.__graphmanager.get_link_arrays()
+        out_degrees = np.bincount(sources, minlength=numNodes)
+
+        # Rows of the reversed link matrix are urls, sources of a frozen graph are already sorted by target.
+        if len(targets) and np.any(targets[1:] < targets[:-1]):
+            order = np.argsort(targets, kind='stable')
+            sources, targets = sources[order], targets[order]
+        indptr = np.zeros(numNodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=numNodes), out=indptr[1:])
+
+        weights, self.residuals = shared_pagerank(indptr, sources, out_degrees, self.__damping, self.__covergence,
+                                                  n_workers or os.cpu_count() or 1, self.__max_iterations)
+        return weights
@@ -0,0 +1,96 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from typing import Iterator, List, Optional, Tuple, Union
+
+from crawler import GraphManager
+
+class RankResult(Sequence):
+    '''Result of `Analyzer`, url ids and their ranks in two arrays.
+
+    Urls are looked up from the graph only when iterated, so consumers can stream `(url, rank)` pairs
+    without a tuple per url being kept in memory. It is also a read-only sequence of `(url, rank)`,
+    the same as the list returned before.'''
+
+    def __init__(self, graph_manager: GraphManager, ids: np.ndarray, ranks: np.ndarray, levels: Optional[int] = None) -> None:
+        assert len(ids) == len(ranks)
+        self.__graph_manager = graph_manager
+        self.__ids = np.asarray(ids, dtype=np.int32)
+        self.__ranks = np.asarray(ranks, dtype=np.float32)
+        self.__ids.flags.writeable = False
+        self.__ranks.flags.writeable = False
+        self.__levels = levels
+        '''Number of priority levels if ranks are quantized, see `quantize_priorities`.'''
+
+    @classmethod
+    def from_weights(cls, graph_manager: GraphManager, weights: np.ndarray) -> 'RankResult':
+        '''Ranks of all urls, weights in url id order divided by the largest one.'''
+        weights = np.asarray(weights, dtype=np.float64)
+        ranks = weights / weights.max() if len(weights) else weights
+        return cls(graph_manager, np.arange(len(weights), dtype=np.int32), ranks)
+
+    @property
+    def ids(self) -> np.ndarray:
+        '''Url ids, int32, read-only.'''
+        return self.__ids
+
+    @property
+    def ranks(self) -> np.ndarray:
+        '''Ranks in `[0, 1]`, float32, read-only.'''
+        return self.__ranks
+
+    @property
+    def levels(self) -> Optional[int]:
+        return self.__levels
+
+    def urls(self) -> Iterator[str]:
+        return map(self.__graph_manager.get_url_by_id, self.__ids.tolist())
+
+    def top_k(self, k: int) -> 'RankResult':
+        '''`k` urls of the highest ranks, in descending order of rank and then ascending id.
+        Selected by partition in `O(n + k log k)`, urls not selected are neither sorted nor looked up.'''
+        if k <= 0:
+            return self[:0]
+        if k < len(self):
+            # Negated so the `k` largest ranks are in front.
+            selected = np.argpartition(-self.__ranks, k - 1)[:k]
+        else:
+            selected = np.arange(len(self))
+        order = selected[np.lexsort((self.__ids[selected], -self.__ranks[selected]))]
+        return RankResult(self.__graph_manager, self.__ids[order], self.__ranks[order], self.__levels)
+
+    def quantize_priorities(self, levels: int = 11) -> 'RankResult':
+        '''Round ranks to `levels` evenly spaced priorities in `[0, 1]`, e.g. `0.0, 0.1, ..., 1.0` for 11 levels.
+        Iterating the result gives the exact decimal values, so sitemap priorities are short strings.'''
+        if levels < 2:
+            raise ValueError(f'levels must be at least 2, got {levels}')
+        ranks = np.rint(self.__ranks * (levels - 1)) / (levels - 1)
+        return RankResult(self.__graph_manager, self.__ids, ranks, levels)
+
+    def __priorities(self) -> List[float]:
+        if self.__levels is None:
+            return self.__ranks.tolist()
+        # float32 of 0.1 prints as 0.10000000149011612, map levels to the nearest decimal instead.
+        table = [round(level / (self.__levels - 1), 6) for level in range(self.__levels)]
+        return [table[level] for level in np.rint(self.__ranks * (self.__levels - 1)).astype(np.intp).tolist()]
+
+    def __len__(self) -> int:
+        return len(self.__ids)
+
+    def __iter__(self) -> Iterator[Tuple[str, float]]:
+        return zip(self.urls(), self.__priorities())
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tuple[str, float], 'RankResult']:
+        if isinstance(index, slice):
+            return RankResult(self.__graph_manager, self.__ids[index], self.__ranks[index], self.__levels)
+        if not -len(self) <= index < len(self):
+            raise IndexError('RankResult index out of range')
+        return next(iter(self[index:index + 1 or None]))
+
+    def to_list(self) -> List[Tuple[str, float]]:
+        return list(self)
+
+    def __repr__(self) -> str:
+        head = ', '.join(repr(pair) for pair in self[:3])
+        return f'RankResult([{head}{", ..." if len(self) > 3 else ""}], n_urls={len(self)})'
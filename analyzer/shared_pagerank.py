@@ -0,0 +1,178 @@
+import multiprocessing as mp
+import threading
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from typing import Dict, List, Tuple
+
+_Spec = List[Tuple[str, str, Tuple[int, ...]]]
+'''`(name, dtype, shape)` of arrays packed into one shared memory block.'''
+_ALIGNMENT = 64
+
+def _layout(spec: _Spec) -> Tuple[List[int], int]:
+    '''**return** (offset of each array, total bytes), arrays start on cache line boundaries.'''
+    offsets = []
+    offset = 0
+    for _, dtype, shape in spec:
+        offset += -offset % _ALIGNMENT
+        offsets.append(offset)
+        offset += np.dtype(dtype).itemsize * int(np.prod(shape))
+    return offsets, max(offset, 1)
+
+def _views(shm: SharedMemory, spec: _Spec) -> Dict[str, np.ndarray]:
+    offsets, _ = _layout(spec)
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        for (name, dtype, shape), offset in zip(spec, offsets)
+    }
+
+def partition_rows(indptr: np.ndarray, n_parts: int) -> np.ndarray:
+    '''Split rows into `n_parts` contiguous ranges of about the same number of rows plus links.
+    **return** Boundaries, part `k` is rows `[bounds[k], bounds[k + 1])`.'''
+    n_rows = len(indptr) - 1
+    costs = indptr + np.arange(n_rows + 1)
+    cuts = np.searchsorted(costs, np.linspace(0, costs[-1], n_parts + 1)[1:-1])
+    return np.concatenate(([0], cuts, [n_rows])).astype(np.int64)
+
+def _worker(shm_name: str, spec: _Spec, worker_id: int, barrier,
+            damping: float, convergence: float, max_iterations: float, residual_sender) -> None:
+    shm = SharedMemory(name=shm_name)
+    try:
+        residuals = _power_iteration(_views(shm, spec), worker_id, barrier, damping, convergence, max_iterations)
+        if worker_id == 0:
+            residual_sender.send(residuals)
+    except threading.BrokenBarrierError:
+        pass
+    shm.close()
+
+def _power_iteration(arrays: Dict[str, np.ndarray], worker_id: int, barrier,
+                     damping: float, convergence: float, max_iterations: float) -> List[float]:
+    '''Power iteration on rows of one part, synchronized with other workers once per iteration.
+
+    Weights are double-buffered, a worker writes buffer `nextStep` while others may still read buffer
+    `curStep`, so a single barrier per iteration is enough. Every worker sums the same partial diffs
+    after the barrier, so all of them stop at the same step without a coordinator.
+    **return** L1 diff of each iteration.'''
+    lo, hi = arrays['bounds'][worker_id:worker_id + 2]
+    indptr = arrays['csc_indptr'][lo:hi + 1]
+    indices = arrays['csc_indices'][indptr[0]:indptr[-1]]
+    edge_rows = np.repeat(np.arange(hi - lo), np.diff(indptr))
+    inv_out_degrees = arrays['inv_out_degrees'][lo:hi]
+    no_outgoing = arrays['no_outgoing'][lo:hi]
+    weights, scaled = arrays['weights'], arrays['scaled']
+    partial_diff, partial_no_outgoing = arrays['partial_diff'], arrays['partial_no_outgoing']
+    numNodes = len(arrays['inv_out_degrees'])
+    residule_factor = (1 - damping) / numNodes
+
+    residuals = []
+    step = 0
+    while step < max_iterations:
+        curStep = step % 2
+        nextStep = (step + 1) % 2
+
+        no_outgoing_weight = partial_no_outgoing[curStep].sum() / numNodes
+        rev_weights_sum = np.bincount(edge_rows, weights=scaled[curStep][indices], minlength=hi - lo)
+        weights_new = damping * (rev_weights_sum + no_outgoing_weight) + residule_factor
+
+        weights[nextStep][lo:hi] = weights_new
+        scaled[nextStep][lo:hi] = weights_new * inv_out_degrees
+        partial_diff[nextStep][worker_id] = np.abs(weights_new - weights[curStep][lo:hi]).sum()
+        partial_no_outgoing[nextStep][worker_id] = weights_new[no_outgoing].sum()
+        barrier.wait()
+
+        step += 1
+        residuals.append(float(partial_diff[nextStep].sum()))
+        if residuals[-1] < convergence:
+            break
+    if worker_id == 0:
+        arrays['result'][0] = step % 2
+    return residuals
+
+def shared_pagerank(indptr: np.ndarray,
+                    indices: np.ndarray,
+                    out_degrees: np.ndarray,
+                    damping: float,
+                    convergence: float,
+                    n_workers: int,
+                    max_iterations: float = float('inf')) -> Tuple[np.ndarray, List[float]]:
+    '''PageRank by `n_workers` processes, each owns a contiguous range of rows of the reversed link matrix.
+
+    Matrix, weights and per-worker partial sums are in one shared memory block, so only its name
+    is sent to workers and nothing is pickled per iteration.
+
+    **param** `indptr`, `indices`: reversed links in CSR, sources linking to url `i` are `indices[indptr[i]:indptr[i + 1]]`.
+    **return** (weights in url id order, L1 diff of each iteration).'''
+    numNodes = len(out_degrees)
+    n_workers = max(1, min(n_workers, numNodes))
+    spec: _Spec = [
+        ('csc_indptr', 'i8', (numNodes + 1,)),
+        ('csc_indices', 'i4', (len(indices),)),
+        ('bounds', 'i8', (n_workers + 1,)),
+        ('inv_out_degrees', 'f8', (numNodes,)),
+        ('no_outgoing', '?', (numNodes,)),
+        ('weights', 'f8', (2, numNodes)),
+        ('scaled', 'f8', (2, numNodes)),
+        ('partial_diff', 'f8', (2, n_workers)),
+        ('partial_no_outgoing', 'f8', (2, n_workers)),
+        ('result', 'i8', (1,)),
+    ]
+    shm = SharedMemory(create=True, size=_layout(spec)[1])
+    try:
+        return _run_workers(shm, spec, indptr, indices, out_degrees, damping, convergence, n_workers, max_iterations)
+    finally:
+        shm.unlink()
+        try:
+            shm.close()
+        except BufferError:
+            # Views are still referenced by a propagating traceback, mapping is released with it.
+            pass
+
+def _run_workers(shm: SharedMemory, spec: _Spec,
+                 indptr: np.ndarray,
+                 indices: np.ndarray,
+                 out_degrees: np.ndarray,
+                 damping: float,
+                 convergence: float,
+                 n_workers: int,
+                 max_iterations: float) -> Tuple[np.ndarray, List[float]]:
+    arrays = _views(shm, spec)
+    numNodes = len(out_degrees)
+    arrays['csc_indptr'][:] = indptr
+    arrays['csc_indices'][:] = indices
+    arrays['bounds'][:] = partition_rows(arrays['csc_indptr'], n_workers)
+    no_outgoing = arrays['no_outgoing']
+    no_outgoing[:] = out_degrees == 0
+    arrays['inv_out_degrees'][:] = 0.0
+    arrays['inv_out_degrees'][~no_outgoing] = 1.0 / out_degrees[~no_outgoing]
+    arrays['weights'][0] = 1 / numNodes
+    arrays['scaled'][0] = arrays['weights'][0] * arrays['inv_out_degrees']
+    # Worker 0 carries the initial weight of pages without outgoing links, others start at zero.
+    arrays['partial_no_outgoing'][0] = 0.0
+    arrays['partial_no_outgoing'][0][0] = no_outgoing.sum() / numNodes
+
+    barrier = mp.Barrier(n_workers)
+    residual_receiver, residual_sender = mp.Pipe(duplex=False)
+    workers = [
+        mp.Process(target=_worker, daemon=True,
+                   args=(shm.name, spec, worker_id, barrier, damping, convergence, max_iterations, residual_sender))
+        for worker_id in range(n_workers)
+    ]
+    [worker.start() for worker in workers]
+    residuals: List[float] = []
+    running = workers
+    while running:
+        # Receive while waiting, worker 0 blocks on sending long residual lists until they are read.
+        if residual_receiver.poll(0.1):
+            residuals = residual_receiver.recv()
+        failed = [worker for worker in workers if worker.exitcode not in (None, 0)]
+        if failed:
+            # Unblock workers waiting for the failed one.
+            barrier.abort()
+            [worker.join() for worker in workers]
+            raise RuntimeError(f'PageRank worker exited with code {failed[0].exitcode}')
+        running = [worker for worker in running if worker.exitcode is None]
+    if residual_receiver.poll():
+        residuals = residual_receiver.recv()
+
+    return arrays['weights'][arrays['result'][0]].copy(), residuals
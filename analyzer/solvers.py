@@ -0,0 +1,177 @@
+import numpy as np
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .backend import to_numpy
+from .config import PageRankSolver
+from .shared_pagerank import partition_rows
+
+class LinkMatrix(NamedTuple):
+    '''Reversed link matrix in coordinate form, row `targets[k]` gathers weight of column `sources[k]`.'''
+    sources: np.ndarray
+    targets: np.ndarray
+    inv_out_degrees: np.ndarray
+    '''`1 / out degree`, 0 for pages without outgoing links.'''
+    no_outgoing: np.ndarray
+    numNodes: int
+
+def sparse_pagerank(xp,
+                    sources: np.ndarray,
+                    targets: np.ndarray,
+                    numNodes: int,
+                    damping: float,
+                    convergence: float,
+                    weights: Optional[np.ndarray] = None,
+                    solver: PageRankSolver = PageRankSolver.POWER,
+                    max_iterations: Optional[int] = None) -> Tuple[np.ndarray, List[float]]:
+    '''PageRank on links `sources[k] -> targets[k]`.
+    **param** `xp`: array module, `numpy` or `cupy`.
+    **param** `weights`: initial weights summing to 1, uniform if None.
+    **param** `max_iterations`: stop even if not converged, unlimited if None.
+    **return** (weights on host, L1 diff of each iteration).'''
+    sources, targets = xp.asarray(sources), xp.asarray(targets)
+    out_degrees = xp.bincount(sources, minlength=numNodes)
+    no_outgoing = out_degrees == 0
+    inv_out_degrees = xp.zeros(numNodes, dtype=xp.float64)
+    inv_out_degrees[~no_outgoing] = 1.0 / out_degrees[~no_outgoing]
+    links = LinkMatrix(sources, targets, inv_out_degrees, no_outgoing, numNodes)
+
+    weights = xp.full(numNodes, 1 / numNodes, dtype=xp.float64) if weights is None else xp.asarray(weights, dtype=xp.float64)
+    residuals: List[float] = []
+    weights = _SOLVERS[solver](xp, links, damping, convergence, weights, residuals, max_iterations or float('inf'))
+    return to_numpy(weights), residuals
+
+def _power(xp, links: LinkMatrix, damping: float, convergence: float,
+           weights, residuals: List[float], max_iterations: float):
+    '''Jacobi power iteration, every page is updated from weights of the previous iteration.'''
+    residule_factor = (1-damping) / links.numNodes
+    while len(residuals) < max_iterations:
+        weights_new = _step(xp, links, damping, residule_factor, weights)
+        residuals.append(float(xp.abs(weights_new - weights).sum()))
+        weights = weights_new
+        if residuals[-1] < convergence:
+            break
+    return weights
+
+def _step(xp, links: LinkMatrix, damping: float, residule_factor: float, weights):
+    # Pages without outgoing links spread weight to all pages, a rank-1 term of the transition matrix.
+    no_outgoing_weight = weights[links.no_outgoing].sum() / links.numNodes
+    rev_weights_sum = xp.bincount(links.targets, weights=(weights * links.inv_out_degrees)[links.sources],
+                                  minlength=links.numNodes)
+    return damping * (rev_weights_sum + no_outgoing_weight) + residule_factor
+
+_GAUSS_SEIDEL_BLOCKS = 64
+
+def _gauss_seidel(xp, links: LinkMatrix, damping: float, convergence: float,
+                  weights, residuals: List[float], max_iterations: float):
+    '''Block Gauss-Seidel, pages are updated in `_GAUSS_SEIDEL_BLOCKS` blocks of ids, and later blocks
+    already read new weights of earlier ones. Links mostly point back to pages found earlier in the crawl,
+    such as home and parent pages, so new weights propagate within one sweep.'''
+    numNodes = links.numNodes
+    residule_factor = (1-damping) / numNodes
+    order = xp.argsort(links.targets, kind='stable')
+    sources, targets = links.sources[order], links.targets[order]
+    indptr = np.zeros(numNodes + 1, dtype=np.int64)
+    np.cumsum(to_numpy(xp.bincount(targets, minlength=numNodes)), out=indptr[1:])
+    bounds = partition_rows(indptr, min(_GAUSS_SEIDEL_BLOCKS, numNodes)).tolist()
+    blocks = [(lo, hi, sources[indptr[lo]:indptr[hi]], targets[indptr[lo]:indptr[hi]] - lo)
+              for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    weights = weights.copy()
+    scaled = weights * links.inv_out_degrees
+    while len(residuals) < max_iterations:
+        weights_old = weights.copy()
+        no_outgoing_sum = float(weights[links.no_outgoing].sum())
+        for lo, hi, block_sources, block_rows in blocks:
+            rev_weights_sum = xp.bincount(block_rows, weights=scaled[block_sources], minlength=hi - lo)
+            weights_new = damping * (rev_weights_sum + no_outgoing_sum / numNodes) + residule_factor
+            no_outgoing_sum += float((weights_new - weights[lo:hi])[links.no_outgoing[lo:hi]].sum())
+            weights[lo:hi] = weights_new
+            scaled[lo:hi] = weights_new * links.inv_out_degrees[lo:hi]
+        # A sweep does not keep weights summing to 1, the drift decays as slow as `damping` if not removed.
+        total = float(weights.sum())
+        weights /= total
+        scaled /= total
+        residuals.append(float(xp.abs(weights - weights_old).sum()))
+        if residuals[-1] < convergence:
+            break
+    return weights
+
+_EXTRAPOLATION_PERIOD = 10
+
+def _extrapolation(xp, links: LinkMatrix, damping: float, convergence: float,
+                   weights, residuals: List[float], max_iterations: float):
+    '''Power iteration with quadratic extrapolation (Kamvar et al., 2003) every `_EXTRAPOLATION_PERIOD`
+    iterations, which removes the error along the two subdominant eigenvectors estimated from the last
+    four iterates.'''
+    residule_factor = (1-damping) / links.numNodes
+    history = [weights]
+    while len(residuals) < max_iterations:
+        weights_new = _step(xp, links, damping, residule_factor, weights)
+        residuals.append(float(xp.abs(weights_new - weights).sum()))
+        weights = weights_new
+        if residuals[-1] < convergence:
+            break
+
+        history = history[-3:] + [weights]
+        if len(residuals) % _EXTRAPOLATION_PERIOD == 0 and len(history) == 4:
+            weights = _quadratic_extrapolation(xp, *history)
+            history = [weights]
+    return weights
+
+def _quadratic_extrapolation(xp, x0, x1, x2, x3):
+    y1, y2, y3 = x1 - x0, x2 - x0, x3 - x0
+    # Least squares `[y1 y2] @ gamma = -y3` from its 2x2 normal equations.
+    gram = np.array([[float(y1 @ y1), float(y1 @ y2)], [float(y1 @ y2), float(y2 @ y2)]])
+    rhs = -np.array([float(y1 @ y3), float(y2 @ y3)])
+    try:
+        gamma1, gamma2 = np.linalg.solve(gram, rhs)
+    except np.linalg.LinAlgError:
+        return x3
+    beta0, beta1, beta2 = gamma1 + gamma2 + 1, gamma2 + 1, 1
+    weights = beta0 * x1 + beta1 * x2 + beta2 * x3
+    total = float(weights.sum())
+    if not np.isfinite(total) or total <= 0:
+        return x3
+    return weights / total
+
+_ADAPTIVE_REFRESH = 5
+_ADAPTIVE_PATIENCE = 3
+
+def _adaptive(xp, links: LinkMatrix, damping: float, convergence: float,
+              weights, residuals: List[float], max_iterations: float):
+    '''Adaptive PageRank (Kamvar et al., 2004), pages whose weight changed less than `convergence / numNodes`
+    in `_ADAPTIVE_PATIENCE` consecutive iterations are frozen and their rows are skipped. A single small change
+    is not enough, pages far from the index page stay unchanged until weight propagates to them.
+    Links into frozen pages are dropped every `_ADAPTIVE_REFRESH` iterations, since filtering costs about
+    as much as one full iteration.
+    Frozen pages stop following changes of others, so weights are close to but not exactly those of `POWER`.'''
+    numNodes = links.numNodes
+    residule_factor = (1-damping) / numNodes
+    threshold = convergence / numNodes
+    active = xp.ones(numNodes, dtype=bool)
+    calm = xp.zeros(numNodes, dtype=xp.int32)
+    sources, targets = links.sources, links.targets
+    while len(residuals) < max_iterations:
+        no_outgoing_weight = weights[links.no_outgoing].sum() / numNodes
+        rev_weights_sum = xp.bincount(targets, weights=(weights * links.inv_out_degrees)[sources], minlength=numNodes)
+        weights_new = xp.where(active, damping * (rev_weights_sum + no_outgoing_weight) + residule_factor, weights)
+        delta = xp.abs(weights_new - weights)
+        residuals.append(float(delta.sum()))
+        weights = weights_new
+        if residuals[-1] < convergence:
+            break
+
+        calm = xp.where(delta < threshold, calm + 1, 0)
+        active &= calm < _ADAPTIVE_PATIENCE
+        if len(residuals) % _ADAPTIVE_REFRESH == 0:
+            kept = active[targets]
+            sources, targets = sources[kept], targets[kept]
+    return weights
+
+_SOLVERS: Dict[PageRankSolver, Callable] = {
+    PageRankSolver.POWER: _power,
+    PageRankSolver.GAUSS_SEIDEL: _gauss_seidel,
+    PageRankSolver.EXTRAPOLATION: _extrapolation,
+    PageRankSolver.ADAPTIVE: _adaptive,
+}
@@ -1,5 +1,14 @@
-from .crawler import Crawler
 from .config import CrawlerConfig
 from .graph_manager import PipelineUpdate, GraphManager
 
-__all__ = ['Crawler', 'CrawlerConfig', 'PipelineUpdate', 'GraphManager']
\ No newline at end of file
+__all__ = ['Crawler', 'AsyncCrawler', 'CrawlerConfig', 'PipelineUpdate', 'GraphManager']
+
+def __getattr__(name: str):
+    # Crawlers pull in requests and aiohttp, imported on first use so `import analyzer` stays fast.
+    if name == 'Crawler':
+        from .crawler import Crawler
+        return Crawler
+    if name == 'AsyncCrawler':
+        from .async_crawler import AsyncCrawler
+        return AsyncCrawler
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
\ No newline at end of file
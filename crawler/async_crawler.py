@@ -0,0 +1,248 @@
+import aiohttp
+import asyncio
+import contextlib
+from yarl import URL
+import dataclasses
+import math
+import time
+from datetime import datetime
+
+from typing import Set, Optional, NamedTuple
+
+from .config import CrawlerConfig
+from .crawler import CrawlerTask
+from .graph_manager import GraphManager
+from .link_extractor import extract_links
+from .scheduler import HostScheduler
+from .url_canonicalizer import UrlCanonicalizer
+from .url_filter import UrlFilter
+from .url_utils import *
+
+class AsyncResponse(NamedTuple):
+    '''Response fields used by crawler handlers, read out of an `aiohttp` response.'''
+    status_code: int
+    headers: dict
+    text: str
+
+class AsyncCrawler:
+    '''Event loop based crawler, an alternative of thread based `Crawler`. \n
+    Up to `config.max_concurrency` requests are kept in flight, while graph output
+    and HEAD-then-GET flow are the same as `Crawler`.'''
+
+    def __init__(self,
+                 config: CrawlerConfig,
+                 graph_manager: GraphManager = None) -> None:
+
+        self.__config: CrawlerConfig = dataclasses.replace(config)
+        self.graph_manager = graph_manager or GraphManager(UrlCanonicalizer.from_config(self.__config),
+                                                          compact=self.__config.compact_graph)
+
+        self.__url_filter = UrlFilter.from_config(self.__config)
+
+        self.__EXP_DELAY = [2 ** i for i in range(self.__config.n_retries)] + [0]
+
+        self.__index_urls_set = set(self.__config.index_urls)
+        for index_url in self.__config.index_urls:
+            self.graph_manager.get_id_by_url(index_url)
+
+        # Handlers and workers run in event loop thread only, no lock is required.
+        self.__url_check_created: Set[int] = set()
+        self.__current_crawling_count = 0
+        self.__url_to_crawl = HostScheduler(
+            request_gap     = self.__config.per_host_request_gap,
+            max_connections = self.__config.per_host_max_connections,
+            burst           = self.__config.per_host_burst,
+            max_retry_after = self.__config.max_retry_after,
+        )
+        for index_url in self.__config.index_urls:
+            self.__url_to_crawl.push(CrawlerTask(
+                method   = 'GET',
+                url      = index_url,
+                callback = self.__page_parse_handler
+            ))
+
+        self.__task_changed: Optional[asyncio.Event] = None
+        '''Set when tasks are pushed or released, wakes up idle workers.'''
+
+    def main(self) -> None:
+        asyncio.run(self.main_async())
+
+    async def main_async(self) -> None:
+        # Event must be created inside running event loop.
+        self.__task_changed = asyncio.Event()
+
+        async with self.__get_session() as session:
+            await asyncio.gather(*(
+                self.__worker(session, worker_id)
+                for worker_id in range(self.__config.max_concurrency)
+            ))
+
+        if self.__config.compact_graph:
+            self.graph_manager.freeze()
+
+    def __log(self, messages):
+        time_string = datetime.now().strftime("%H:%M:%S")
+        log = f'[{time_string}] {messages}\n'
+
+        print(log, end='')
+
+    async def __worker(self, session: aiohttp.ClientSession, worker_id: int) -> None:
+        proxy = None
+        if self.__config.proxies:
+            proxy = self.__config.proxies[worker_id % len(self.__config.proxies)] or None
+
+        while True:
+            task, wait_time = self.__url_to_crawl.pop()
+            if not task:
+                # All tasks done, including tasks created by handlers.
+                if self.__current_crawling_count == 0 and len(self.__url_to_crawl) == 0:
+                    self.__task_changed.set()
+                    return
+
+                # No host is ready, wait for the nearest one or task changes.
+                self.__task_changed.clear()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self.__task_changed.wait(),
+                                           None if math.isinf(wait_time) else wait_time)
+                continue
+
+            self.__current_crawling_count += 1
+            response = None
+            released = False
+            try:
+                self.__log(f'Worker {worker_id} handling "{task.method}-{task.url}" start, pending tasks: {len(self.__url_to_crawl)}.')
+
+                response = await self.__request_with_retry(session, proxy, task.method, task.url)
+
+                released = True
+                throttled = self.__url_to_crawl.release(
+                    task,
+                    response.status_code if response else None,
+                    response.headers.get('Retry-After') if response else None,
+                )
+                if throttled and task.n_throttled < self.__config.n_retries:
+                    task.n_throttled += 1
+                    self.__url_to_crawl.push(task, front=True)
+                    self.__log(f'Worker {worker_id} handling "{task.method}-{task.url}" throttled, retry later.')
+                else:
+                    task.callback(task.url, response)
+                    self.__log(f'Worker {worker_id} handling "{task.method}-{task.url}" finish, pending tasks: {len(self.__url_to_crawl)}.')
+            except Exception as err:
+                self.__log(f'Worker {worker_id} handling "{task.method}-{task.url}" error: "{err}".')
+            finally:
+                # Request raised or was cancelled, the host slot is freed anyway.
+                if not released: self.__url_to_crawl.release(task, None)
+                self.__current_crawling_count -= 1
+                self.__task_changed.set()
+
+    def __page_parse_handler(self, url: str, response: Optional[AsyncResponse]):
+        if not response: return False
+        if response.status_code != 200: return False
+
+        links = extract_links(url, response.text)
+
+        self.graph_manager._add_links(url, links)
+        url_ids = [self.graph_manager.get_id_by_url(link)
+                   for link in links]
+
+        # Handlers run in event loop thread only, no lock is required.
+        urls_to_check = [link
+                         for link, url_id in zip(links, url_ids)
+                         if url_id not in self.__url_check_created]
+        self.__url_check_created.update(url_ids)
+
+        for link in urls_to_check:
+            if not self.__url_filter(link): continue
+
+            self.__url_to_crawl.push(CrawlerTask(
+                method   = 'HEAD',
+                url      = link,
+                callback = self.__url_check_handler
+            ))
+
+            self.__log(f'Add "HEAD-{link}" to queue, pending tasks: {len(self.__url_to_crawl)}.')
+
+        return True
+
+    def __url_check_handler(self, url: str, response: Optional[AsyncResponse]):
+        if not response: return
+        elif response.status_code != 200: return
+        elif not response.headers.get('Content-Type', '').startswith('text/html'): return
+
+        self.__url_to_crawl.push(CrawlerTask(
+            method   = 'GET',
+            url      = url,
+            callback = self.__page_parse_handler
+        ))
+
+        self.__log(f'Add "GET-{url}" to queue, pending tasks: {len(self.__url_to_crawl)}.')
+
+    def __get_session(self) -> aiohttp.ClientSession:
+        if isinstance(self.__config.timeout, tuple):
+            connect_timeout, read_timeout = self.__config.timeout
+            timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        else:
+            timeout = aiohttp.ClientTimeout(total=self.__config.timeout)
+
+        headers = {}
+        if self.__config.user_agent:
+            headers['User-Agent'] = self.__config.user_agent
+
+        # Default connector limits 100 connections, which would cap concurrency.
+        connector = aiohttp.TCPConnector(
+            limit = self.__config.max_concurrency,
+            ssl = None if self.__config.verify else False,
+        )
+
+        session = aiohttp.ClientSession(
+            connector = connector,
+            timeout = timeout,
+            headers = headers,
+        )
+
+        for cookie_name, cookie_domain, cookie_value in self.__config.cookies:
+            session.cookie_jar.update_cookies(
+                {cookie_name: cookie_value},
+                response_url = URL(f'http://{cookie_domain.lstrip(".")}/'),
+            )
+
+        return session
+
+    def __get_referer(self, url: str) -> str:
+        if url in self.__index_urls_set: return url
+
+        url_id = self.graph_manager.get_id_by_url(url)
+        referer_id = self.graph_manager.get_referer_id(url_id)
+        if referer_id is None: return url
+
+        return self.graph_manager.get_url_by_id(referer_id)
+
+    async def __request_with_retry(self,
+                                   session: aiohttp.ClientSession,
+                                   proxy: Optional[str],
+                                   http_method_name: str,
+                                   url: str) -> Optional[AsyncResponse]:
+
+        referer = self.__get_referer(url)
+        headers = {}
+        headers['Referer'] = referer
+        if url_to_origin(url) != url_to_origin(referer):
+            headers['Origin'] = url_to_origin(referer)
+
+        for retry_delay in self.__EXP_DELAY:
+            try:
+                async with session.request(
+                    http_method_name,
+                    url = url,
+                    headers = headers,
+                    proxy = proxy,
+                ) as response:
+                    text = await response.text(errors='replace') if http_method_name == 'GET' else ''
+                    return AsyncResponse(response.status, response.headers, text)
+            except asyncio.TimeoutError:
+                self.__log(f'Request "{url}" timout.')
+            except Exception as err:
+                self.__log(f'Request "{url}" error: "{err}".')
+            await asyncio.sleep(retry_delay)
+
+        return None
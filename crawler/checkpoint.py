@@ -0,0 +1,112 @@
+import os
+import pickle
+from collections import defaultdict
+
+from typing import List, Optional, Set, Tuple, NamedTuple
+
+from .config import CrawlerConfig
+from .graph_manager import GraphManager
+from .url_canonicalizer import UrlCanonicalizer
+
+class CheckpointRecord(NamedTuple):
+    '''Crawl progress since previous record.'''
+    new_urls: List[str]
+    '''Urls of newly created url ids, in id order.'''
+    new_links: List[Tuple[int, int]]
+    new_html_ids: List[int]
+    new_seen_ids: List[int]
+    '''Url ids newly checked by crawler, i.e. HEAD tasks are created if allowed.'''
+    pending_tasks: List[Tuple[str, str, int]]
+    '''All unfinished tasks `(method, url, n_throttled)`, replaces those of previous records.'''
+
+class CrawlState(NamedTuple):
+    config: CrawlerConfig
+    graph_manager: GraphManager
+    seen_ids: Set[int]
+    pending_tasks: List[Tuple[str, str, int]]
+    end_offset: int
+    '''File offset after the last complete record, a truncated record after it is cut off on resume.'''
+
+class CheckpointWriter:
+    '''Append crawl progress to a checkpoint file. \n
+    The file is a pickled `CrawlerConfig` followed by pickled `CheckpointRecord`s, so the
+    cost of a checkpoint is proportional to progress since previous one (and pending tasks),
+    not to graph size.'''
+
+    def __init__(self,
+                 path: str,
+                 config: CrawlerConfig,
+                 graph_manager: GraphManager,
+                 append: bool = False,
+                 end_offset: Optional[int] = None):
+        '''**param** `end_offset`: `CrawlState.end_offset` if `append`, bytes after it are removed before appending.'''
+        self.__path = path
+        self.__graph_manager = graph_manager
+        self.__n_urls = graph_manager.get_url_count() if append else 0
+
+        if append:
+            # Progress loaded from the file is not written again.
+            graph_manager.pipeline_get_update('checkpoint')
+            if end_offset is not None:
+                # Records appended after a partial one could never be loaded.
+                with open(self.__path, 'r+b') as file:
+                    file.truncate(end_offset)
+        else:
+            with open(self.__path, 'wb') as file:
+                pickle.dump(config, file)
+
+    def write(self, new_seen_ids: List[int], pending_tasks: List[Tuple[str, str, int]]) -> None:
+        update = self.__graph_manager.pipeline_get_update('checkpoint')
+        record = CheckpointRecord(
+            new_urls      = [self.__graph_manager.get_url_by_id(url_id)
+                             for url_id in range(self.__n_urls, update.n_urls)],
+            new_links     = update.new_links,
+            new_html_ids  = update.new_html_ids,
+            new_seen_ids  = new_seen_ids,
+            pending_tasks = pending_tasks,
+        )
+        self.__n_urls = update.n_urls
+
+        with open(self.__path, 'ab') as file:
+            pickle.dump(record, file)
+            file.flush()
+            os.fsync(file.fileno())
+
+def load_checkpoint(path: str) -> CrawlState:
+    '''Rebuild crawl state from a checkpoint file. A truncated last record is ignored.'''
+    seen_ids: Set[int] = set()
+    pending_tasks: List[Tuple[str, str, int]] = []
+
+    with open(path, 'rb') as file:
+        config: CrawlerConfig = pickle.load(file)
+
+        # Configs saved before url canonicalization kept literal urls, ids must be replayed the same.
+        canonicalizer = UrlCanonicalizer.from_config(config) if 'canonicalize_urls' in vars(config) else None
+        graph_manager = GraphManager(canonicalizer, compact=config.compact_graph)
+        end_offset = file.tell()
+
+        while True:
+            try:
+                record: CheckpointRecord = pickle.load(file)
+            except Exception:
+                # A partial record may fail in many ways, e.g. `EOFError`, `UnpicklingError` or `OverflowError`
+                # of a cut frame length, all of them are treated as truncation.
+                break
+
+            for url in record.new_urls:
+                graph_manager.get_id_by_url(url)
+
+            # Links of a page are added at once, keep them grouped by source page.
+            links_by_source = defaultdict(list)
+            for source_id, target_id in record.new_links:
+                links_by_source[source_id].append(graph_manager.get_url_by_id(target_id))
+            for source_id in record.new_html_ids:
+                links_by_source.setdefault(source_id, [])
+            for source_id, target_urls in links_by_source.items():
+                graph_manager._add_links(graph_manager.get_url_by_id(source_id), target_urls)
+
+            seen_ids.update(record.new_seen_ids)
+            pending_tasks = record.pending_tasks
+            end_offset = file.tell()
+
+    return CrawlState(config, graph_manager, seen_ids, pending_tasks, end_offset)
@@ -1,5 +1,6 @@
+import warnings
 from dataclasses import dataclass, field
-from typing import Union, Tuple, List
+from typing import Union, Tuple, List, Optional
 
 @dataclass
 class CrawlerConfig:
@@ -36,5 +37,58 @@ class CrawlerConfig:
     cookies: List[Tuple[str, str, str]] = field(default_factory=list)
     '''Cookies in list of tuples `(name, domain, value)`'''
 
-    per_thread_request_gap: int = 1
-    '''Per thread time gap between two continuous requests.'''
\ No newline at end of file
+    per_thread_request_gap: Optional[float] = None
+    '''Deprecated, use `per_host_request_gap`. If given, it is used as `per_host_request_gap`, the gap now applies to each host instead of each thread.'''
+
+    per_host_request_gap: float = 0.2
+    '''Per host minimum time gap between two continuous requests.'''
+
+    per_host_burst: int = 1
+    '''Number of requests to a host allowed to start at once after idle, before `per_host_request_gap` applies.'''
+
+    per_host_max_connections: int = 5
+    '''Maximum number of in-flight requests to a host.'''
+
+    max_retry_after: float = 60
+    '''Upper bound of delay seconds a host is paused after 429/503 responses, `Retry-After` longer than this is truncated.'''
+
+    checkpoint_path: str = ''
+    '''File path crawl progress is periodically appended to, for `Crawler.resume`. Empty string for no checkpoint. `Crawler` only.'''
+
+    checkpoint_interval: float = 60
+    '''Seconds between two checkpoints.'''
+
+    validator_cache_path: str = ''
+    '''File path of `ETag`/`Last-Modified` cache. Loaded for conditional requests if exists, and saved after crawl. Empty string for no cache. `Crawler` only.'''
+
+    max_page_size: int = 10 * 2 ** 20
+    '''Maximum number of characters of a page parsed for links, the rest is not downloaded. 0 for no limit. `Crawler` only.'''
+
+    infer_link_type: bool = True
+    '''Skip HEAD request of links whose type is inferred from url extension or statistics of urls with same path prefix, html pages are GET directly. `Crawler` only.'''
+
+    skip_asset_requests: bool = False
+    '''Send no request to links inferred as non-html resources, otherwise HEAD only. `Crawler` only. \n
+    An html page under a path prefix of mostly resources is then dropped from the graph unverified, enable only if acceptable.'''
+
+    max_concurrency: int = 100
+    '''Maximum number of in-flight requests of `AsyncCrawler`.'''
+
+    canonicalize_urls: bool = True
+    '''Treat urls differing only in scheme, host case, default port, or query parameter order as one url node, which is requested once. Original url first seen is kept for output.'''
+
+    ignored_query_params: Tuple[str, ...] = (
+        'utm_*', 'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga',
+        'jsessionid', 'phpsessid', 'aspsessionid', 'sessionid',
+    )
+    '''Tracking and session parameters removed from urls before comparing, support wildcard `*`, case-insensitive. Used if `canonicalize_urls`.'''
+
+    compact_graph: bool = False
+    '''Store links of `GraphManager` in compact arrays, frozen into CSR/CSC arrays after crawl. Less memory, but no link can be added after crawl.'''
+
+    def __post_init__(self):
+        if self.per_thread_request_gap is not None:
+            warnings.warn('`per_thread_request_gap` is deprecated, use `per_host_request_gap`.', DeprecationWarning, stacklevel=3)
+            self.per_host_request_gap = self.per_thread_request_gap
+            # Mapped once, so `dataclasses.replace` does not override `per_host_request_gap` again.
+            self.per_thread_request_gap = None
@@ -2,8 +2,7 @@ import requests
 import re
 import threading
 import dataclasses
-import queue
-import contextlib
+import os
 import time
 from datetime import datetime
 from functools import partial
@@ -11,37 +10,51 @@ from enum import Enum, unique
 
 from typing import Dict, List, Set, Callable, Optional
 
+from .checkpoint import CheckpointWriter, load_checkpoint
 from .config import CrawlerConfig
 from .graph_manager import GraphManager
+from .frontier import Frontier
+from .link_classifier import LinkClassifier, LinkKind
+from .link_extractor import iter_links
+from .scheduler import HostScheduler
+from .url_canonicalizer import UrlCanonicalizer
+from .url_filter import UrlFilter
 from .url_utils import *
+from .validator_cache import ValidatorCache
 
 class CrawlerTask:
     def __init__(self, method: str, url: str, callback: Callable):
         self.method = method
         self.url = url
         self.callback = callback
+        self.n_throttled = 0
 
 class Crawler:
+    __PARSE_CHUNK_SIZE = 65536
+
     def __init__(self, 
                  config: CrawlerConfig,
                  graph_manager: GraphManager = None) -> None:
         
         self.__config: CrawlerConfig = dataclasses.replace(config)
-        self.graph_manager = graph_manager or GraphManager()
+        self.graph_manager = graph_manager or GraphManager(UrlCanonicalizer.from_config(self.__config),
+                                                          compact=self.__config.compact_graph)
+
+        if self.__config.validator_cache_path and os.path.exists(self.__config.validator_cache_path):
+            self.validator_cache = ValidatorCache.load_from_file(self.__config.validator_cache_path)
+        else:
+            self.validator_cache = ValidatorCache()
+
+        self.__link_classifier = LinkClassifier()
         
         self.__lock = threading.Lock()
 
-        self.__url_filter = partial(
-            check_url_allowed, 
-            allow_domains = config.allow_domains,
-            include_urls = config.include_urls,
-            exclude_urls = config.exclude_urls,
-        )
+        self.__url_filter = UrlFilter.from_config(self.__config)
 
         self.__EXP_DELAY = [2 ** i for i in range(self.__config.n_retries)] + [0]
     
         # Init index urls.
-        self.__url_to_crawl: queue.Queue[CrawlerTask] = queue.Queue()
+        self.__url_to_crawl = self.__new_frontier()
         self.__index_urls_set = set(self.__config.index_urls)
         for index_url in self.__config.index_urls:
             self.graph_manager.get_id_by_url(index_url)
@@ -52,9 +65,17 @@ class Crawler:
             ))
 
         # Variables that require lock protection.
-        self.__all_crawl_finish = False
-        self.__current_crawling_count = 0
         self.__url_check_created: Set[int] = set()
+        self.__url_check_created_new: List[int] = []
+        '''Url ids added to `self.__url_check_created` since last checkpoint.'''
+        self.__n_requests = 0
+        self.__n_requests_saved = 0
+        '''Number of HEAD requests skipped by link type inference.'''
+        self.__n_mispredicted = 0
+        '''Number of links inferred as html page, but not.'''
+
+        self.__resumed = False
+        self.__checkpoint_end_offset: Optional[int] = None
 
         # Init threads
         self.__threads = [
@@ -64,10 +85,97 @@ class Crawler:
             for worker_id in range(self.__config.n_threads)
         ]
 
+    @classmethod
+    def resume(cls, checkpoint_path: str) -> 'Crawler':
+        '''Create a crawler continuing the crawl saved in `checkpoint_path`, call `main` to start. \n
+        Finished pages are not fetched again, new checkpoints are appended to the same file.'''
+        state = load_checkpoint(checkpoint_path)
+        config = dataclasses.replace(state.config, checkpoint_path=checkpoint_path)
+
+        crawler = cls(config, state.graph_manager)
+        crawler.__resumed = True
+        crawler.__checkpoint_end_offset = state.end_offset
+        crawler.__url_check_created = state.seen_ids
+        crawler.__url_to_crawl = crawler.__new_frontier()
+        for method, url, n_throttled in state.pending_tasks:
+            task = CrawlerTask(
+                method   = method,
+                url      = url,
+                callback = crawler.__page_parse_handler if method == 'GET' else crawler.__url_check_handler
+            )
+            task.n_throttled = n_throttled
+            crawler.__url_to_crawl.put(task)
+
+        return crawler
+
     def main(self) -> None:
+        if not self.__config.checkpoint_path:
+            [thread.start() for thread in self.__threads]
+            [thread.join() for thread in self.__threads]
+        else:
+            self.__main_with_checkpoint()
+
+        # Frozen first, links of a compact graph are only indexed by source after `freeze`.
+        if self.__config.compact_graph:
+            self.graph_manager.freeze()
+        if self.__config.validator_cache_path:
+            self.validator_cache.save_to_file(self.__config.validator_cache_path, self.graph_manager)
+
+        statistic = self.get_statistic()
+        self.__log(f'Crawl finish, {statistic["n_requests"]} requests sent, '
+                   f'{statistic["n_requests_saved"]} requests saved by link type inference '
+                   f'({statistic["n_mispredicted"]} mispredicted).')
+
+    def get_statistic(self) -> Dict[str, int]:
+        with self.__lock:
+            return {
+                'n_requests': self.__n_requests,
+                'n_requests_saved': self.__n_requests_saved,
+                'n_mispredicted': self.__n_mispredicted,
+            }
+
+    def __main_with_checkpoint(self) -> None:
+        writer = CheckpointWriter(self.__config.checkpoint_path, 
+                                  self.__config, 
+                                  self.graph_manager, 
+                                  append=self.__resumed,
+                                  end_offset=self.__checkpoint_end_offset)
+        crawl_finish = threading.Event()
+        checkpoint_thread = threading.Thread(target=self.__checkpoint_worker,
+                                             args=(writer, crawl_finish),
+                                             daemon=True)
+        
+        checkpoint_thread.start()
         [thread.start() for thread in self.__threads]
         [thread.join() for thread in self.__threads]
 
+        crawl_finish.set()
+        checkpoint_thread.join()
+        self.__checkpoint(writer)
+
+    def __new_frontier(self) -> Frontier:
+        return Frontier(HostScheduler(
+            request_gap     = self.__config.per_host_request_gap,
+            max_connections = self.__config.per_host_max_connections,
+            burst           = self.__config.per_host_burst,
+            max_retry_after = self.__config.max_retry_after,
+        ))
+
+    def __checkpoint_worker(self, writer: CheckpointWriter, crawl_finish: threading.Event) -> None:
+        while not crawl_finish.wait(self.__config.checkpoint_interval):
+            self.__checkpoint(writer)
+
+    def __checkpoint(self, writer: CheckpointWriter) -> None:
+        # Lock is held during writing, so seen urls, pending tasks and graph are consistent.
+        with self.__lock:
+            new_seen_ids = self.__url_check_created_new
+            self.__url_check_created_new = []
+            pending_tasks = [(task.method, task.url, task.n_throttled)
+                             for task in self.__url_to_crawl.snapshot()]
+            writer.write(new_seen_ids, pending_tasks)
+
+        self.__log(f'Checkpoint saved, pending tasks: {len(pending_tasks)}.')
+
     def __log(self, messages):
         time_string = datetime.now().strftime("%H:%M:%S")
         log = f'[{time_string}] {messages}\n'
@@ -76,65 +184,124 @@ class Crawler:
 
     def __worker(self, worker_id: int) -> None:
         session = self.__get_session(worker_id)
-        while not self.__all_crawl_finish:
-            get_new_tasks = False
-            with self.__lock, contextlib.suppress(queue.Empty):
-                task: CrawlerTask = self.__url_to_crawl.get_nowait()
-                self.__current_crawling_count += 1
-                get_new_tasks = True
-                
-            if not get_new_tasks:
-                time.sleep(1)
-                continue
-
-            self.__log(f'Worker {worker_id} handling "{task.method}-{task.url}" start, pending tasks: {self.__url_to_crawl.qsize()}.')
+        while True:
+            task: Optional[CrawlerTask] = self.__url_to_crawl.get()
+            if not task: break
+
+            self.__log(f'Worker {worker_id} handling "{task.method}-{task.url}" start, pending tasks: {len(self.__url_to_crawl)}.')
     
             response = self.__request_with_retry(session, task.method, task.url)
-            task.callback(task.url, response)
 
-            self.__log(f'Worker {worker_id} handling "{task.method}-{task.url}" finish, pending tasks: {self.__url_to_crawl.qsize()}.')
-            
-            with self.__lock:
-                self.__current_crawling_count -= 1
+            throttled = self.__url_to_crawl.release(
+                task,
+                response.status_code if response is not None else None,
+                response.headers.get('Retry-After') if response is not None else None,
+            )
+
+            try:
+                if throttled and task.n_throttled < self.__config.n_retries:
+                    task.n_throttled += 1
+                    self.__url_to_crawl.put(task, front=True)
+                    self.__log(f'Worker {worker_id} handling "{task.method}-{task.url}" throttled, retry later.')
+                else:
+                    task.callback(task.url, response)
+                    self.__log(f'Worker {worker_id} handling "{task.method}-{task.url}" finish, pending tasks: {len(self.__url_to_crawl)}.')
+            except Exception as err:
+                # e.g. connection broken while reading streamed body.
+                self.__log(f'Worker {worker_id} handling "{task.method}-{task.url}" error: "{err}".')
+            finally:
+                # Unread streamed body is discarded, connection returns to pool.
+                if response is not None: response.close()
 
-                if self.__current_crawling_count == 0 and self.__url_to_crawl.empty():
-                    self.__all_crawl_finish = True
+                # Tasks created by callback are put, crawl may finish now.
+                self.__url_to_crawl.task_done(task)
 
-    def __page_parse_handler(self, url: str, response: Optional[requests.Response]):
+    def __page_parse_handler(self, url: str, response: Optional[requests.Response], predicted_html: bool = False):
+        '''`predicted_html`: requested by GET without HEAD, as link type inference predicted an html page.'''
         if not response: return False
+        if response.status_code == 304: return self.__reuse_cached_page(url)
         if response.status_code != 200: return False
 
-        page_html = response.text
-        links = self.__parse_page(url, page_html)
+        # Links may be requested by GET without HEAD, body is streamed and only read if html.
+        is_html = response.headers.get('Content-Type', '').startswith('text/html')
+        self.__link_classifier.record(url, is_html)
+        if not is_html:
+            if predicted_html:
+                with self.__lock:
+                    self.__n_mispredicted += 1
+            return False
+
+        self.validator_cache.update(self.graph_manager.get_id_by_url(url),
+                                    response.headers.get('ETag'),
+                                    response.headers.get('Last-Modified'))
+
+        links = self.__parse_page(url, response)
+        self.__add_page_links(url, links)
 
+        return True
+
+    def __reuse_cached_page(self, url: str) -> bool:
+        '''Page not modified since previous crawl, reuse its hyperlinks.'''
+        entry = self.validator_cache.get(url)
+        if not entry: return False
+
+        self.validator_cache.update(self.graph_manager.get_id_by_url(url),
+                                    entry.etag,
+                                    entry.last_modified)
+        self.__add_page_links(url, entry.links)
+        self.__log(f'"{url}" not modified, reuse {len(entry.links)} cached links.')
+
+        return True
+
+    def __add_page_links(self, url: str, links: List[str]) -> None:
         self.graph_manager._add_links(url, links)
         url_ids = [self.graph_manager.get_id_by_url(link)
                    for link in links]
 
         with self.__lock:
             # Prevent same link in multiple threads obtain "url not checked" state.
-            urls_to_check = [link
+            # Tasks are put with lock held, so a checkpoint never sees checked urls without their tasks.
+            urls_to_check = [(link, url_id)
                              for link, url_id in zip(links, url_ids)
                              if url_id not in self.__url_check_created]
-            self.__url_check_created.update(url_ids)
+            self.__url_check_created.update(url_id for _, url_id in urls_to_check)
+            self.__url_check_created_new.extend(url_id for _, url_id in urls_to_check)
         
-        for link in urls_to_check:
-            if not self.__url_filter(link): continue
-
-            self.__url_to_crawl.put(CrawlerTask(
-                method   = 'HEAD',
-                url      = link,
-                callback = self.__url_check_handler
-            ))
-
-            self.__log(f'Add "HEAD-{link}" to queue, pending tasks: {self.__url_to_crawl.qsize()}.')
-
-        return True
+            for link, _ in urls_to_check:
+                if not self.__url_filter(link): continue
+
+                link_kind = self.__classify_link(link)
+                if link_kind == LinkKind.HTML:
+                    method, callback = 'GET', partial(self.__page_parse_handler, predicted_html=True)
+                    self.__n_requests_saved += 1
+                elif link_kind == LinkKind.ASSET and self.__config.skip_asset_requests:
+                    # Resource node is in graph already, nothing to request.
+                    self.__n_requests_saved += 1
+                    continue
+                else:
+                    method, callback = 'HEAD', self.__url_check_handler
+
+                self.__url_to_crawl.put(CrawlerTask(
+                    method   = method,
+                    url      = link,
+                    callback = callback
+                ))
+
+                self.__log(f'Add "{method}-{link}" to queue, pending tasks: {len(self.__url_to_crawl)}.')
+
+    def __classify_link(self, url: str) -> LinkKind:
+        if not self.__config.infer_link_type: return LinkKind.UNKNOWN
+        if url in self.validator_cache: return LinkKind.HTML
+        return self.__link_classifier.classify(url)
 
     def __url_check_handler(self, url: str, response: Optional[requests.Response]):
         if not response: return
+        elif response.status_code == 304: return self.__reuse_cached_page(url)
         elif response.status_code != 200: return
-        elif not response.headers.get('Content-Type', '').startswith('text/html'): return
+
+        is_html = response.headers.get('Content-Type', '').startswith('text/html')
+        self.__link_classifier.record(url, is_html)
+        if not is_html: return
 
         self.__url_to_crawl.put(CrawlerTask(
             method   = 'GET',
@@ -142,7 +309,7 @@ class Crawler:
             callback = self.__page_parse_handler
         ))
         
-        self.__log(f'Add "GET-{url}" to queue, pending tasks: {self.__url_to_crawl.qsize()}.')
+        self.__log(f'Add "GET-{url}" to queue, pending tasks: {len(self.__url_to_crawl)}.')
 
     def __get_session(self, worker_id: int) -> requests.Session:
         if self.__config.proxies:
@@ -176,7 +343,8 @@ class Crawler:
         if url in self.__index_urls_set: return url
 
         url_id = self.graph_manager.get_id_by_url(url)
-        referer_id = self.graph_manager.get_rev_links_by_id(url_id)[0]
+        referer_id = self.graph_manager.get_referer_id(url_id)
+        if referer_id is None: return url
         
         return self.graph_manager.get_url_by_id(referer_id)
 
@@ -185,20 +353,22 @@ class Crawler:
                              http_method_name: str, 
                              url: str) -> Optional[requests.Response]:
         
-        time.sleep(self.__config.per_thread_request_gap)
         referer = self.__get_referer(url)
-        headers = {}
+        headers = self.validator_cache.get_request_headers(url)
         headers['Referer'] = referer
         if url_to_origin(url) != url_to_origin(referer):
             headers['Origin'] = url_to_origin(referer)
 
         for retry_delay in self.__EXP_DELAY:
             try:
+                with self.__lock:
+                    self.__n_requests += 1
                 return session.request(
                     http_method_name, 
                     url = url,
                     headers = headers,
                     timeout = self.__config.timeout,
+                    stream = True,
                 )
             except requests.exceptions.Timeout:
                 self.__log(f'Request "{url}" timout.')
@@ -208,21 +378,9 @@ class Crawler:
 
         return None
 
-    def __parse_page(self, url: str, page_html: str) -> List[str]:
-        links = (
-            re.findall(
-                'href="((?:http:|https:|)[^":]+)"', 
-                page_html
-            ) + 
-            re.findall(
-                "href='((?:http:|https:|)[^':]+)'", 
-                page_html
-            )
-        )
-        links = [
-            to_abs_url(url, link)
-            for link in links
-        ]
-        links = [remove_fragment(link) for link in links if link]
-        links = list(set(links))
-        return links
\ No newline at end of file
+    def __parse_page(self, url: str, response: requests.Response) -> List[str]:
+        # Body is parsed while being received, instead of loading `response.text` at once.
+        return list(iter_links(url,
+                               response.iter_content(self.__PARSE_CHUNK_SIZE),
+                               response.encoding,
+                               self.__config.max_page_size))
\ No newline at end of file
@@ -0,0 +1,74 @@
+import math
+import threading
+
+from typing import Any, Dict, List, Optional
+
+from .scheduler import HostScheduler
+
+class Frontier:
+    '''Thread-safe blocking frontier over `HostScheduler`, with termination detection. \n
+    A task taken by `get` is in flight until `task_done` is called, tasks pushed in between
+    (e.g. links found in the page) keep the crawl alive. Once no task is pending or in flight,
+    `get` returns None in every worker.'''
+
+    def __init__(self, scheduler: HostScheduler):
+        self.__scheduler = scheduler
+        self.__condition = threading.Condition()
+
+        # Variables that require `self.__condition` protection.
+        self.__in_flight: Dict[Any, int] = {}
+        '''In-flight tasks and their count, a retrying task may be taken again before its `task_done`.'''
+        self.__finished = False
+
+    def __len__(self) -> int:
+        '''Number of pending tasks.'''
+        return len(self.__scheduler)
+
+    def put(self, task: Any, front: bool = False) -> None:
+        with self.__condition:
+            self.__scheduler.push(task, front)
+            self.__condition.notify()
+
+    def get(self) -> Optional[Any]:
+        '''Block until the host of a pending task is ready. \n
+        **return** The task, or None if crawl finished.'''
+        with self.__condition:
+            while not self.__finished:
+                task, wait_time = self.__scheduler.pop()
+                if task:
+                    self.__in_flight[task] = self.__in_flight.get(task, 0) + 1
+                    return task
+
+                if not self.__in_flight and len(self.__scheduler) == 0:
+                    self.__finished = True
+                    self.__condition.notify_all()
+                    break
+
+                # Wait for the nearest host, or `put`, `release` and `task_done` notification.
+                self.__condition.wait(None if math.isinf(wait_time) else wait_time)
+            return None
+
+    def release(self,
+                task: Any,
+                status_code: Optional[int] = None,
+                retry_after: Optional[str] = None) -> bool:
+        '''Release the host connection of task, see `HostScheduler.release`.'''
+        with self.__condition:
+            throttled = self.__scheduler.release(task, status_code, retry_after)
+            self.__condition.notify()
+            return throttled
+
+    def task_done(self, task: Any) -> None:
+        '''Mark a task from `get` finished, after all tasks it creates are put.'''
+        with self.__condition:
+            self.__in_flight[task] -= 1
+            if self.__in_flight[task] == 0:
+                del self.__in_flight[task]
+            if not self.__in_flight and len(self.__scheduler) == 0:
+                self.__finished = True
+                self.__condition.notify_all()
+
+    def snapshot(self) -> List[Any]:
+        '''Get pending and in-flight tasks, i.e. tasks not finished yet.'''
+        with self.__condition:
+            return list(dict.fromkeys([*self.__in_flight, *self.__scheduler]))
@@ -0,0 +1,156 @@
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+
+import numpy as np
+
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+GRAPH_FILE_MAGIC = b'GRAPHMGR'
+GRAPH_FILE_VERSION = 1
+
+_SECTIONS = ['csr_indptr', 'csr_indices', 'csc_indptr', 'csc_indices', 'html_ids', 'url_offsets', 'url_data', 'canonicalizer']
+_HEADER = struct.Struct('<8sII3Q' + 'QQ' * len(_SECTIONS))
+'''Magic, version, reserved, number of urls, links and html pages, then `(offset, size)` of each section.'''
+_ALIGNMENT = 8
+_TYPECODES = {'csr_indptr': 'q', 'csr_indices': 'i', 'csc_indptr': 'q', 'csc_indices': 'i',
+              'html_ids': 'i', 'url_offsets': 'q'}
+'''Typecodes of array sections, stored little-endian.'''
+
+class UrlTable:
+    '''Read-only url strings of a graph file, url `i` is UTF-8 bytes `data[offsets[i]:offsets[i + 1]]`.'''
+
+    def __init__(self, offsets: Sequence[int], data: memoryview):
+        self.__offsets = offsets
+        self.__data = data
+
+    def __len__(self) -> int:
+        return len(self.__offsets) - 1
+
+    def __getitem__(self, id: int) -> str:
+        return str(self.__data[self.__offsets[id]:self.__offsets[id + 1]], 'utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[id] for id in range(len(self)))
+
+class UrlIndex:
+    '''Read-only mapping from canonical url to id, built from `UrlTable` on first lookup,
+    so opening a graph file does not pay for hashing every url.'''
+
+    def __init__(self, urls: UrlTable, canonicalizer: Optional[Callable[[str], str]]):
+        self.__urls = urls
+        self.__canonicalizer = canonicalizer
+        self.__index: Optional[Dict[str, int]] = None
+
+    def to_dict(self) -> Dict[str, int]:
+        if self.__index is None:
+            canonicalizer = self.__canonicalizer or (lambda url: url)
+            self.__index = {canonicalizer(url): id for id, url in enumerate(self.__urls)}
+        return self.__index
+
+    def get(self, key: str, default: Optional[int] = None) -> Optional[int]:
+        return self.to_dict().get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.to_dict()
+
+    def __getitem__(self, key: str) -> int:
+        return self.to_dict()[key]
+
+    def __len__(self) -> int:
+        return len(self.__urls)
+
+class GraphFile(NamedTuple):
+    '''Contents of a graph file, arrays are views of the memory-mapped file.'''
+    csr: Tuple[Sequence[int], Sequence[int]]
+    '''`(indptr, indices)` of forward links, targets of a page sorted by id.'''
+    csc: Tuple[Sequence[int], Sequence[int]]
+    '''`(indptr, indices)` of reversed links, sources of a url sorted by id.'''
+    html_ids: Sequence[int]
+    urls: UrlTable
+    canonicalizer: Optional[Callable[[str], str]]
+
+def is_graph_file(path: str) -> bool:
+    '''Check if file starts with graph file magic, other files are pickled `GraphManager`.'''
+    with open(path, 'rb') as file:
+        return file.read(len(GRAPH_FILE_MAGIC)) == GRAPH_FILE_MAGIC
+
+def write_graph_file(path: str,
+                     csr: Tuple[Sequence[int], Sequence[int]],
+                     csc: Tuple[Sequence[int], Sequence[int]],
+                     html_ids: Sequence[int],
+                     urls: Sequence[str],
+                     canonicalizer: Optional[Callable[[str], str]] = None) -> None:
+    '''Write graph file, a header followed by 8-byte aligned sections:
+    * `csr_indptr`, `csr_indices`, `csc_indptr`, `csc_indices`: int64 offsets and int32 ids of compressed links.
+    * `html_ids`: int32 ids of html pages, in order of being added.
+    * `url_offsets`, `url_data`: int64 offsets into UTF-8 url strings, url `i` ends where url `i + 1` starts.
+    * `canonicalizer`: pickled url canonicalizer, empty if None.'''
+    encoded_urls = [url.encode('utf-8', 'surrogatepass') for url in urls]
+    url_offsets = np.zeros(len(encoded_urls) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter((len(url) for url in encoded_urls), dtype=np.int64, count=len(encoded_urls)),
+              out=url_offsets[1:])
+
+    sections = {
+        'csr_indptr': np.asarray(csr[0], dtype='<i8').tobytes(),
+        'csr_indices': np.asarray(csr[1], dtype='<i4').tobytes(),
+        'csc_indptr': np.asarray(csc[0], dtype='<i8').tobytes(),
+        'csc_indices': np.asarray(csc[1], dtype='<i4').tobytes(),
+        'html_ids': np.asarray(html_ids, dtype='<i4').tobytes(),
+        'url_offsets': url_offsets.astype('<i8').tobytes(),
+        'url_data': b''.join(encoded_urls),
+        'canonicalizer': pickle.dumps(canonicalizer) if canonicalizer else b'',
+    }
+
+    layout: List[int] = []
+    offset = _HEADER.size
+    for name in _SECTIONS:
+        offset += -offset % _ALIGNMENT
+        layout += [offset, len(sections[name])]
+        offset += len(sections[name])
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(GRAPH_FILE_MAGIC, GRAPH_FILE_VERSION, 0,
+                                len(url_offsets) - 1, len(csr[1]), len(html_ids), *layout))
+        for name, section_offset in zip(_SECTIONS, layout[::2]):
+            file.write(b'\0' * (section_offset - file.tell()))
+            file.write(sections[name])
+
+def open_graph_file(path: str) -> GraphFile:
+    '''Memory-map graph file, pages are loaded on access and shared between processes opening the same file.'''
+    with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, _, n_urls, n_links, n_html, *layout = _HEADER.unpack_from(buffer)
+    if magic != GRAPH_FILE_MAGIC:
+        raise ValueError(f'"{path}" is not a graph file.')
+    if version != GRAPH_FILE_VERSION:
+        raise ValueError(f'Graph file version {version} of "{path}" is not supported, expect {GRAPH_FILE_VERSION}.')
+
+    view = memoryview(buffer)
+    sections = {
+        name: view[offset:offset + size]
+        for name, offset, size in zip(_SECTIONS, layout[::2], layout[1::2])
+    }
+    arrays = {name: _cast(sections[name], typecode) for name, typecode in _TYPECODES.items()}
+    assert len(arrays['url_offsets']) == n_urls + 1 and len(arrays['csr_indices']) == n_links
+    assert len(arrays['html_ids']) == n_html
+
+    return GraphFile(
+        csr           = (arrays['csr_indptr'], arrays['csr_indices']),
+        csc           = (arrays['csc_indptr'], arrays['csc_indices']),
+        html_ids      = arrays['html_ids'],
+        urls          = UrlTable(arrays['url_offsets'], sections['url_data']),
+        canonicalizer = pickle.loads(sections['canonicalizer']) if len(sections['canonicalizer']) else None,
+    )
+
+def _cast(section: memoryview, typecode: str) -> Sequence[int]:
+    '''View little-endian section as integers, copied only on big-endian machines.'''
+    if sys.byteorder == 'little':
+        return section.cast(typecode)
+    values = array(typecode)
+    values.frombytes(section)
+    values.byteswap()
+    return values
@@ -1,25 +1,48 @@
 import threading
 import pickle
+from array import array
+from bisect import bisect_left
+from itertools import chain
 
-from typing import List, Tuple, Dict, Set, NamedTuple, Any
+import numpy as np
+
+from typing import List, Tuple, Dict, Set, NamedTuple, Any, Callable, Optional, Sequence
+
+from .graph_file import GraphFile, UrlIndex, UrlTable, is_graph_file, open_graph_file, write_graph_file
 
 class PipelineUpdate(NamedTuple):
     n_urls: int
     new_links: List[Tuple[int, int]]
+    new_html_ids: List[int]
 
 class GraphManager:
     '''Record hyperlink graph.
     * Url are nodes in graph, represented by numeric id.
     * Hyperlink are directed edges in graph, represented by tuple (source node id, dest node id).
+    * Urls with the same canonical form given by `canonicalizer` share one node.
+
+    If `compact`, edges are stored in two `array('i')` buffers of source and target ids, instead of
+    per node lists and sets. `freeze` converts the graph into read-only CSR (forward) and CSC (reversed) arrays.
+    Graphs loaded from binary graph files are frozen, with arrays and urls memory-mapped.
+
+    Thread-safe: new urls and links of a page are locked by stripes of url hash and source id,
+    single `dict`/`list` operations on shared containers rely on being atomic.
     '''
+
+    __N_STRIPES = 64
     
-    def __init__(self):
+    def __init__(self, canonicalizer: Optional[Callable[[str], str]] = None, compact: bool = False):
         self.__lock = threading.Lock()
+        '''Protect pipeline cursors.'''
+        self.__init_locks()
+
+        self.__canonicalizer = canonicalizer
+        '''Map url to its canonical form, e.g. `UrlCanonicalizer`. None for comparing url strings literally.'''
 
         self.__url_to_id: Dict[str, int] = {}
-        '''Mapping between url and numeric id.'''
+        '''Mapping between canonical url and numeric id.'''
         self.__id_to_url: Dict[int, str] = {}
-        '''Mapping between url id and url.'''
+        '''Mapping between url id and the url first seen, which is requested and output.'''
         
         self.__links_list: List[List[int]] = []
         '''Directed adjacency list of graph.'''
@@ -32,33 +55,94 @@ class GraphManager:
         '''Collection of all edges (i.e. hyperlink relations). \n
         An edge tuple (`a`, `b`) represent a hyperlink in page `url(a)` links to `url(b)`.'''
 
-        self.__pipeline_all_links_from: int = 0
-        '''Index of `self.__all_links`, represent where next pipeline update should start from.'''
+        self.__pipeline_cursors: Dict[str, Tuple[int, int]] = {}
+        '''Indices of `self.__all_links` and `self.__html_list` of each pipeline consumer,
+        represent where its next pipeline update should start from.'''
 
         self.__is_html: Set[int] = set()
         '''Url id of html pages.'''
+        self.__html_list: List[int] = []
+        '''Url id of html pages, in order of being added.'''
+
+        self.__compact = compact
+        self.__frozen = False
+        self.__edge_sources = array('i')
+        '''Source ids of edges in compact mode, in order of being added, i.e. `self.__all_links` of list mode.
+        None if loaded from graph file, whose edges are in CSR order.'''
+        self.__edge_targets = array('i')
+        '''Target ids of edges in compact mode.'''
+        self.__first_referers = array('i')
+        '''Id of the first page linking to each url in compact mode before `freeze`, -1 if none.'''
+        self.__csr: Tuple[Sequence[int], Sequence[int]] = None
+        '''`(indptr, indices)` of forward links after `freeze`, targets of a page sorted by id.
+        `array` or `memoryview` of graph file.'''
+        self.__csc: Tuple[Sequence[int], Sequence[int]] = None
+        '''`(indptr, indices)` of reversed links after `freeze`, sources of a url sorted by id.'''
+
+    def __init_locks(self):
+        self.__id_lock = threading.Lock()
+        '''Protect id allocation, held shortly for each new url.'''
+        self.__url_locks = [threading.Lock() for _ in range(self.__N_STRIPES)]
+        '''Striped by hash of canonical url, prevent a new url from getting two ids.'''
+        self.__link_locks = [threading.Lock() for _ in range(self.__N_STRIPES)]
+        '''Striped by source url id, protect links of a page.'''
+        self.__edge_lock = threading.Lock()
+        '''Protect edge buffers of compact mode, so edges of a page are appended to both buffers at once.'''
 
     def __getstate__(self):
         state = self.__dict__.copy()
 
-        # Exclude self.__lock to pickle
-        state.pop(f'_{self.__class__.__name__}__lock')
+        # Exclude locks to pickle
+        for name in ['lock', 'id_lock', 'url_locks', 'link_locks', 'edge_lock']:
+            state.pop(f'_{self.__class__.__name__}__{name}')
+
+        # Memory-mapped graph file is copied into memory.
+        prefix = f'_{self.__class__.__name__}__'
+        if isinstance(self.__id_to_url, UrlTable):
+            state[prefix + 'id_to_url'] = dict(enumerate(self.__id_to_url))
+            state[prefix + 'url_to_id'] = self.__url_to_id.to_dict()
+            state[prefix + 'html_list'] = list(self.__html_list)
+            state[prefix + 'csr'] = tuple(array(typecode, values) for typecode, values in zip('qi', self.__csr))
+            state[prefix + 'csc'] = tuple(array(typecode, values) for typecode, values in zip('qi', self.__csc))
 
         return state
     
     def __setstate__(self, state):
         self.__dict__.update(state)
         self.__lock = threading.Lock()
+        self.__init_locks()
+
+        # Files saved before pipeline consumers and html order are recorded.
+        if not hasattr(self, f'_{self.__class__.__name__}__html_list'):
+            self.__html_list = sorted(self.__is_html)
+        if not hasattr(self, f'_{self.__class__.__name__}__canonicalizer'):
+            self.__canonicalizer = None
+        if not hasattr(self, f'_{self.__class__.__name__}__compact'):
+            self.__compact = self.__frozen = False
+            self.__edge_sources, self.__edge_targets, self.__first_referers = array('i'), array('i'), array('i')
+            self.__csr = self.__csc = None
+        if not hasattr(self, f'_{self.__class__.__name__}__pipeline_cursors'):
+            all_links_from = self.__dict__.pop(f'_{self.__class__.__name__}__pipeline_all_links_from', 0)
+            self.__pipeline_cursors = {'default': (all_links_from, 0)}
 
     def _add_links(self, source_url: str, target_urls: List[str]):
         '''Add hyperlinks `target_urls` found in page `source_url`. \n
         Note: non-existing url nodes are created automatically.'''
         
         source_id = self.get_id_by_url(source_url)
-        target_ids = [self.get_id_by_url(target_url) for target_url in target_urls]
+        target_ids = self.intern_many(target_urls)
 
-        with self.__lock:
-            self.__is_html.add(source_id)
+        with self.__link_locks[source_id % self.__N_STRIPES]:
+            if self.__frozen: raise RuntimeError('Graph is frozen, no link can be added.')
+
+            has_links = source_id in self.__is_html
+            if not has_links:
+                self.__is_html.add(source_id)
+                self.__html_list.append(source_id)
+
+            if self.__compact:
+                self.__add_links_compact(source_id, target_ids, has_links)
+                return
 
             for target_id in target_ids:
                 if target_id in self.__links_set[source_id]: continue
@@ -68,76 +152,294 @@ class GraphManager:
                 self.__rev_links_list[target_id].append(source_id)
                 self.__all_links.append((source_id, target_id))
 
+    def __add_links_compact(self, source_id: int, target_ids: List[int], has_links: bool) -> None:
+        # Links of a page are usually added once, existing links are only looked up otherwise.
+        existing = set(self.get_links_by_id(source_id)) if has_links else set()
+        new_target_ids = array('i')
+        for target_id in target_ids:
+            if target_id in existing: continue
+            existing.add(target_id)
+            new_target_ids.append(target_id)
+            if self.__first_referers[target_id] < 0:
+                self.__first_referers[target_id] = source_id
+
+        with self.__edge_lock:
+            self.__edge_sources.extend(array('i', [source_id]) * len(new_target_ids))
+            self.__edge_targets.extend(new_target_ids)
+
+    def freeze(self) -> None:
+        '''Convert links into read-only CSR and CSC arrays, e.g. after crawl finishes. \n
+        Per node lists and sets of list mode are released. New urls and links can not be added after.'''
+        with self.__id_lock, self.__edge_lock:
+            if self.__frozen: return
+
+            n_urls = len(self.__id_to_url)
+            if not self.__compact:
+                self.__edge_sources = array('i', (source for source, _ in self.__all_links))
+                self.__edge_targets = array('i', (target for _, target in self.__all_links))
+                self.__first_referers = array('i', (rev_links[0] if rev_links else -1 for rev_links in self.__rev_links_list))
+                self.__links_list, self.__links_set, self.__rev_links_list, self.__all_links = [], [], [], []
+
+            # Edge buffers are kept in order of being added, for pipeline updates.
+            sources = np.frombuffer(self.__edge_sources, dtype=np.intc)
+            targets = np.frombuffer(self.__edge_targets, dtype=np.intc)
+            self.__csr = self.__to_compressed(sources, targets, n_urls)
+            self.__csc = self.__to_compressed(targets, sources, n_urls)
+            del sources, targets
+            # Referers are read from CSC after freeze.
+            self.__first_referers = array('i')
+            self.__compact = self.__frozen = True
+
+    @property
+    def frozen(self) -> bool:
+        return self.__frozen
+
+    @staticmethod
+    def __to_compressed(rows: np.ndarray, columns: np.ndarray, n_rows: int) -> Tuple[array, array]:
+        '''**return** `(indptr, indices)`, columns of row `i` are `indices[indptr[i]:indptr[i + 1]]`, sorted. \n
+        Stored in `array` rather than `np.ndarray`, so lookups return python ints without per call numpy overhead.'''
+        order = np.lexsort((columns, rows))
+        indptr, indices = array('q'), array('i')
+        indptr.frombytes(np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n_rows))]).astype(np.int64).tobytes())
+        indices.frombytes(columns[order].astype(np.intc).tobytes())
+        return indptr, indices
+
+    def __scan_edges(self, key_buffer: array, value_buffer: array, id: int) -> List[int]:
+        '''Values of edges whose key is `id`, by scanning buffers of compact mode before `freeze`.'''
+        with self.__edge_lock:
+            # Buffer views must be released before buffers grow.
+            keys = np.frombuffer(key_buffer, dtype=np.intc)
+            values = np.frombuffer(value_buffer, dtype=np.intc)
+            result = values[keys == id].tolist()
+            del keys, values
+        return result
+
     def url_exists(self, url: str) -> bool:
         '''Check if a url node exists.'''
-        return url in self.__url_to_id
+        return self.get_canonical_url(url) in self.__url_to_id
+
+    def get_canonical_url(self, url: str) -> str:
+        '''Get canonical form of url, urls of the same canonical form are the same node.'''
+        return self.__canonicalizer(url) if self.__canonicalizer else url
     
     def link_exists(self, source_id: int, target_id: int):
         '''Check hyperlink to `url(target_id)` exists in page `url(source_id)`'''
-        return target_id in self.__links_set[source_id]
+        if not self.__compact:
+            return target_id in self.__links_set[source_id]
+        if not self.__frozen:
+            return target_id in self.get_links_by_id(source_id)
+
+        indptr, indices = self.__csr
+        end = indptr[source_id + 1]
+        index = bisect_left(indices, target_id, indptr[source_id], end)
+        return index < end and indices[index] == target_id
 
     def get_id_by_url(self, url: str) -> int:
         '''Get url id by url string. New id created automatically if url node not exists.'''
-        if url in self.__url_to_id: 
-            return self.__url_to_id[url]
+        key = self.get_canonical_url(url)
+        id = self.__url_to_id.get(key)
+        if id is not None: return id
 
-        with self.__lock:
-            id = len(self.__url_to_id)
-            self.__url_to_id[url] = id
+        with self.__url_locks[hash(key) % self.__N_STRIPES]:
+            return self.__intern(key, url)
+
+    def intern_many(self, urls: List[str]) -> List[int]:
+        '''Get url ids of urls, same as `get_id_by_url` for each url. \n
+        New urls are created with each url lock stripe taken once.'''
+        keys = [self.get_canonical_url(url) for url in urls]
+        ids = [self.__url_to_id.get(key) for key in keys]
+
+        missing_by_stripe: Dict[int, List[int]] = {}
+        for index, id in enumerate(ids):
+            if id is None:
+                missing_by_stripe.setdefault(hash(keys[index]) % self.__N_STRIPES, []).append(index)
+
+        for stripe, indices in missing_by_stripe.items():
+            with self.__url_locks[stripe]:
+                for index in indices:
+                    ids[index] = self.__intern(keys[index], urls[index])
+
+        return ids
+
+    def __intern(self, key: str, url: str) -> int:
+        '''Create url node if not exists, url lock stripe of `key` must be held.'''
+        # Checked again, another thread may create it before the lock is acquired.
+        id = self.__url_to_id.get(key)
+        if id is not None: return id
+
+        with self.__id_lock:
+            if self.__frozen: raise RuntimeError(f'Graph is frozen, url "{url}" can not be added.')
+
+            id = len(self.__id_to_url)
+            if self.__compact:
+                self.__first_referers.append(-1)
+            else:
+                self.__links_set.append(set())
+                self.__links_list.append(list())
+                self.__rev_links_list.append(list())
             self.__id_to_url[id] = url
-            self.__links_set.append(set())
-            self.__links_list.append(list())
-            self.__rev_links_list.append(list())
 
+        # Published after its node is complete, readers never see an id without adjacency lists.
+        self.__url_to_id[key] = id
         return id
     
     def get_url_by_id(self, id: int) -> str:
         '''Get url string by url id.'''
         return self.__id_to_url[id]
     
-    def get_links_by_id(self, id: int) -> List[int]:
-        '''Get all hyperlink url ids in page `url(id)`.'''
-        return self.__links_list[id]
+    def get_links_by_id(self, id: int) -> Sequence[int]:
+        '''Get all hyperlink url ids in page `url(id)`. An `array('i')` copy sorted by id after `freeze`.'''
+        if not self.__compact:
+            return self.__links_list[id]
+        if not self.__frozen:
+            return self.__scan_edges(self.__edge_sources, self.__edge_targets, id)
+        return self.__row(self.__csr, id)
     
-    def get_rev_links_by_id(self, id: int) -> List[int]:
-        '''Get all referer url ids of `url(id)`.'''
-        return self.__rev_links_list[id]
+    def get_rev_links_by_id(self, id: int) -> Sequence[int]:
+        '''Get all referer url ids of `url(id)`. An `array('i')` copy sorted by id after `freeze`.'''
+        if not self.__compact:
+            return self.__rev_links_list[id]
+        if not self.__frozen:
+            return self.__scan_edges(self.__edge_targets, self.__edge_sources, id)
+        return self.__row(self.__csc, id)
+
+    @staticmethod
+    def __row(compressed: Tuple[Sequence[int], Sequence[int]], id: int) -> array:
+        '''Copy row `id` of CSR / CSC, also from memory-mapped graph file.'''
+        indptr, indices = compressed
+        row = indices[indptr[id]:indptr[id + 1]]
+        return row if isinstance(row, array) else array('i', row)
+
+    def get_referer_id(self, id: int) -> Optional[int]:
+        '''Get id of the first page linking to `url(id)`, None if no page links to it.
+        The page of smallest id after `freeze`.'''
+        if not self.__compact:
+            rev_links = self.__rev_links_list[id]
+            return rev_links[0] if rev_links else None
+        if self.__frozen:
+            indptr, indices = self.__csc
+            return indices[indptr[id]] if indptr[id] < indptr[id + 1] else None
+        referer_id = self.__first_referers[id]
+        return referer_id if referer_id >= 0 else None
     
     def get_url_count(self) -> int:
         '''Get current number of url nodes.'''
-        return len(self.__url_to_id)
+        return len(self.__id_to_url)
 
-    def pipeline_get_update(self) -> PipelineUpdate:
-        '''Get graph modification since last call. \n
+    def pipeline_get_update(self, consumer: str = 'default') -> PipelineUpdate:
+        '''Get graph modification since last call of the same `consumer`. \n
         **return** NamedTuple(
             n_urls: Current number of url nodes.
             new_links: A list of newly added hyperlinks.
+            new_html_ids: A list of url ids newly known as html pages.
         )'''
         with self.__lock:
-            all_links_from = self.__pipeline_all_links_from
-            self.__pipeline_all_links_from = len(self.__all_links)
+            # Nodes are counted after links and html pages, which only refer to existing nodes.
+            all_links_to, html_list_to = self.__get_link_count(), len(self.__html_list)
+            n_urls = len(self.__id_to_url)
+            all_links_from, html_list_from = self.__pipeline_cursors.get(consumer, (0, 0))
+            self.__pipeline_cursors[consumer] = (all_links_to, html_list_to)
             
             return PipelineUpdate(
-                len(self.__url_to_id),
-                self.__all_links[all_links_from:]
+                n_urls,
+                self.__get_links_between(all_links_from, all_links_to),
+                list(self.__html_list[html_list_from:html_list_to]),
             )
+
+    def __get_link_count(self) -> int:
+        if not self.__compact: return len(self.__all_links)
+        if self.__frozen: return len(self.__csr[1])
+        with self.__edge_lock:
+            return len(self.__edge_targets)
+
+    def __get_links_between(self, start: int, end: int) -> List[Tuple[int, int]]:
+        '''Edges from `start`-th to `end`-th added, in the form of `self.__all_links`.'''
+        if not self.__compact: return self.__all_links[start:end]
+        if self.__edge_sources is None:
+            # Loaded from graph file, edges are in CSR order.
+            indptr, indices = self.__csr
+            sources = np.searchsorted(np.frombuffer(indptr, dtype=np.int64), np.arange(start, end), side='right') - 1
+            return list(zip(sources.tolist(), indices[start:end]))
+        with self.__edge_lock:
+            sources, targets = self.__edge_sources[start:end], self.__edge_targets[start:end]
+        return list(zip(sources, targets))
+
+    def get_link_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        '''Get `(sources, targets)` int32 arrays of all hyperlinks, e.g. for vectorized analysis. \n
+        After `freeze`, links are sorted by target and `sources` is a view of CSC arrays without copy.'''
+        if not self.__frozen:
+            return self.__get_edge_arrays()
+
+        indptr, indices = self.__csc
+        indptr = np.frombuffer(indptr, dtype=np.int64)
+        targets = np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+        return np.frombuffer(indices, dtype=np.int32), targets
+
+    def __get_edge_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        '''**return** `(sources, targets)` of all edges, copied.'''
+        if not self.__compact:
+            n_links = len(self.__all_links)
+            edges = np.fromiter(chain.from_iterable(self.__all_links[:n_links]), dtype=np.int32, count=2 * n_links)
+            edges = edges.reshape(n_links, 2)
+            return np.ascontiguousarray(edges[:, 0]), np.ascontiguousarray(edges[:, 1])
+        with self.__edge_lock:
+            return (np.frombuffer(self.__edge_sources, dtype=np.intc).astype(np.int32),
+                    np.frombuffer(self.__edge_targets, dtype=np.intc).astype(np.int32))
         
-    def save_to_file(self, output_file_name: str) -> None:
-        with open(output_file_name, 'wb') as output_file:
-            pickle.dump(self, output_file)
+    def save_to_file(self, output_file_name: str, binary: bool = False) -> None:
+        '''Save graph to file. Pickle keeps graph mutable, `binary` graph file is loaded frozen.'''
+        if not binary:
+            with open(output_file_name, 'wb') as output_file:
+                pickle.dump(self, output_file)
+            return
+
+        if self.__frozen:
+            csr, csc = self.__csr, self.__csc
+        else:
+            # Links are read before nodes, which they only refer to.
+            sources, targets = self.__get_edge_arrays()
+            n_urls = len(self.__id_to_url)
+            csr = self.__to_compressed(sources, targets, n_urls)
+            csc = self.__to_compressed(targets, sources, n_urls)
+
+        write_graph_file(output_file_name, csr, csc,
+                         self.__html_list[:len(self.__html_list)],
+                         [self.__id_to_url[id] for id in range(len(csr[0]) - 1)],
+                         self.__canonicalizer)
 
     @staticmethod
     def load_from_file(input_file_name: str) -> 'GraphManager':
+        '''Load graph saved by `save_to_file`. Binary graph file is memory-mapped, not read into memory.'''
+        if is_graph_file(input_file_name):
+            return GraphManager.__from_graph_file(open_graph_file(input_file_name))
+
         with open(input_file_name, 'rb') as input_file:
             return pickle.load(input_file)
+
+    @staticmethod
+    def __from_graph_file(graph_file: GraphFile) -> 'GraphManager':
+        graph_manager = GraphManager(graph_file.canonicalizer, compact=True)
+        graph_manager.__id_to_url = graph_file.urls
+        graph_manager.__url_to_id = UrlIndex(graph_file.urls, graph_file.canonicalizer)
+        # `self.__is_html` is only used to add links, which frozen graph does not allow.
+        graph_manager.__html_list = graph_file.html_ids
+        graph_manager.__csr, graph_manager.__csc = graph_file.csr, graph_file.csc
+        graph_manager.__edge_sources = graph_manager.__edge_targets = None
+        graph_manager.__frozen = True
+        return graph_manager
         
     def get_statistic(self) -> Dict[str, Any]:
-        with self.__lock:
-            n_html_page = len(self.__is_html)
-            n_resources = len(self.__url_to_id)
-            n_links = len(self.__all_links)
-            max_degree = max(len(link) for link in self.__links_list)
-            avg_degree = n_links / n_html_page
+        n_html_page = len(self.__html_list)
+        n_resources = len(self.__id_to_url)
+        n_links = self.__get_link_count()
+        if not self.__compact:
+            max_degree = max(len(link) for link in self.__links_list[:n_resources])
+        elif self.__frozen:
+            max_degree = int(np.diff(np.frombuffer(self.__csr[0], dtype=np.int64)).max())
+        else:
+            with self.__edge_lock:
+                max_degree = int(np.bincount(np.frombuffer(self.__edge_sources, dtype=np.intc)).max())
+        avg_degree = n_links / n_html_page
         return {
             'n_html_page': n_html_page,
             'n_resources': n_resources,
@@ -0,0 +1,76 @@
+import posixpath
+import threading
+from enum import Enum
+from urllib.parse import urlparse
+
+from typing import Dict, List
+
+HTML_EXTENSIONS = {'.html', '.htm', '.xhtml', '.php', '.asp', '.aspx', '.jsp', '.shtml'}
+
+ASSET_EXTENSIONS = {
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico', '.bmp', '.tif', '.tiff',
+    '.css', '.js', '.mjs', '.json', '.map', '.woff', '.woff2', '.ttf', '.otf', '.eot',
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.odt', '.ods', '.odp', '.txt', '.csv',
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.tar', '.exe', '.msi', '.dmg', '.iso',
+    '.mp3', '.mp4', '.m4a', '.wav', '.ogg', '.webm', '.avi', '.mov', '.mkv',
+}
+
+class LinkKind(Enum):
+    HTML = 'html'
+    '''Html page, GET directly.'''
+
+    ASSET = 'asset'
+    '''Non-html resource, never GET.'''
+
+    UNKNOWN = 'unknown'
+    '''Check `Content-Type` by HEAD first.'''
+
+class LinkClassifier:
+    '''Infer link type from url extension, or `Content-Type` statistics of urls with same path prefix. \n
+    Prefixes are host plus each parent directory of url path, deepest prefix with at least
+    `min_samples` observations decides if `threshold` of them agree.'''
+
+    def __init__(self, min_samples: int = 5, threshold: float = 0.95):
+        self.__min_samples = min_samples
+        self.__threshold = threshold
+
+        self.__lock = threading.Lock()
+        self.__prefix_stats: Dict[str, List[int]] = {}
+        '''Number of `[html, non-html]` urls observed under each prefix.'''
+
+    @staticmethod
+    def __get_prefixes(url: str) -> List[str]:
+        '''Path prefixes of url, deepest first.'''
+        url_parse = urlparse(url)
+        path = url_parse.path or '/'
+        directory = path[:path.rfind('/') + 1]
+
+        prefixes = []
+        while True:
+            prefixes.append(url_parse.netloc + directory)
+            if directory == '/': break
+            directory = directory[:directory.rstrip('/').rfind('/') + 1]
+        return prefixes
+
+    def classify(self, url: str) -> LinkKind:
+        extension = posixpath.splitext(urlparse(url).path)[1].lower()
+        if extension in HTML_EXTENSIONS: return LinkKind.HTML
+        if extension in ASSET_EXTENSIONS: return LinkKind.ASSET
+
+        with self.__lock:
+            for prefix in self.__get_prefixes(url):
+                n_html, n_other = self.__prefix_stats.get(prefix, (0, 0))
+                if n_html + n_other < self.__min_samples: continue
+
+                if n_html >= self.__threshold * (n_html + n_other): return LinkKind.HTML
+                if n_other >= self.__threshold * (n_html + n_other): return LinkKind.ASSET
+                return LinkKind.UNKNOWN
+
+        return LinkKind.UNKNOWN
+
+    def record(self, url: str, is_html: bool) -> None:
+        '''Record observed `Content-Type` of url.'''
+        with self.__lock:
+            for prefix in self.__get_prefixes(url):
+                stats = self.__prefix_stats.setdefault(prefix, [0, 0])
+                stats[0 if is_html else 1] += 1
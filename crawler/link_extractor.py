@@ -0,0 +1,126 @@
+import codecs
+import re
+from html import unescape
+
+from typing import Iterable, Iterator, List, Optional, Set, Union
+
+from .url_utils import to_abs_url, remove_fragment
+
+_HREF_VALUE = r'\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'<>]+))'
+'''Attribute value in double quotes, single quotes or unquoted.'''
+
+_HREF_PATTERN = re.compile('href' + _HREF_VALUE)
+'''Case-sensitive pattern is scanned by literal prefix, several times faster than ignoring case.'''
+_HREF_PATTERN_IGNORE_CASE = re.compile('href' + _HREF_VALUE, re.IGNORECASE)
+_BASE_PATTERN = re.compile(r'<base\b[^<>]*?\bhref' + _HREF_VALUE, re.IGNORECASE)
+
+class LinkExtractor:
+    '''Incremental hyperlink extractor, fed with chunks of page html. \n
+    Links are resolved against `<base href>` if given, fragment removed and deduplicated.
+    Text after `max_size` characters is ignored.'''
+
+    def __init__(self, url: str, max_size: int = 0):
+        self.__base_url = url
+        self.__max_size = max_size
+        self.__n_fed = 0
+        self.__carry = ''
+        '''Unfinished tag at the end of previous chunk.'''
+        self.__seen_values: Set[str] = set()
+        self.__seen_links: Set[str] = set()
+
+    @property
+    def truncated(self) -> bool:
+        return bool(self.__max_size) and self.__n_fed >= self.__max_size
+
+    def feed(self, chunk: str) -> List[str]:
+        '''Feed a chunk of html. \n
+        **return** Links newly found.'''
+        if self.truncated: return []
+        if self.__max_size:
+            chunk = chunk[:self.__max_size - self.__n_fed]
+        self.__n_fed += len(chunk)
+
+        text = self.__carry + chunk
+        # A tag is complete if another tag starts after it.
+        end = text.rfind('<')
+        if end <= 0:
+            end = 0 if len(text) < 65536 else len(text)
+        self.__carry = text[end:]
+
+        return self.__extract(text, end)
+
+    def close(self) -> List[str]:
+        '''Extract links in the remaining text, which is dropped if truncated.'''
+        text, self.__carry = self.__carry, ''
+        if self.truncated: return []
+        return self.__extract(text, len(text))
+
+    def __extract(self, text: str, end: int) -> List[str]:
+        base_ends = set()
+        if '<base' in text or '<BASE' in text:
+            for match in _BASE_PATTERN.finditer(text, 0, end):
+                base_ends.add(match.end())
+                value = self.__get_value(match)
+                self.__base_url = remove_fragment(to_abs_url(self.__base_url, value)) or self.__base_url
+
+        links = []
+        for match in _HREF_PATTERN.finditer(text, 0, end):
+            if match.end() not in base_ends: self.__add_link(match, links)
+        if 'HREF' in text or 'Href' in text:
+            for match in _HREF_PATTERN_IGNORE_CASE.finditer(text, 0, end):
+                if match.end() not in base_ends: self.__add_link(match, links)
+        return links
+
+    def __add_link(self, match: re.Match, links: List[str]) -> None:
+        raw_value = match.group(match.lastindex)
+        if raw_value in self.__seen_values: return
+        self.__seen_values.add(raw_value)
+
+        value = self.__get_value(match)
+        if not value: return
+
+        # Fragment is removed before joining, so `#id`-only links need no url parsing.
+        value = remove_fragment(value)
+        if not value:
+            link = remove_fragment(self.__base_url)
+        elif value.startswith(('http://', 'https://')) and '/.' not in value and not value.endswith('?'):
+            link = value
+        else:
+            link = to_abs_url(self.__base_url, value)
+        if not link: return
+        if link in self.__seen_links: return
+        self.__seen_links.add(link)
+        links.append(link)
+
+    @staticmethod
+    def __get_value(match: re.Match) -> str:
+        value = match.group(match.lastindex)
+        if '&' in value: value = unescape(value)
+        return value.strip()
+
+def iter_links(url: str,
+               chunks: Iterable[Union[bytes, str]],
+               encoding: Optional[str] = None,
+               max_size: int = 0) -> Iterator[str]:
+    '''Yield links of page `url` while chunks of the body are received. \n
+    Bytes chunks are decoded in `encoding` (UTF-8 if not given), reading stops after `max_size` characters.'''
+    decoder = None
+    extractor = LinkExtractor(url, max_size)
+
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                try:
+                    decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+                except LookupError:
+                    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            chunk = decoder.decode(chunk)
+
+        yield from extractor.feed(chunk)
+        if extractor.truncated: break
+
+    yield from extractor.close()
+
+def extract_links(url: str, page_html: str) -> List[str]:
+    '''Extract absolute, fragment-free and deduplicated hyperlinks from page `url`.'''
+    return list(iter_links(url, [page_html]))
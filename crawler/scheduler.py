@@ -0,0 +1,161 @@
+import math
+import time
+from collections import deque, OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+THROTTLE_STATUS_CODES = (429, 503)
+'''Response status codes that mean the host asks crawler to slow down.'''
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    '''Parse `Retry-After` header, in delay seconds or HTTP date, to delay seconds.'''
+    if not value: return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_time = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_time.tzinfo is None:
+        retry_time = retry_time.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_time - datetime.now(timezone.utc)).total_seconds())
+
+def url_to_host(url: str) -> str:
+    return urlparse(url).netloc
+
+class _HostState:
+    def __init__(self, burst: int, now: float):
+        self.queue: Deque[Any] = deque()
+        '''Pending tasks of the host.'''
+        self.active: int = 0
+        '''Number of in-flight requests to the host.'''
+        self.tokens: float = burst
+        '''Token bucket, one token is consumed per request.'''
+        self.last_refill: float = now
+        self.blocked_until: float = 0.0
+        '''No request is sent to the host before this time, set by 429/503 responses.'''
+        self.n_throttled: int = 0
+        '''Number of continuous throttled responses, for backoff without `Retry-After`.'''
+
+class HostScheduler:
+    '''Crawler frontier with per host queues. \n
+    * Requests to a host start at most `burst` at once, then one per `request_gap` seconds (token bucket).
+    * At most `max_connections` requests to a host are in flight.
+    * A 429/503 response blocks the host for `Retry-After` seconds, or an exponential backoff if absent.
+
+    Tasks must have a `url` attribute. Not thread-safe, callers hold their own lock.'''
+
+    def __init__(self,
+                 request_gap: float,
+                 max_connections: int,
+                 burst: int = 1,
+                 max_retry_after: float = 60):
+        self.__request_gap = request_gap
+        self.__max_connections = max_connections
+        self.__burst = max(1, burst)
+        self.__max_retry_after = max_retry_after
+
+        self.__hosts: Dict[str, _HostState] = OrderedDict()
+        '''Host states, hosts are rotated to the end after popped to serve hosts in turn.'''
+        self.__n_pending = 0
+
+    def __len__(self) -> int:
+        '''Number of pending tasks.'''
+        return self.__n_pending
+
+    def __iter__(self) -> Iterator[Any]:
+        '''Iterate pending tasks.'''
+        for state in self.__hosts.values():
+            yield from state.queue
+
+    def __get_host(self, host: str, now: float) -> _HostState:
+        if host not in self.__hosts:
+            self.__hosts[host] = _HostState(self.__burst, now)
+        return self.__hosts[host]
+
+    def __refill(self, state: _HostState, now: float) -> None:
+        if now < state.blocked_until:
+            # Bucket stays empty until host is unblocked.
+            state.last_refill = state.blocked_until
+            return
+
+        if self.__request_gap <= 0:
+            state.tokens = self.__burst
+        else:
+            elapsed = now - state.last_refill
+            state.tokens = min(self.__burst, state.tokens + elapsed / self.__request_gap)
+        state.last_refill = now
+
+    def __ready_time(self, state: _HostState, now: float) -> float:
+        '''Earliest time a request to the host can start, `inf` if waiting for in-flight requests.'''
+        if not state.queue or state.active >= self.__max_connections:
+            return math.inf
+
+        self.__refill(state, now)
+        ready_time = max(now, state.blocked_until)
+        if state.tokens < 1:
+            ready_time = max(ready_time, state.last_refill + (1 - state.tokens) * self.__request_gap)
+        return ready_time
+
+    def push(self, task: Any, front: bool = False, now: Optional[float] = None) -> None:
+        '''Add a task to the queue of its host. `front` is used for retrying tasks.'''
+        now = time.monotonic() if now is None else now
+        state = self.__get_host(url_to_host(task.url), now)
+        if front:
+            state.queue.appendleft(task)
+        else:
+            state.queue.append(task)
+        self.__n_pending += 1
+
+    def pop(self, now: Optional[float] = None) -> Tuple[Optional[Any], float]:
+        '''Pop a task whose host is ready now. \n
+        **return** (task, 0) if any host is ready, otherwise (None, seconds until next host is ready).
+        Seconds is `inf` if no host would be ready before some in-flight requests are released.'''
+        now = time.monotonic() if now is None else now
+
+        next_ready = math.inf
+        for host, state in self.__hosts.items():
+            ready_time = self.__ready_time(state, now)
+            if ready_time <= now:
+                break
+            next_ready = min(next_ready, ready_time)
+        else:
+            return None, next_ready - now
+
+        self.__hosts.move_to_end(host)
+        state.tokens -= 1
+        state.active += 1
+        self.__n_pending -= 1
+        return state.queue.popleft(), 0.0
+
+    def release(self,
+                task: Any,
+                status_code: Optional[int] = None,
+                retry_after: Optional[str] = None,
+                now: Optional[float] = None) -> bool:
+        '''Mark the request of a popped task finished. \n
+        **return** True if the host throttled the request, the task should be retried later.'''
+        now = time.monotonic() if now is None else now
+        state = self.__get_host(url_to_host(task.url), now)
+        state.active -= 1
+
+        if status_code not in THROTTLE_STATUS_CODES:
+            state.n_throttled = 0
+            return False
+
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = max(self.__request_gap, 1) * 2 ** state.n_throttled
+        delay = min(delay, self.__max_retry_after)
+
+        state.n_throttled += 1
+        state.tokens = 0
+        state.last_refill = now
+        state.blocked_until = max(state.blocked_until, now + delay)
+        return True
@@ -0,0 +1,80 @@
+import re
+from urllib.parse import urlsplit
+
+from typing import List, Optional, Sequence
+
+from .config import CrawlerConfig
+from .url_filter import wildcard_to_regex
+from .url_utils import remove_fragment
+
+_DEFAULT_PORTS = {'http': ':80', 'https': ':443'}
+
+class UrlCanonicalizer:
+    '''Map equivalent urls to one canonical form, used as url node key of `GraphManager`. \n
+    Fragment is removed and host lower-cased, then optionally:
+    * `ignore_scheme`: `http` and `https` urls are the same page.
+    * `remove_default_port`: `:80` of `http` and `:443` of `https` is removed.
+    * `remove_trailing_slash`: `/path/` is the same page as `/path`. Off by default, relative links of
+      the two resolve differently, e.g. `a.html` on `/dir/` is `/dir/a.html` but on `/dir` is `/a.html`.
+    * `sort_query`: query parameters are sorted, so their order does not matter.
+    * `ignored_query_params`: query or `;` path parameters with these names (support wildcard `*`, case-insensitive) are removed.'''
+
+    def __init__(self,
+                 ignore_scheme: bool = True,
+                 remove_default_port: bool = True,
+                 remove_trailing_slash: bool = False,
+                 sort_query: bool = True,
+                 ignored_query_params: Sequence[str] = CrawlerConfig.ignored_query_params):
+        self.__ignore_scheme = ignore_scheme
+        self.__remove_default_port = remove_default_port
+        self.__remove_trailing_slash = remove_trailing_slash
+        self.__sort_query = sort_query
+        self.__ignored_param_pattern = (
+            re.compile('(?:' + '|'.join(wildcard_to_regex(param) for param in ignored_query_params) + ')$',
+                       re.IGNORECASE)
+            if ignored_query_params else None
+        )
+
+    @staticmethod
+    def from_config(config: CrawlerConfig) -> Optional['UrlCanonicalizer']:
+        '''**return** None if `config.canonicalize_urls` is disabled.'''
+        if not config.canonicalize_urls: return None
+        return UrlCanonicalizer(ignored_query_params=config.ignored_query_params)
+
+    def __call__(self, url: str) -> str:
+        url_parse = urlsplit(remove_fragment(url))
+        scheme = url_parse.scheme.lower()
+
+        netloc = url_parse.netloc.lower()
+        if self.__remove_default_port:
+            default_port = _DEFAULT_PORTS.get(scheme)
+            if default_port and netloc.endswith(default_port):
+                netloc = netloc[:-len(default_port)]
+            elif netloc.endswith(':'):
+                netloc = netloc[:-1]
+
+        path = url_parse.path or '/'
+        if ';' in path and self.__ignored_param_pattern:
+            path = self.__remove_path_params(path)
+        if self.__remove_trailing_slash and len(path) > 1 and path.endswith('/'):
+            path = path.rstrip('/') or '/'
+
+        query = url_parse.query
+        if query:
+            params = [param for param in query.split('&')
+                      if param and not self.__is_ignored(param.split('=', 1)[0])]
+            if self.__sort_query: params.sort()
+            query = '&'.join(params)
+
+        prefix = '' if self.__ignore_scheme else f'{scheme}://'
+        return f'{prefix}{netloc}{path}?{query}' if query else f'{prefix}{netloc}{path}'
+
+    def __is_ignored(self, name: str) -> bool:
+        return self.__ignored_param_pattern is not None and self.__ignored_param_pattern.match(name) is not None
+
+    def __remove_path_params(self, path: str) -> str:
+        '''Remove ignored parameters in `/segment;name=value` of the last path segment, e.g. `;jsessionid=...`.'''
+        segment_start = path.rfind('/') + 1
+        segment, *params = path[segment_start:].split(';')
+        params: List[str] = [param for param in params if not self.__is_ignored(param.split('=', 1)[0])]
+        return path[:segment_start] + ';'.join([segment, *params])
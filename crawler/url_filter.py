@@ -0,0 +1,130 @@
+import re
+from urllib.parse import urlparse
+
+from typing import Dict, List, Tuple
+
+from .config import CrawlerConfig
+
+def wildcard_to_regex(pattern: str) -> str:
+    '''Convert pattern with wildcard `*` to regex, other characters are matched literally.'''
+    return '.*'.join(re.escape(part) for part in pattern.split('*'))
+
+class _PatternSet:
+    '''Patterns with wildcard `*`, merged by shape: exact strings in a set, `prefix*` and
+    `*suffix` as tuples for `str.startswith`/`str.endswith`, and the rest in one regex.'''
+
+    def __init__(self, patterns: List[str]):
+        self.match_all = False
+        exacts, prefixes, suffixes, others = set(), [], [], []
+
+        for pattern in patterns:
+            stripped = pattern.strip('*')
+            if pattern and not stripped:
+                self.match_all = True
+            elif '*' in stripped:
+                others.append(pattern)
+            elif pattern == stripped:
+                exacts.add(pattern)
+            elif pattern == stripped + '*':
+                prefixes.append(stripped)
+            elif pattern == '*' + stripped:
+                suffixes.append(stripped)
+            else:
+                # `*infix*`
+                others.append(pattern)
+
+        self.is_empty = not patterns
+        self.exacts = frozenset(exacts)
+        self.prefixes = tuple(prefixes)
+        self.suffixes = tuple(suffixes)
+        self.regex = (
+            re.compile('(?:' + '|'.join(wildcard_to_regex(pattern) for pattern in others) + r')$')
+            if others else None
+        )
+
+    def match(self, target: str) -> bool:
+        return (
+            self.match_all or
+            target in self.exacts or
+            (bool(self.prefixes) and target.startswith(self.prefixes)) or
+            (bool(self.suffixes) and target.endswith(self.suffixes)) or
+            (self.regex is not None and self.regex.match(target) is not None)
+        )
+
+class UrlFilter:
+    '''Compiled form of `url_utils.check_url_allowed`, patterns are merged once on creation. \n
+    Domain verdicts are memoized per host, at most `max_cache_size` hosts.'''
+
+    def __init__(self,
+                 allow_domains: List[str],
+                 include_urls: List[str],
+                 exclude_urls: List[str],
+                 max_cache_size: int = 65536):
+        self.__allow_domains = _PatternSet(allow_domains)
+        self.__include_urls = _PatternSet(include_urls)
+        self.__exclude_urls = _PatternSet(exclude_urls)
+        self.__max_cache_size = max_cache_size
+        self.__domain_cache: Dict[str, bool] = {}
+        self.__check_path = not (self.__include_urls.match_all and
+                                 self.__exclude_urls.is_empty)
+        '''Path need not be split out if include and exclude patterns never reject.'''
+
+    @staticmethod
+    def from_config(config: CrawlerConfig) -> 'UrlFilter':
+        return UrlFilter(config.allow_domains, config.include_urls, config.exclude_urls)
+
+    def __call__(self, url: str) -> bool:
+        domain, url_no_scheme = self.__split(url, self.__check_path)
+
+        domain_allowed = self.__domain_cache.get(domain)
+        if domain_allowed is None:
+            domain_allowed = self.__allow_domains.match(domain)
+            if len(self.__domain_cache) >= self.__max_cache_size:
+                self.__domain_cache.clear()
+            self.__domain_cache[domain] = domain_allowed
+        if not domain_allowed: return False
+        if not self.__check_path: return True
+
+        return (
+            self.__include_urls.match(url_no_scheme) and
+            not self.__exclude_urls.match(url_no_scheme)
+        )
+
+    @staticmethod
+    def __split(url: str, with_path: bool = True) -> Tuple[str, str]:
+        '''Split url into domain and `{domain}{path}?{query}`, same as `urlparse` in `check_url_allowed`. \n
+        Only domain is returned (with empty string) if not `with_path`.'''
+        scheme_end = url.find('://')
+        if (scheme_end < 0 or not url[:scheme_end].isalpha() or url[:1] <= ' ' or
+            '\t' in url or '\n' in url or '\r' in url):
+            # Rare forms, leave to `urlparse`.
+            url_parse = urlparse(url)
+            return url_parse.netloc, f'{url_parse.netloc}{url_parse.path}?{url_parse.query}'
+
+        if not with_path:
+            domain_end = len(url)
+            for separator in '/?#':
+                end = url.find(separator, scheme_end + 3, domain_end)
+                if end >= 0: domain_end = end
+            return url[scheme_end + 3:domain_end], ''
+
+        rest = url[scheme_end + 3:]
+        fragment_start = rest.find('#')
+        if fragment_start >= 0:
+            rest = rest[:fragment_start]
+        query_start = rest.find('?')
+        if query_start >= 0:
+            rest, query = rest[:query_start], rest[query_start + 1:]
+        else:
+            query = ''
+
+        path_start = rest.find('/')
+        domain = rest if path_start < 0 else rest[:path_start]
+        path = '' if path_start < 0 else rest[path_start:]
+
+        # `urlparse` splits `;params` of the last path segment out of path.
+        if ';' in path:
+            params_start = path.find(';', path.rfind('/'))
+            if params_start >= 0: path = path[:params_start]
+
+        return domain, f'{domain}{path}?{query}'
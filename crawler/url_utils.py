@@ -4,9 +4,8 @@ import re
 from typing import List
 
 def _check_pattern_with_wildcard(pattern: str, target: str):
-    pattern = pattern.replace('/', '\\/')
-    pattern = pattern.replace('.', '\\.')
-    pattern = pattern.replace('*', '.*')
+    # Characters other than `*` are matched literally.
+    pattern = '.*'.join(re.escape(part) for part in pattern.split('*'))
     pattern = f'^{pattern}$'
     return re.match(pattern, target) is not None
 
@@ -0,0 +1,106 @@
+import threading
+import pickle
+from email.utils import parsedate_to_datetime
+
+from typing import Dict, List, Optional, Tuple, NamedTuple
+
+from .graph_manager import GraphManager
+
+class CacheEntry(NamedTuple):
+    etag: str
+    last_modified: str
+    links: List[str]
+    '''Hyperlinks found in the page when validators were recorded.'''
+
+class ValidatorCache:
+    '''HTTP validators (`ETag`, `Last-Modified`) of crawled html pages, for conditional requests. \n
+    Validators are recorded by url id of the crawling `GraphManager`. The saved file also keeps
+    urls and hyperlinks of the cached pages, so an unchanged page (304) of next crawl reuses them.'''
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+
+        self.__validators: Dict[int, Tuple[str, str]] = {}
+        '''Validators recorded in current crawl, keyed by url id.'''
+
+        self.__prev_urls: List[str] = []
+        '''Url of each url id of previous crawl.'''
+        self.__prev_validators: Dict[int, Tuple[str, str]] = {}
+        self.__prev_links: Dict[int, List[int]] = {}
+        self.__prev_url_to_id: Dict[str, int] = {}
+
+    def __load_state(self, state) -> None:
+        self.__prev_urls = state['urls']
+        self.__prev_validators = state['validators']
+        self.__prev_links = state['links']
+        self.__prev_url_to_id = {
+            self.__prev_urls[url_id]: url_id
+            for url_id in self.__prev_validators
+        }
+
+    def __contains__(self, url: str) -> bool:
+        '''Check if `url` is cached in previous crawl.'''
+        return url in self.__prev_url_to_id
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        '''Get validators and hyperlinks of `url` recorded in previous crawl.'''
+        url_id = self.__prev_url_to_id.get(url)
+        if url_id is None: return None
+
+        etag, last_modified = self.__prev_validators[url_id]
+        return CacheEntry(
+            etag,
+            last_modified,
+            [self.__prev_urls[link_id] for link_id in self.__prev_links[url_id]],
+        )
+
+    def get_request_headers(self, url: str) -> Dict[str, str]:
+        '''Conditional request headers of `url`, empty if not cached.'''
+        entry = self.get(url)
+        if not entry: return {}
+
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def update(self, url_id: int, etag: Optional[str], last_modified: Optional[str]) -> None:
+        '''Record validators of page `url(url_id)` in current crawl, pages without validators are not cached.'''
+        if not etag and not last_modified: return
+
+        with self.__lock:
+            self.__validators[url_id] = (etag or '', last_modified or '')
+
+    def get_lastmods(self, graph_manager: GraphManager) -> Dict[str, str]:
+        '''Get `Last-Modified` of current crawl in W3C date format, for `lastmod` of sitemap.'''
+        lastmods = {}
+        with self.__lock:
+            for url_id, (_, last_modified) in self.__validators.items():
+                try:
+                    lastmods[graph_manager.get_url_by_id(url_id)] = parsedate_to_datetime(last_modified).date().isoformat()
+                except (TypeError, ValueError):
+                    continue
+        return lastmods
+
+    def save_to_file(self, output_file_name: str, graph_manager: GraphManager) -> None:
+        '''Save validators of current crawl, with urls and hyperlinks of `graph_manager`.'''
+        with self.__lock:
+            state = {
+                'urls': [graph_manager.get_url_by_id(url_id)
+                         for url_id in range(graph_manager.get_url_count())],
+                'validators': dict(self.__validators),
+                'links': {url_id: list(graph_manager.get_links_by_id(url_id))
+                          for url_id in self.__validators},
+            }
+
+        with open(output_file_name, 'wb') as output_file:
+            pickle.dump(state, output_file)
+
+    @staticmethod
+    def load_from_file(input_file_name: str) -> 'ValidatorCache':
+        with open(input_file_name, 'rb') as input_file:
+            cache = ValidatorCache()
+            cache.__load_state(pickle.load(input_file))
+            return cache
@@ -1,3 +1,6 @@
+from .encoder import UrlEntryEncoder, escape_url
 from .generator_xml import SiteMap, SiteMapParallel
+from .sitemap_writer import SiteMapWriter
+from .sitemap_index import SiteMapIndex
 
-__all__ = ['SiteMap', 'SiteMapParallel']
\ No newline at end of file
+__all__ = ['UrlEntryEncoder', 'escape_url', 'SiteMap', 'SiteMapParallel', 'SiteMapWriter', 'SiteMapIndex']
\ No newline at end of file
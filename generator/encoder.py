@@ -0,0 +1,133 @@
+from numbers import Integral, Real
+from xml.sax.saxutils import escape
+
+SPECIAL_CHARACTERS = "&<>\"'"
+DEFAULT_PRECISION = 4
+"""Digits of float priorities after the decimal point of all generators by default, e.g. `0.1235`."""
+_ENTITIES = {'"': "&quot;", "'": "&apos;"}
+
+
+def escape_url(url):
+    """Escape `&`, `<`, `>` and quotes of `url` for `<loc>`."""
+    if not any(character in url for character in SPECIAL_CHARACTERS):
+        return url
+    return escape(url, _ENTITIES)
+
+
+def _is_float(priority):
+    """Whether `priority` is formatted with fixed precision: `float` and other non-integral reals such as `numpy.float32`."""
+    return isinstance(priority, float) or (isinstance(priority, Real) and not isinstance(priority, Integral))
+
+
+class UrlEntryEncoder:
+    """
+    Encode batches of `(url, priority)` pairs into `<url>` entries of sitemap.
+
+    Urls are escaped, but most urls have nothing to escape: urls of a batch are
+    joined and searched once, and the few urls around special characters found
+    are escaped. Float priorities are
+    formatted with `precision` digits after the decimal point, other priorities
+    and all if `precision` is None as `str`.
+    """
+
+    def __init__(self, encoding="UTF-8", precision=None):
+        self.encoding = encoding
+        self.precision = precision
+        self.priority_spec = "" if precision is None else f".{precision}f"
+
+    def format_priority(self, priority):
+        if self.precision is None or not _is_float(priority):
+            return str(priority)
+        return format(float(priority), self.priority_spec)
+
+    def for_pages(self, pages):
+        """**return** Encoder of `pages`, priorities of quantized `RankResult` are exact decimals kept as `str`."""
+        if self.precision is None or getattr(pages, "levels", None) is None:
+            return self
+        return UrlEntryEncoder(self.encoding, None)
+
+    def encode(self, urlset, lastmods=None):
+        """
+        Args:
+            urlset: List of `(url, priority)`.
+            lastmods: Maps url to lastmod date, optional.
+
+        Returns:
+            bytes: Entries of all urls in `urlset`.
+        """
+        if self.precision is not None:
+            spec, format_priority = self.priority_spec, self.format_priority
+            # Priorities given as strings or ints are kept as they are.
+            urlset = [
+                (url, format(priority, spec) if type(priority) is float else format_priority(priority))
+                for url, priority in urlset
+            ]
+        return self.__format(urlset, lastmods, self.escape_urls([url for url, _ in urlset])).encode(self.encoding)
+
+    @staticmethod
+    def __format(urlset, lastmods, locs):
+        """**return** Entries of `urlset` as `str`, with escaped `locs` of urls, or urls as they are if `locs` is None."""
+        if lastmods:
+            return "".join([
+                f"  <url>\n    <loc>{loc}</loc>\n"
+                + (f"    <lastmod>{lastmod}</lastmod>\n" if (lastmod := lastmods.get(url)) else "")
+                + f"    <priority>{priority}</priority>\n  </url>\n"
+                for (url, priority), loc in zip(urlset, [url for url, _ in urlset] if locs is None else locs)
+            ])
+        if locs is not None:
+            return "".join([
+                f"  <url>\n    <loc>{loc}</loc>\n    <priority>{priority}</priority>\n  </url>\n"
+                for loc, (_, priority) in zip(locs, urlset)
+            ])
+        return "".join([
+            f"  <url>\n    <loc>{url}</loc>\n    <priority>{priority}</priority>\n  </url>\n"
+            for url, priority in urlset
+        ])
+
+    @staticmethod
+    def escape_urls(urls):
+        """**return** Escaped `urls`, or None if none of them needs escaping."""
+        joined = "\n".join(urls)
+        specials = [character for character in SPECIAL_CHARACTERS if character in joined]
+        if not specials:
+            return None
+        if len(specials) == 1:
+            # Usually `&` of query strings only, one search per url.
+            special = specials[0]
+            return [escape(url, _ENTITIES) if special in url else url for url in urls]
+        if joined.count("\n") != len(urls) - 1:
+            return [escape_url(url) for url in urls]
+        # Few urls need escaping: find them in the joined urls, instead of searching each url.
+        escaped = {}
+        for character in SPECIAL_CHARACTERS:
+            position = joined.find(character)
+            while position >= 0:
+                start = joined.rfind("\n", 0, position) + 1
+                end = joined.find("\n", position)
+                if end < 0:
+                    end = len(joined)
+                url = joined[start:end]
+                escaped[url] = escape(url, _ENTITIES)
+                position = joined.find(character, end)
+        return [escaped.get(url, url) for url in urls]
+
+    def encode_entry(self, loc, lastmod=None, changefreq=None, priority=None):
+        """**return** `<url>` entry of `SiteMap` as `str`, elements with empty values are left out."""
+        lines = [f"  <url>\n    <loc>{escape_url(loc)}</loc>\n"]
+        if lastmod:
+            lines.append(f"    <lastmod>{lastmod}</lastmod>\n")
+        if changefreq:
+            lines.append(f"    <changefreq>{changefreq}</changefreq>\n")
+        if priority:
+            lines.append(f"    <priority>{self.format_priority(priority)}</priority>\n")
+        lines.append("  </url>\n")
+        return "".join(lines)
+
+    def write(self, out, urlset, lastmods=None):
+        """Append entries to `out`, a `bytearray` or a binary file such as `io.BufferedWriter`."""
+        data = self.encode(urlset, lastmods)
+        if isinstance(out, bytearray):
+            out += data
+        else:
+            out.write(data)
+        return len(data)
@@ -1,14 +1,17 @@
-from multiprocessing import Process, Manager
-from itertools import islice
+from collections import deque
+from multiprocessing import get_all_start_methods, get_context
 import time
 
+from .encoder import DEFAULT_PRECISION, UrlEntryEncoder
+
 class SiteMap:
     
     encoding = 'UTF-8'
     xmlns = 'http://www.sitemaps.org/schemas/sitemap/0.9'
 
-    def __init__(self):
+    def __init__(self, precision=DEFAULT_PRECISION):
         self.urlset = []
+        self.encoder = UrlEntryEncoder(self.encoding, precision)
 
     def add_url(self, loc, lastmod=None, changefreq=None, priority=None):
         url = {
@@ -21,21 +24,13 @@ class SiteMap:
 
     def to_string(self):
         xml_lines = []
-        xml_lines.append(f'<?xml version="1.0" encoding="{self.encoding}"?>')
-        xml_lines.append(f'<urlset xmlns="{self.xmlns}">')
+        xml_lines.append(f'<?xml version="1.0" encoding="{self.encoding}"?>\n')
+        xml_lines.append(f'<urlset xmlns="{self.xmlns}">\n')
         
         for url in self.urlset:
-            xml_lines.append("  <url>")
-            xml_lines.append(f"    <loc>{url['loc']}</loc>")
-            if url['lastmod']:
-                xml_lines.append(f"    <lastmod>{url['lastmod']}</lastmod>")
-            if url['changefreq']:
-                xml_lines.append(f"    <changefreq>{url['changefreq']}</changefreq>")
-            if url['priority']:
-                xml_lines.append(f"    <priority>{url['priority']}</priority>")
-            xml_lines.append("  </url>")
+            xml_lines.append(self.encoder.encode_entry(url['loc'], url['lastmod'], url['changefreq'], url['priority']))
         xml_lines.append("</urlset>")
-        return '\n'.join(xml_lines)
+        return ''.join(xml_lines)
 
     def save(self, filename):
         xml = self.to_string()
@@ -43,65 +38,113 @@ class SiteMap:
             
             f.write(xml)
 
-    def main(self, pages):
+    def main(self, pages, lastmods=None, filename="sitemap_new.xml"):
+        # `lastmods` maps url to lastmod date, e.g. `Crawler.validator_cache.get_lastmods(...)`.
+        lastmods = lastmods or {}
+        encoder = self.encoder.for_pages(pages)
         for path, rank in pages:
-            self.add_url(path, priority=str(rank))
-        self.save("sitemap_new.xml")
+            self.add_url(path, lastmod=lastmods.get(path), priority=encoder.format_priority(rank))
+        self.save(filename)
 
 
 class SiteMapParallel:
+    """
+    Generate sitemap.xml in a pool of `process_num` processes.
+
+    Workers are forked where fork is available and inherit `pages` when the
+    pool starts, without pickling it; other start methods pickle `pages` once
+    per worker. Each task is only a range of `chunk_urls` urls, which the
+    worker slices, looks up and encodes by `UrlEntryEncoder`. `pages` must
+    support `len` and slicing, e.g. a list or the result of `Analyzer.main`,
+    whose urls are then looked up in workers.
+
+    Workers return the encoded bytes through the pool, and the parent writes
+    them in order. Writing to pre-assigned segments of the file is not
+    possible, as sizes of the ranges are known only after encoding. At most 2
+    ranges per process are pending, so memory does not grow with the number
+    of urls.
+
+    The pool is closed after `main`, unless used with `with`, which keeps it
+    for later calls with the same `pages` object of the same length and
+    `process_num`. Call `close` after modifying `pages` in place otherwise.
+    """
 
     encoding = 'UTF-8'
     xmlns = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+    chunk_urls = 10000
 
+    def __init__(self, precision=DEFAULT_PRECISION):
+        self.pool = None
+        self.process_num = None
+        self.pages = None
+        self.n_pages = None
+        self.reuse = False
+        self.encoder = UrlEntryEncoder(self.encoding, precision)
 
     def to_string(self, urlset):
-
-        xml_lines = []
-        for url, priority in urlset:
-            xml_lines.append("  <url>")
-            xml_lines.append(f"    <loc>{url}</loc>")
-            xml_lines.append(f"    <priority>{priority}</priority>")
-            xml_lines.append("  </url>")
-        return '\n'.join(xml_lines)
-
-
-    def worker(self, shared_list, index, pages, start, end):
-
-        sliced_pages = islice(pages, start, end)
-        xml = self.to_string(sliced_pages)
-        shared_list[index] = xml
-
-    def main(self, pages, process_num):
-        num = len(pages) // process_num
-        remain = len(pages) % process_num
-
-        with Manager() as manager:
-            shared_list = manager.list([0] * process_num)
-
-            processes = []
-            for i in range(process_num):
-                start = i * num
-                end = start + num
-                if i == process_num - 1:
-                    end += remain
-
-                p = Process(target=self.worker, args=(shared_list, i, pages, start, end))
-                processes.append(p)
-                p.start()
-
-            xml_head = f'<?xml version="1.0" encoding="{self.encoding}"?>\n'
-            xml_head += f'<urlset xmlns="{self.xmlns}">\n'
-            with open("sitemap_new_threads.xml", "w", encoding=self.encoding) as f:
-                f.write(xml_head)
-                
-                for i, p in enumerate(processes):
-                    p.join()
-                    f.write(shared_list[i])
-                    f.write('\n')
-                
-                f.write("</urlset>")
-
+        return self.encoder.encode(list(urlset)).decode(self.encoding)
+
+    def get_pool(self, pages, process_num):
+        if (self.pool is None or self.process_num != process_num
+                or self.pages is not pages or self.n_pages != len(pages)):
+            self.close()
+            self.pool = _CONTEXT.Pool(process_num, initializer=_init_worker, initargs=(pages, self.encoder.for_pages(pages)))
+            self.process_num = process_num
+            self.pages = pages
+            self.n_pages = len(pages)
+        return self.pool
+
+    def main(self, pages, process_num, filename="sitemap_new_threads.xml"):
+        try:
+            pool = self.get_pool(pages, process_num)
+            pending = deque()
+            with open(filename, "wb") as f:
+                xml_head = f'<?xml version="1.0" encoding="{self.encoding}"?>\n'
+                xml_head += f'<urlset xmlns="{self.xmlns}">\n'
+                f.write(xml_head.encode(self.encoding))
+                for start in range(0, len(pages), self.chunk_urls):
+                    if len(pending) >= 2 * process_num:
+                        f.write(pending.popleft().get())
+                    pending.append(pool.apply_async(_encode_range, (start, start + self.chunk_urls)))
+                while pending:
+                    f.write(pending.popleft().get())
+                f.write(b"</urlset>")
+        finally:
+            if not self.reuse:
+                self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+            self.pages = None
+            self.n_pages = None
+
+    def __enter__(self):
+        self.reuse = True
+        return self
+
+    def __exit__(self, *exc_info):
+        self.reuse = False
+        self.close()
+
+
+# Workers inherit `pages` by fork, instead of unpickling it, where fork is available.
+_CONTEXT = get_context("fork" if "fork" in get_all_start_methods() else None)
+
+# Set in each worker of `SiteMapParallel` by `_init_worker`.
+_pages = None
+_encoder = None
+
+
+def _init_worker(pages, encoder):
+    global _pages, _encoder
+    _pages, _encoder = pages, encoder
+
+
+def _encode_range(start, end):
+    return _encoder.encode(list(_pages[start:end]))
 
 
 def cal_serial_time(urlweight):
@@ -120,12 +163,12 @@ def cal_parallel_time(urlweight, process_num, serial_time):
     times = []
     count = 10
     print("process_num:", process_num)
-    for i in range(count):
-        start2 = time.time()
-        sitemap2 = SiteMapParallel()
-        sitemap2.main(urlweight, process_num)
-        end2 = time.time()
-        times.append(end2 - start2)
+    with SiteMapParallel() as sitemap2:
+        for i in range(count):
+            start2 = time.time()
+            sitemap2.main(urlweight, process_num)
+            end2 = time.time()
+            times.append(end2 - start2)
 
     parallel_time = sum(times) / len(times)
 
@@ -140,11 +183,11 @@ if __name__ == "__main__":
     import pickle
 
     
-    file_name = "../data/generator/urlweight_info.nycu.edu.tw.pkl"
-    # file_name = "../data/generator/urlweight_www.cs.nycu.edu.tw_oth.pkl"
-    # file_name = "../data/generator/urlweight_docs.python.org_only313.pkl"
-    # file_name = "../data/generator/urlweight_www.cs.nycu.edu.tw_ann.pkl"
-    # file_name = "../data/generator/urlweight_random_100000.pkl"
+    file_name = "data/generator/urlweight_info.nycu.edu.tw.pkl"
+    # file_name = "data/generator/urlweight_www.cs.nycu.edu.tw_oth.pkl"
+    # file_name = "data/generator/urlweight_docs.python.org_only313.pkl"
+    # file_name = "data/generator/urlweight_www.cs.nycu.edu.tw_ann.pkl"
+    # file_name = "data/generator/urlweight_random_100000.pkl"
 
     with open(file_name, "rb") as file:
         urlweight = pickle.load(file)
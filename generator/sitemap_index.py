@@ -0,0 +1,163 @@
+import gzip
+import os
+from multiprocessing import get_all_start_methods, get_context
+
+from .encoder import DEFAULT_PRECISION, UrlEntryEncoder, escape_url
+from .sitemap_writer import SiteMapWriter
+
+
+class SiteMapIndex:
+    """
+    Split sitemap into files within the protocol limits of 50,000 urls and
+    50 MB each, and write a `sitemapindex` listing them.
+
+    Pages are cut into batches of `max_urls`, each batch is written by a
+    worker process into `{prefix}{n}.xml`, or more files `{prefix}{n}-2.xml`,
+    ... if it exceeds `max_bytes`. Workers are forked where fork is available
+    and inherit `pages` instead of receiving them, so `pages` must support
+    `len` and slicing, e.g. a list or the result of `Analyzer.main`.
+
+    If `compresslevel` is set, shards are `{prefix}{n}.xml.gz`, each compressed
+    by the worker writing it. `max_bytes` limits the uncompressed size, as the
+    protocol does.
+    """
+
+    encoding = SiteMapWriter.encoding
+    xmlns = SiteMapWriter.xmlns
+
+    MAX_URLS = 50000
+    MAX_BYTES = 50 * 1024 * 1024
+
+    def __init__(
+        self,
+        base_url,
+        output_dir=".",
+        prefix="sitemap",
+        index_filename="sitemap_index.xml",
+        n_workers=None,
+        max_urls=MAX_URLS,
+        max_bytes=MAX_BYTES,
+        compresslevel=None,
+        precision=DEFAULT_PRECISION,
+    ):
+        self.base_url = base_url.rstrip("/")
+        """Url the shards are served at, `<loc>` of a shard is `{base_url}/{filename}`."""
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.index_filename = index_filename
+        self.n_workers = n_workers or os.cpu_count()
+        self.max_urls = min(max_urls, self.MAX_URLS)
+        self.max_bytes = min(max_bytes, self.MAX_BYTES)
+        self.compresslevel = compresslevel
+        """gzip level from 1 (fastest) to 9 (smallest), or None to write plain xml."""
+        self.encoder = UrlEntryEncoder(self.encoding, precision)
+        self.header = SiteMapWriter.header().encode(self.encoding)
+        self.footer = SiteMapWriter.footer.encode(self.encoding)
+
+    def main(self, pages, lastmods=None):
+        """
+        Returns:
+            list[str]: Paths of the shards, in order of `pages`.
+        """
+        # `lastmods` maps url to lastmod date, e.g. `Crawler.validator_cache.get_lastmods(...)`.
+        lastmods = lastmods or {}
+        n_batches = -(-len(pages) // self.max_urls)
+        if n_batches > self.MAX_URLS:
+            raise ValueError(f"{len(pages)} urls need more than {self.MAX_URLS} sitemaps in one index")
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        n_workers = min(self.n_workers, n_batches)
+        if n_workers <= 1:
+            shards = [self.write_batch(pages, lastmods, batch) for batch in range(n_batches)]
+        else:
+            with _CONTEXT.Pool(n_workers, initializer=_init_worker, initargs=(self, pages, lastmods)) as pool:
+                shards = pool.map(_write_batch, range(n_batches))
+        filenames = [filename for batch in shards for filename in batch]
+        if len(filenames) > self.MAX_URLS:
+            raise ValueError(f"{len(filenames)} sitemaps exceed {self.MAX_URLS} in one index")
+
+        self.write_index(filenames)
+        return [os.path.join(self.output_dir, filename) for filename in filenames]
+
+    def write_batch(self, pages, lastmods, batch):
+        """
+        Write urls `batch * max_urls` to `(batch + 1) * max_urls` of `pages`.
+
+        Returns:
+            list[str]: File names written, more than one if `max_bytes` is exceeded.
+        """
+        urlsets = pages[batch * self.max_urls:(batch + 1) * self.max_urls]
+        # Every shard has the header and the footer, the rest of `max_bytes` is for urls.
+        capacity = self.max_bytes - len(self.header) - len(self.footer)
+
+        encoder = self.encoder.for_pages(pages)
+        filenames = []
+        f = None
+        try:
+            for start in range(0, len(urlsets), SiteMapWriter.batch_urls):
+                urlset = list(urlsets[start:start + SiteMapWriter.batch_urls])
+                data = encoder.encode(urlset, lastmods)
+                if f is not None and n_bytes + len(data) <= capacity:
+                    f.write(data)
+                    n_bytes += len(data)
+                    continue
+                # The batch does not fit in the current shard, find where to split it url by url.
+                for pair in urlset:
+                    entry = encoder.encode([pair], lastmods)
+                    if len(entry) > capacity:
+                        raise ValueError(f"sitemap entry of {pair[0]} exceeds {self.max_bytes} bytes")
+                    if f is None or n_bytes + len(entry) > capacity:
+                        f = self.__next_shard(f, batch, filenames)
+                        n_bytes = 0
+                    f.write(entry)
+                    n_bytes += len(entry)
+            if f is not None:
+                f.write(self.footer)
+        finally:
+            if f is not None:
+                f.close()
+        return filenames
+
+    def __next_shard(self, f, batch, filenames):
+        if f is not None:
+            f.write(self.footer)
+            f.close()
+        filenames.append(self.shard_filename(batch, len(filenames)))
+        path = os.path.join(self.output_dir, filenames[-1])
+        if self.compresslevel is None:
+            f = open(path, "wb")
+        else:
+            f = gzip.open(path, "wb", compresslevel=self.compresslevel)
+        f.write(self.header)
+        return f
+
+    def shard_filename(self, batch, part):
+        extension = ".xml" if self.compresslevel is None else ".xml.gz"
+        return f"{self.prefix}{batch + 1}{extension}" if part == 0 else f"{self.prefix}{batch + 1}-{part + 1}{extension}"
+
+    def write_index(self, filenames):
+        with open(os.path.join(self.output_dir, self.index_filename), "w", encoding=self.encoding) as f:
+            f.write(f'<?xml version="1.0" encoding="{self.encoding}"?>\n')
+            f.write(f'<sitemapindex xmlns="{self.xmlns}">\n')
+            for filename in filenames:
+                loc = escape_url(f"{self.base_url}/{filename}")
+                f.write(f"  <sitemap>\n    <loc>{loc}</loc>\n  </sitemap>\n")
+            f.write("</sitemapindex>")
+
+
+# Workers inherit `pages` by fork, instead of unpickling it, where fork is available.
+_CONTEXT = get_context("fork" if "fork" in get_all_start_methods() else None)
+
+# Set in each worker of `SiteMapIndex.main` by `_init_worker`.
+_index = None
+_pages = None
+_lastmods = None
+
+
+def _init_worker(index, pages, lastmods):
+    global _index, _pages, _lastmods
+    _index, _pages, _lastmods = index, pages, lastmods
+
+
+def _write_batch(batch):
+    return _index.write_batch(_pages, _lastmods, batch)
@@ -0,0 +1,85 @@
+import gzip
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+from .encoder import DEFAULT_PRECISION, UrlEntryEncoder
+
+
+class SiteMapWriter:
+    """
+    Write sitemap.xml from any iterable of `(url, priority)` pairs, such as the
+    result of `Analyzer.main`, without keeping the whole document in memory.
+
+    Entries are encoded by `UrlEntryEncoder` in batches of `batch_urls` into a
+    buffer, which is written out once it reaches `chunk_size` bytes, so memory
+    stays below one chunk however many urls there are. Output is the same as
+    `SiteMap.main` with the same `precision`, float priorities are formatted to
+    `precision` digits unless `pages` is a quantized `RankResult`.
+
+    If `compresslevel` is set, output is gzip, e.g. `sitemap.xml.gz`. Each chunk is
+    compressed into a gzip member by one of `n_workers` processes, and members are
+    written in order, which decompresses to the same document.
+    """
+
+    encoding = 'UTF-8'
+    xmlns = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+    batch_urls = 1000
+
+    def __init__(self, filename="sitemap_new.xml", chunk_size=1 << 20, compresslevel=None, n_workers=1, precision=DEFAULT_PRECISION):
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.compresslevel = compresslevel
+        """gzip level from 1 (fastest) to 9 (smallest), or None to write plain xml."""
+        self.n_workers = n_workers
+        self.encoder = UrlEntryEncoder(self.encoding, precision)
+
+    @classmethod
+    def header(cls):
+        return f'<?xml version="1.0" encoding="{cls.encoding}"?>\n<urlset xmlns="{cls.xmlns}">\n'
+
+    footer = "</urlset>"
+
+    def main(self, pages, lastmods=None):
+        """
+        Returns:
+            int: Number of urls written.
+        """
+        # `lastmods` maps url to lastmod date, e.g. `Crawler.validator_cache.get_lastmods(...)`.
+        counter = [0]
+        chunks = self.chunks(pages, lastmods, counter, self.encoder.for_pages(pages))
+        if self.compresslevel is None:
+            with open(self.filename, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        elif self.n_workers <= 1:
+            with open(self.filename, "wb") as f:
+                for chunk in chunks:
+                    f.write(gzip.compress(chunk, self.compresslevel))
+        else:
+            self.__write_parallel(chunks)
+        return counter[0]
+
+    def chunks(self, pages, lastmods, counter, encoder):
+        """Yield the encoded document in chunks of about `chunk_size` bytes, urls are counted in `counter[0]`."""
+        chunk = bytearray(self.header().encode(self.encoding))
+        pages = iter(pages)
+        while urlset := list(islice(pages, self.batch_urls)):
+            encoder.write(chunk, urlset, lastmods)
+            counter[0] += len(urlset)
+            if len(chunk) >= self.chunk_size:
+                yield bytes(chunk)
+                chunk.clear()
+        chunk += self.footer.encode(self.encoding)
+        yield bytes(chunk)
+
+    def __write_parallel(self, chunks):
+        # `Pool.imap` reads all chunks ahead, so at most 2 chunks per worker are pending to keep memory bounded.
+        pending = deque()
+        with Pool(self.n_workers) as pool, open(self.filename, "wb") as f:
+            for chunk in chunks:
+                if len(pending) >= 2 * self.n_workers:
+                    f.write(pending.popleft().get())
+                pending.append(pool.apply_async(gzip.compress, (chunk, self.compresslevel)))
+            while pending:
+                f.write(pending.popleft().get())
@@ -0,0 +1,46 @@
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import CrawlerConfig, GraphManager
+from crawler.checkpoint import CheckpointWriter, load_checkpoint
+
+def crawl_page(graph_manager: GraphManager, page: int) -> None:
+    '''Add page `page` linking to the next two pages, like a crawled html page.'''
+    graph_manager._add_links(f'https://example.com/{page}', [f'https://example.com/{page + 1}', f'https://example.com/{page + 2}'])
+
+def check(cut: int) -> None:
+    '''Write two records, cut `cut` bytes off the second, resume, write one more, then load again.'''
+    path = os.path.join(tempfile.mkdtemp(), 'checkpoint.pkl')
+    config = CrawlerConfig(index_urls=['https://example.com/0'], allow_domains=['example.com'])
+
+    graph_manager = GraphManager()
+    writer = CheckpointWriter(path, config, graph_manager)
+    crawl_page(graph_manager, 0)
+    writer.write([0], [('GET', 'https://example.com/1', 0)])
+    complete_size = os.path.getsize(path)
+    crawl_page(graph_manager, 1)
+    writer.write([1], [('GET', 'https://example.com/2', 0)])
+    with open(path, 'r+b') as file:
+        file.truncate(os.path.getsize(path) - cut)
+
+    state = load_checkpoint(path)
+    assert state.end_offset == complete_size
+    assert state.seen_ids == {0} and state.pending_tasks == [('GET', 'https://example.com/1', 0)]
+
+    # As `Crawler.resume` does.
+    writer = CheckpointWriter(path, state.config, state.graph_manager, append=True, end_offset=state.end_offset)
+    crawl_page(state.graph_manager, 1)
+    writer.write([1], [('GET', 'https://example.com/2', 0)])
+
+    state = load_checkpoint(path)
+    assert state.seen_ids == {0, 1} and state.pending_tasks == [('GET', 'https://example.com/2', 0)]
+    assert sorted(state.graph_manager.get_links_by_id(1)) == [2, 3]
+    assert state.end_offset == os.path.getsize(path)
+
+if __name__ == '__main__':
+    # Cut positions hit the frame header, the middle and the last byte of the second record.
+    for cut in [1, 2, 10, 50, 120]:
+        check(cut)
+    print('ok')
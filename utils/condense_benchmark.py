@@ -0,0 +1,55 @@
+import sys
+import os
+import glob
+import time
+import tracemalloc
+
+import numpy as np
+
+from fake_graph_generator import generate_fake_graph
+from graph_layout_benchmark import generate_pages
+from solver_benchmark import build_graph
+from parallel_pagerank_benchmark import DATA_DIR, load_graphs
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import GraphManager
+from analyzer.condense import condensed_pagerank
+from analyzer.solvers import sparse_pagerank
+
+def measure(function, *args, repeat: int = 3):
+    '''**return** (result, best seconds, peak traced bytes), memory is traced in a separate run.'''
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, min(times), peak
+
+def bench(graph_manager: GraphManager, damping: float = 0.85, convergence: float = 1e-7) -> None:
+    sources, targets = graph_manager.get_link_arrays()
+    numNodes = graph_manager.get_url_count()
+    args = (np, sources, targets, numNodes, damping, convergence)
+    (full, full_residuals), full_time, full_peak = measure(sparse_pagerank, *args)
+    (condensed, residuals), condensed_time, condensed_peak = measure(condensed_pagerank, *args)
+    print(f'  whole graph {len(full_residuals):3} iterations, {full_time:.3f} s, peak {full_peak / 2 ** 20:.1f} MiB')
+    print(f'  condensed   {len(residuals):3} iterations, {condensed_time:.3f} s, peak {condensed_peak / 2 ** 20:.1f} MiB, '
+          f'max difference {np.abs(full - condensed).max():.1e}')
+
+if __name__ == '__main__':
+    # Usage: condense_benchmark.py [graph_file]...
+    # Without arguments, bundled graphs in data/graph and a synthetic graph of fake_graph_generator.py are used.
+    graphs = list(load_graphs(sys.argv[1:] or sorted(glob.glob(os.path.join(DATA_DIR, '*.pkl')))))
+    if len(sys.argv) == 1:
+        graphs.append(('fake 100000 html / 300000 urls', generate_fake_graph(100000, 300000, 1000, 20, 'fake.graph')))
+        os.remove('fake.graph')
+        # Most links point to resources such as images and documents.
+        graphs.append(('random 20000 html / 200000 urls', build_graph(generate_pages(20000, 200000, 20))))
+
+    for name, graph_manager in graphs:
+        statistic = graph_manager.get_statistic()
+        print(f'{name}: {statistic["n_html_page"]} html pages, {statistic["n_resources"]} urls, {statistic["n_links"]} links')
+        bench(graph_manager)
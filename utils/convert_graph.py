@@ -0,0 +1,23 @@
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import GraphManager
+
+def convert_graph(input_path: str, output_path: str) -> None:
+    '''Convert pickled `GraphManager` into binary graph file.'''
+    start = time.perf_counter()
+    graph_manager = GraphManager.load_from_file(input_path)
+    graph_manager.save_to_file(output_path, binary=True)
+    print(f'{input_path} -> {output_path}: {graph_manager.get_url_count()} urls, '
+          f'{os.path.getsize(input_path)} -> {os.path.getsize(output_path)} bytes, {time.perf_counter() - start:.2f} s')
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Usage: convert_graph.py <pkl_file>...')
+        print('       e.g. convert_graph.py ../data/graph/*.pkl, output <name>.graph next to each file')
+        exit(1)
+
+    for input_path in sys.argv[1:]:
+        convert_graph(input_path, os.path.splitext(input_path)[0] + '.graph')
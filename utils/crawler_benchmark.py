@@ -0,0 +1,102 @@
+import sys
+import os
+import time
+import contextlib
+from typing import Tuple
+
+from stub_server import StubSite
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import Crawler, AsyncCrawler, CrawlerConfig
+
+def run_crawler(crawler_class, site: StubSite, **config_kwargs) -> Tuple[float, float]:
+    '''**return** (crawl time, tail time), tail is the time from the last response to crawl finish.'''
+    config = CrawlerConfig(
+        index_urls=[f'{site.base_url}/page/0'],
+        allow_domains=[site.domain],
+        **config_kwargs,
+    )
+    cr = crawler_class(config)
+
+    n_requests_before = site.n_requests
+    start = time.time()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        cr.main()
+    end = time.time()
+    elapsed = end - start
+    tail = end - site.last_response_time
+
+    n_requests = site.n_requests - n_requests_before
+    print(f'{crawler_class.__name__:12} {config_kwargs.get("n_threads", config_kwargs.get("max_concurrency"))}: '
+          f'{elapsed:.2f} s, tail {tail:.2f} s, {n_requests} requests, {n_requests / elapsed:.1f} requests/s, '
+          f'{cr.graph_manager.get_url_count()} urls')
+    return elapsed, tail
+
+if __name__ == '__main__':
+    if len(sys.argv) == 2 and sys.argv[1] == 'tail':
+        # Small frontiers, where idle workers and crawl termination dominate.
+        for n_pages, fanout in [(10, 2), (30, 3), (100, 3)]:
+            site = StubSite(n_pages, fanout, 0.01).start()
+            times = [run_crawler(Crawler, site, n_threads=8, per_host_request_gap=0, per_host_max_connections=8)
+                     for _ in range(3)]
+            print(f'{n_pages} pages, average: {sum(t for t, _ in times) / 3:.2f} s, tail {sum(tail for _, tail in times) / 3:.2f} s')
+            site.stop()
+        exit(0)
+
+    if len(sys.argv) == 2 and sys.argv[1] == 'recrawl':
+        # Second crawl with validator cache, 10% pages modified.
+        site = StubSite(300, 5, 0.02).start()
+        cache_path = 'validator_cache.pkl'
+        if os.path.exists(cache_path): os.remove(cache_path)
+
+        for title in ['first crawl', 'recrawl']:
+            site.n_requests = site.n_body_bytes = 0
+            run_crawler(Crawler, site, n_threads=8, per_host_request_gap=0, per_host_max_connections=8,
+                        validator_cache_path=cache_path)
+            print(f'{title}: {site.n_requests} requests, {site.n_body_bytes} body bytes')
+            site.changed_pages = set(range(0, site.n_pages, 10))
+
+        os.remove(cache_path)
+        site.stop()
+        exit(0)
+
+    if len(sys.argv) == 2 and sys.argv[1] == 'infer':
+        # HEAD-then-GET for every link, versus link type inference.
+        site = StubSite(300, 5, 0.02).start()
+        for infer_link_type in [False, True]:
+            run_crawler(Crawler, site, n_threads=8, per_host_request_gap=0, per_host_max_connections=8,
+                        infer_link_type=infer_link_type, skip_asset_requests=infer_link_type)
+        site.stop()
+        exit(0)
+
+    if len(sys.argv) == 2 and sys.argv[1] == 'canonical':
+        # Pages link to each other in equivalent url forms.
+        site = StubSite(300, 5, 0.02, url_variants=True).start()
+        for canonicalize_urls in [False, True]:
+            run_crawler(Crawler, site, n_threads=8, per_host_request_gap=0, per_host_max_connections=8,
+                        canonicalize_urls=canonicalize_urls)
+        site.stop()
+        exit(0)
+
+    if len(sys.argv) < 3:
+        print('Usage: crawler_benchmark.py <n_pages> <fanout> [latency]')
+        print('       crawler_benchmark.py infer')
+        print('       crawler_benchmark.py canonical')
+        print('       crawler_benchmark.py tail')
+        print('       crawler_benchmark.py recrawl')
+        exit(1)
+
+    site = StubSite(
+        int(sys.argv[1]),
+        int(sys.argv[2]),
+        float(sys.argv[3]) if len(sys.argv) > 3 else 0.05,
+    ).start()
+
+    # Politeness limits are lifted to measure raw throughput.
+    no_limit = dict(per_host_request_gap=0, per_host_max_connections=1000)
+    for n_threads in [1, 5, 20]:
+        run_crawler(Crawler, site, n_threads=n_threads, **no_limit)
+    for max_concurrency in [20, 100, 200]:
+        run_crawler(AsyncCrawler, site, max_concurrency=max_concurrency, **no_limit)
+
+    site.stop()
@@ -55,6 +55,7 @@ def generate_fake_graph(n_html: int, n_resource: int, max_degree: int, avg_degre
 
     gm.save_to_file(output_path)
     print(gm.get_statistic())
+    return gm
 
 if __name__ == '__main__':
     if len(sys.argv) < 5: 
@@ -66,5 +67,5 @@ if __name__ == '__main__':
         int(sys.argv[2]),
         int(sys.argv[3]),
         int(sys.argv[4]),
-        sys.argv[5] if len(sys.argv) > 5 else 'output.pkl'
+        sys.argv[5] if len(sys.argv) > 5 else 'output.graph'
     )
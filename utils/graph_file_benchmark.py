@@ -0,0 +1,52 @@
+import sys
+import os
+import time
+import tracemalloc
+
+from graph_layout_benchmark import generate_pages
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import GraphManager
+
+def bench_load(path: str):
+    '''**return** (load seconds, load and read all reversed links seconds).'''
+    start = time.perf_counter()
+    graph_manager = GraphManager.load_from_file(path)
+    load_time = time.perf_counter() - start
+
+    # What PageRank reads, every page is touched once.
+    n_links = sum(len(graph_manager.get_rev_links_by_id(id)) for id in range(graph_manager.get_url_count()))
+    scan_time = time.perf_counter() - start
+    assert n_links == graph_manager.get_statistic()['n_links']
+    return load_time, scan_time
+
+def trace_load_memory(path: str) -> int:
+    '''**return** Python heap bytes of loaded graph, memory-mapped file is not counted.'''
+    tracemalloc.start()
+    graph_manager = GraphManager.load_from_file(path)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+if __name__ == '__main__':
+    # Usage: graph_file_benchmark.py [n_html] [n_resources] [avg_degree]
+    n_html = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    n_resources = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    avg_degree = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    graph_manager = GraphManager()
+    for source_url, target_urls in generate_pages(n_html, n_resources, avg_degree):
+        graph_manager._add_links(source_url, target_urls)
+
+    paths = {'pickle': 'graph_benchmark.pkl', 'binary graph file': 'graph_benchmark.graph'}
+    graph_manager.save_to_file(paths['pickle'])
+    graph_manager.save_to_file(paths['binary graph file'], binary=True)
+    del graph_manager
+
+    for name, path in paths.items():
+        results = [bench_load(path) for _ in range(3)]
+        load_time, scan_time = [min(values) for values in zip(*results)]
+        size = trace_load_memory(path)
+        print(f'{name:18} {os.path.getsize(path) / 2 ** 20:6.1f} MiB file, load {load_time:.3f} s, '
+              f'load and scan {scan_time:.3f} s, python heap {size / 2 ** 20:.1f} MiB')
+        os.remove(path)
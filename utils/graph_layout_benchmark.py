@@ -0,0 +1,85 @@
+import sys
+import os
+import gc
+import time
+import random
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import GraphManager
+
+def generate_pages(n_html: int, n_resources: int, avg_degree: int, seed: int = 0):
+    '''Pages `(source_url, target_urls)`, html pages link to random html pages and resources.'''
+    rng = random.Random(seed)
+    urls = [f'http://example.com/{hex(url_id)}' for url_id in range(n_resources)]
+    return [(urls[page_id], [urls[target_id] for target_id in rng.sample(range(n_resources), avg_degree)])
+            for page_id in range(n_html)]
+
+def build(pages, compact: bool, freeze: bool, links: bool = True):
+    '''**return** (graph manager, traced bytes of building it). Only url nodes are added if not `links`.'''
+    gc.collect()
+    tracemalloc.start()
+    graph_manager = GraphManager(compact=compact)
+    for source_url, target_urls in pages:
+        if links:
+            graph_manager._add_links(source_url, target_urls)
+        else:
+            graph_manager.intern_many([source_url, *target_urls])
+    if freeze: graph_manager.freeze()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return graph_manager, size
+
+def bench_lookups(graph_manager: GraphManager, pairs) -> dict:
+    n_urls = graph_manager.get_url_count()
+    times = {}
+
+    start = time.perf_counter()
+    for id in range(n_urls):
+        for _ in graph_manager.get_links_by_id(id): pass
+    times['get_links_by_id'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for id in range(n_urls):
+        for _ in graph_manager.get_rev_links_by_id(id): pass
+    times['get_rev_links_by_id'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for source_id, target_id in pairs:
+        graph_manager.link_exists(source_id, target_id)
+    times['link_exists'] = time.perf_counter() - start
+    return times
+
+if __name__ == '__main__':
+    # Usage: graph_layout_benchmark.py [n_html] [n_resources] [avg_degree]
+    n_html = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    n_resources = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    avg_degree = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    pages = generate_pages(n_html, n_resources, avg_degree)
+    n_links = n_html * avg_degree
+
+    # Memory of url mappings only, shared by all layouts.
+    _, url_size = build(pages, True, False, links=False)
+    print(f'{n_html} pages, {n_resources} urls, {n_links} links, url nodes {url_size / 2 ** 20:.1f} MiB')
+
+    rng = random.Random(1)
+    pairs = [(rng.randrange(n_html), rng.randrange(n_resources)) for _ in range(200000)]
+    layouts = {}
+    for name, compact, freeze in [('list', False, False), ('compact', True, False), ('compact, frozen', True, True),
+                                  ('list, frozen', False, True)]:
+        graph_manager, size = build(pages, compact, freeze)
+        layouts[name] = graph_manager
+        print(f'{name:16} {size / 2 ** 20:8.1f} MiB, {(size - url_size) / n_links:6.1f} bytes/link')
+
+    # Unfrozen compact lookups scan all edges, left out of lookup timing.
+    reference = layouts['list']
+    for name in ['list', 'compact, frozen']:
+        graph_manager = layouts[name]
+        assert all(sorted(graph_manager.get_links_by_id(id)) == sorted(reference.get_links_by_id(id)) and
+                   sorted(graph_manager.get_rev_links_by_id(id)) == sorted(reference.get_rev_links_by_id(id))
+                   for id in range(0, reference.get_url_count(), 97)), f'{name} links mismatch'
+        assert all(graph_manager.link_exists(*pair) == reference.link_exists(*pair) for pair in pairs[:10000])
+
+        times = bench_lookups(graph_manager, pairs)
+        print(f'{name:16} ' + ', '.join(f'{key} {value:.2f} s' for key, value in times.items()))
@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+import random
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import GraphManager
+
+def generate_pages(n_pages: int, n_urls: int, fanout: int, seed: int = 0):
+    '''Pages `(source_url, target_urls)` over a shared pool of urls, so threads race on the same new urls.'''
+    rng = random.Random(seed)
+    urls = [f'https://www.example.com/dir{i % 97}/page{i}.html' for i in range(n_urls)]
+    return [(rng.choice(urls), rng.sample(urls, fanout)) for _ in range(n_pages)]
+
+def add_pages(graph_manager: GraphManager, pages, n_threads: int) -> float:
+    '''Add pages by `n_threads` threads at once. **return** Elapsed seconds.'''
+    barrier = threading.Barrier(n_threads + 1)
+    def worker(thread_id):
+        barrier.wait()
+        for source_url, target_urls in pages[thread_id::n_threads]:
+            graph_manager._add_links(source_url, target_urls)
+
+    threads = [threading.Thread(target=worker, args=(thread_id,)) for thread_id in range(n_threads)]
+    [thread.start() for thread in threads]
+    barrier.wait()
+    start = time.perf_counter()
+    [thread.join() for thread in threads]
+    return time.perf_counter() - start
+
+def check_graph(graph_manager: GraphManager, pages) -> None:
+    '''Url ids are unique and dense, and every link is recorded exactly once.'''
+    urls = {url for source_url, target_urls in pages for url in [source_url, *target_urls]}
+    ids = {url: graph_manager.get_id_by_url(url) for url in urls}
+    n_urls = graph_manager.get_url_count()
+    assert n_urls == len(urls), f'{n_urls} url ids for {len(urls)} urls'
+    assert sorted(ids.values()) == list(range(n_urls)), 'url ids are not unique'
+    assert all(graph_manager.get_url_by_id(id) == url for url, id in ids.items()), 'id to url mismatch'
+
+    expected = {}
+    for source_url, target_urls in pages:
+        expected.setdefault(ids[source_url], set()).update(ids[url] for url in target_urls)
+    for source_id, target_ids in expected.items():
+        links = graph_manager.get_links_by_id(source_id)
+        assert len(links) == len(set(links)) and set(links) == target_ids, f'links of {source_id} mismatch'
+    n_links = sum(len(target_ids) for target_ids in expected.values())
+    n_rev_links = sum(len(graph_manager.get_rev_links_by_id(id)) for id in range(n_urls))
+    update = graph_manager.pipeline_get_update()
+    assert n_rev_links == n_links and len(update.new_links) == n_links, 'reversed links mismatch'
+    assert len(update.new_html_ids) == len(set(update.new_html_ids)) == len(expected), 'html pages mismatch'
+
+if __name__ == '__main__':
+    # Usage: graph_manager_benchmark.py [n_pages] [fanout]
+    n_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    fanout = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    # Stress: frequent thread switches make check-then-insert races likely.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    for compact in [False, True]:
+        for round in range(5):
+            pages = generate_pages(2000, 5000, fanout, seed=round)
+            graph_manager = GraphManager(compact=compact)
+            add_pages(graph_manager, pages, 32)
+            check_graph(graph_manager, pages)
+    sys.setswitchinterval(switch_interval)
+    print('stress test passed: 5 rounds, 32 threads, list and compact mode')
+
+    pages = generate_pages(n_pages, n_pages * 2, fanout)
+    for n_threads in [1, 2, 4, 8, 16, 32]:
+        graph_manager = GraphManager()
+        elapsed = add_pages(graph_manager, pages, n_threads)
+        check_graph(graph_manager, pages)
+        print(f'{n_threads:2} threads: {elapsed:.2f} s, {n_pages / elapsed:.0f} pages/s, '
+              f'{n_pages * fanout / elapsed:.0f} links/s')
@@ -0,0 +1,27 @@
+import sys
+import os
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_time(module: str):
+    '''**return** (total microseconds, `[(cumulative microseconds, module)]`) of importing `module` in a fresh interpreter.'''
+    code = f'import sys, {module}; assert "cupy" not in sys.modules, "cupy imported eagerly"'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = []
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line and 'cumulative' not in line:
+            _, cumulative, name = line.split('|')
+            times.append((int(cumulative), name.strip()))
+    total = next(cumulative for cumulative, name in reversed(times) if name == module)
+    return total, times
+
+if __name__ == '__main__':
+    # Usage: import_time_benchmark.py [module] [repeat]
+    module = sys.argv[1] if len(sys.argv) > 1 else 'analyzer'
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    total, times = min((import_time(module) for _ in range(repeat)), key=lambda result: result[0])
+    print(f'import {module}: {total / 1000:.1f} ms (best of {repeat})')
+    for cumulative, name in sorted(times, reverse=True)[1:8]:
+        print(f'  {cumulative / 1000:6.1f} ms  {name}')
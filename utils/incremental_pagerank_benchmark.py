@@ -0,0 +1,72 @@
+import sys
+import os
+import time
+import random
+
+import numpy as np
+
+from graph_layout_benchmark import generate_pages
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import GraphManager
+from analyzer import AnalyzerConfig, IncrementalAnalyzer
+from analyzer.solvers import sparse_pagerank
+
+def generate_site_pages(n_html: int, fanout: int = 10, seed: int = 0):
+    '''Pages of a site tree in breadth-first (crawl) order: every page links to home, its parent,
+    its children and a few pages of the same section. Weights mix slowly, unlike uniform random links.'''
+    rng = random.Random(seed)
+    urls = [f'http://example.com/{hex(url_id)}' for url_id in range(n_html)]
+    pages = []
+    for page_id in range(n_html):
+        parent_id = (page_id - 1) // fanout
+        children = range(page_id * fanout + 1, min(page_id * fanout + fanout + 1, n_html))
+        siblings = rng.sample(range(max(0, page_id - 50), min(n_html, page_id + 50)), 3)
+        target_ids = {0, max(parent_id, 0), *children, *siblings} - {page_id}
+        pages.append((urls[page_id], [urls[target_id] for target_id in sorted(target_ids)]))
+    return pages
+
+if __name__ == '__main__':
+    # Usage: incremental_pagerank_benchmark.py site [n_html] [n_batches]
+    #        incremental_pagerank_benchmark.py random [n_html] [n_batches] [n_resources] [avg_degree]
+    # Set PROVISIONAL=1 to compute weights before the last batch to provisional convergence only.
+    kind = sys.argv[1] if len(sys.argv) > 1 else 'site'
+    n_html = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    n_batches = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    if kind == 'site':
+        pages = generate_site_pages(n_html)
+    else:
+        n_resources = int(sys.argv[4]) if len(sys.argv) > 4 else n_html * 2
+        pages = generate_pages(n_html, n_resources, int(sys.argv[5]) if len(sys.argv) > 5 else 20)
+    config = AnalyzerConfig()
+    provisional = os.environ.get('PROVISIONAL') == '1'
+
+    # Pages arrive in batches as if crawled, weights are refreshed after each batch.
+    graph_manager = GraphManager()
+    analyzer = IncrementalAnalyzer(graph_manager, config)
+    warm_time = cold_time = 0.0
+    cold_iterations = 0
+    print(f'{"batch":>5} {"urls":>7} {"links":>8} {"warm iters":>10} {"cold iters":>10}')
+    for batch in range(n_batches):
+        for source_url, target_urls in pages[batch * n_html // n_batches:(batch + 1) * n_html // n_batches]:
+            graph_manager._add_links(source_url, target_urls)
+
+        n_iterations = analyzer.n_iterations
+        start = time.perf_counter()
+        result = analyzer.update(provisional=provisional and batch < n_batches - 1)
+        warm_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        sources, targets = graph_manager.get_link_arrays()
+        weights, residuals = sparse_pagerank(np, sources, targets, graph_manager.get_url_count(),
+                                             config.damping, config.convergence)
+        iterations = len(residuals)
+        cold_time += time.perf_counter() - start
+        cold_iterations += iterations
+        print(f'{batch:5} {len(weights):7} {len(sources):8} {analyzer.n_iterations - n_iterations:10} {iterations:10}')
+
+    max_diff = np.abs(result.ranks - weights / weights.max()).max()
+    print(f'total iterations: warm {analyzer.n_iterations}, cold {cold_iterations} '
+          f'({1 - analyzer.n_iterations / cold_iterations:.0%} saved)')
+    print(f'total time: warm {warm_time:.3f} s, cold {cold_time:.3f} s')
+    print(f'max difference of final ranks: {max_diff:.1e}')
@@ -0,0 +1,74 @@
+import sys
+import os
+import re
+import time
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.link_extractor import extract_links, iter_links
+from crawler.url_utils import to_abs_url, remove_fragment
+
+def legacy_extract_links(url: str, page_html: str):
+    '''Link parser of `Crawler` before streaming extraction.'''
+    links = (
+        re.findall('href="((?:http:|https:|)[^":]+)"', page_html) +
+        re.findall("href='((?:http:|https:|)[^':]+)'", page_html)
+    )
+    links = [to_abs_url(url, link) for link in links]
+    links = [remove_fragment(link) for link in links if link]
+    return list(set(links))
+
+def generate_page(seed: int, n_blocks: int = 800) -> str:
+    '''Documentation-like page with code blocks and about 400 internal/external links.'''
+    rng = random.Random(seed)
+    parts = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>Doc</title>',
+             '<link rel="stylesheet" href="../_static/pygments.css" type="text/css" />',
+             '<script src="../_static/doctools.js"></script></head><body><div class="body" role="main">']
+    for i in range(n_blocks):
+        if rng.random() < 0.5:
+            target = rng.choice([
+                f'library/{rng.randint(0, 300)}.html',
+                f'../reference/{rng.randint(0, 50)}.html#sec-{i}',
+                f'https://www.python.org/dev/peps/pep-{rng.randint(1, 800):04d}/',
+                f'#id{i}',
+            ])
+            quote = rng.choice(['"', "'"])
+            parts.append(f'<p>Text {i} <a class="reference internal" href={quote}{target}{quote} title="t">'
+                         f'<code class="xref py py-func docutils literal notranslate"><span class="pre">func{i}()</span></code></a></p>\n')
+        else:
+            parts.append(f'<div class="highlight"><pre><span class="kn">import</span> <span class="nn">re{i}</span>\n'
+                         f'<span class="o">&gt;&gt;&gt;</span> <span class="n">m</span> <span class="o">=</span> <span class="n">re</span></pre></div>\n')
+    parts.append('</div></body></html>')
+    return ''.join(parts)
+
+def bench(name: str, parse, pages, repeat: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for url, page in pages:
+            parse(url, page)
+    per_page = (time.perf_counter() - start) / repeat / len(pages)
+    print(f'{name:28} {per_page * 1000:.3f} ms/page')
+    return per_page
+
+def parse_in_chunks(url: str, page: str):
+    body = page.encode()
+    return list(iter_links(url, (body[i:i + 65536] for i in range(0, len(body), 65536))))
+
+if __name__ == '__main__':
+    # Usage: link_extractor_benchmark.py [<page_url> <saved_html_file>]...
+    if len(sys.argv) > 1:
+        pages = []
+        for url, file_name in zip(sys.argv[1::2], sys.argv[2::2]):
+            with open(file_name, encoding='utf-8', errors='replace') as file:
+                pages.append((url, file.read()))
+    else:
+        pages = [('https://docs.python.org/zh-tw/3/library/re.html', generate_page(seed)) for seed in range(20)]
+
+    legacy_time = bench('legacy regex', legacy_extract_links, pages)
+    new_time = bench('extract_links', extract_links, pages)
+    stream_time = bench('iter_links (64 KiB chunks)', parse_in_chunks, pages)
+    print(f'speedup: {legacy_time / new_time:.2f}x (whole page), {legacy_time / stream_time:.2f}x (chunks)')
+
+    n_legacy = sum(len(legacy_extract_links(url, page)) for url, page in pages)
+    n_new = sum(len(extract_links(url, page)) for url, page in pages)
+    print(f'links found: legacy {n_legacy}, new {n_new}')
@@ -0,0 +1,57 @@
+import sys
+import os
+import time
+
+from graph_layout_benchmark import generate_pages
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import GraphManager
+from analyzer.pagerank import PageRank
+
+def build_graph(n_html: int, n_resources: int, avg_degree: int) -> GraphManager:
+    graph_manager = GraphManager()
+    for source_url, target_urls in generate_pages(n_html, n_resources, avg_degree):
+        graph_manager._add_links(source_url, target_urls)
+    return graph_manager
+
+def run(graph_manager: GraphManager, method_name: str, damping: float = 0.85, convergence: float = 1e-7):
+    '''**return** (seconds, weights in url id order).'''
+    pagerank = PageRank(graph_manager, damping, convergence)
+    start = time.perf_counter()
+    weights = getattr(pagerank, method_name)()
+    return time.perf_counter() - start, [float(weight) for weight in weights]
+
+def check_parity(graph_manager: GraphManager, method_name: str, tolerance: float = 1e-9) -> None:
+    '''Weights of `method_name` equal to `pagerank_py`, the reference implementation.'''
+    _, expected = run(graph_manager, 'pagerank_py')
+    _, weights = run(graph_manager, method_name)
+    max_diff = max(abs(a - b) for a, b in zip(expected, weights))
+    assert len(weights) == len(expected) and max_diff < tolerance, f'{method_name} differs by {max_diff}'
+    print(f'parity {method_name}: max difference {max_diff:.2e} to pagerank_py')
+
+if __name__ == '__main__':
+    # Usage: pagerank_benchmark.py [<graph_file> | <n_html> <n_resources> <avg_degree>] [method]...
+    args = sys.argv[1:]
+    if args and not args[0].isdigit():
+        graph_manager = GraphManager.load_from_file(args.pop(0))
+    elif len(args) >= 3:
+        graph_manager = build_graph(int(args.pop(0)), int(args.pop(0)), int(args.pop(0)))
+    else:
+        graph_manager = build_graph(100000, 200000, 20)
+    methods = args or ['pagerank_np', 'pagerank_sparse']
+
+    # Parity on small graphs, including pages without outgoing links and a frozen graph.
+    for n_html, n_resources, avg_degree in [(300, 1000, 5), (2000, 3000, 10)]:
+        small_graph = build_graph(n_html, n_resources, avg_degree)
+        check_parity(small_graph, 'pagerank_sparse')
+        small_graph.freeze()
+        check_parity(small_graph, 'pagerank_sparse')
+
+    statistic = graph_manager.get_statistic()
+    print(f'{statistic["n_resources"]} urls, {statistic["n_links"]} links')
+    times = {}
+    for method_name in methods:
+        times[method_name], _ = run(graph_manager, method_name)
+        print(f'{method_name:16} {times[method_name]:.3f} s')
+    if 'pagerank_np' in times and 'pagerank_sparse' in times:
+        print(f'speedup: {times["pagerank_np"] / times["pagerank_sparse"]:.1f}x')
@@ -0,0 +1,59 @@
+import sys
+import os
+import glob
+import time
+
+import numpy as np
+
+from fake_graph_generator import generate_fake_graph
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import GraphManager
+from analyzer.pagerank import PageRank
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'graph')
+
+def load_graphs(paths):
+    '''**return** `(name, graph_manager)` of graph files, Git LFS pointers that are not pulled are skipped.'''
+    for path in paths:
+        with open(path, 'rb') as file:
+            if file.read(len(b'version https://git-lfs')) == b'version https://git-lfs':
+                print(f'skip {path}: Git LFS pointer, run `git lfs pull` first')
+                continue
+        yield os.path.basename(path), GraphManager.load_from_file(path)
+
+def bench(graph_manager: GraphManager, n_workers_list, repeat: int = 3) -> None:
+    pagerank = PageRank(graph_manager, 0.85, 1e-7)
+    start = time.perf_counter()
+    expected = pagerank.pagerank_sparse()
+    serial_time = time.perf_counter() - start
+    print(f'  pagerank_sparse       {serial_time:.3f} s')
+
+    for n_workers in n_workers_list:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            weights = pagerank.pagerank_parallel(n_workers)
+            times.append(time.perf_counter() - start)
+        max_diff = np.abs(weights - expected).max()
+        assert max_diff < 1e-9, f'{n_workers} workers differ by {max_diff}'
+        print(f'  pagerank_parallel x{n_workers:<2} {min(times):.3f} s, {serial_time / min(times):.2f}x of serial, '
+              f'max difference {max_diff:.1e}')
+
+if __name__ == '__main__':
+    # Usage: parallel_pagerank_benchmark.py [graph_file]...
+    # Without arguments, bundled graphs in data/graph and a synthetic graph of fake_graph_generator.py are used.
+    n_workers_list = [1, 2, 4, 8]
+    print(f'{os.cpu_count()} CPUs')
+    graphs = list(load_graphs(sys.argv[1:] or sorted(glob.glob(os.path.join(DATA_DIR, '*.pkl')))))
+    if len(sys.argv) == 1:
+        graphs.append(('fake 100000 html / 300000 urls', generate_fake_graph(100000, 300000, 1000, 20, 'fake.graph')))
+        os.remove('fake.graph')
+
+    for name, graph_manager in graphs:
+        statistic = graph_manager.get_statistic()
+        print(f'{name}: {statistic["n_resources"]} urls, {statistic["n_links"]} links')
+        bench(graph_manager, n_workers_list)
+        graph_manager.freeze()
+        print(f'{name} frozen:')
+        bench(graph_manager, n_workers_list)
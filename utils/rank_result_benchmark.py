@@ -0,0 +1,41 @@
+import sys
+import os
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import GraphManager
+from analyzer import RankResult
+
+def best_time(function, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+if __name__ == '__main__':
+    # Usage: rank_result_benchmark.py [n_urls] [k]
+    n_urls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+
+    graph_manager = GraphManager()
+    graph_manager.intern_many([f'http://example.com/{hex(url_id)}' for url_id in range(n_urls)])
+    # Ranks of web graphs follow a power law.
+    weights = np.random.default_rng(0).pareto(1.5, n_urls)
+    result = RankResult.from_weights(graph_manager, weights)
+    url_and_weight = result.to_list()
+
+    expected = sorted(url_and_weight, key=lambda pair: pair[1], reverse=True)[:k]
+    assert [rank for _, rank in result.top_k(k)] == [rank for _, rank in expected]
+
+    sort_time = best_time(lambda: sorted(url_and_weight, key=lambda pair: pair[1], reverse=True)[:k])
+    top_k_time = best_time(lambda: list(result.top_k(k)))
+    print(f'top {k} of {n_urls} urls: sort list {sort_time:.3f} s, RankResult.top_k {top_k_time:.3f} s '
+          f'({sort_time / top_k_time:.0f}x)')
+
+    format_time = best_time(lambda: [f'<priority>{rank}</priority>' for _, rank in url_and_weight])
+    quantize_time = best_time(lambda: [f'<priority>{rank}</priority>' for _, rank in result.quantize_priorities(11)])
+    print(f'format priorities of {n_urls} urls: list {format_time:.3f} s, quantized {quantize_time:.3f} s')
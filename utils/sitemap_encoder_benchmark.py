@@ -0,0 +1,67 @@
+import sys
+import os
+import glob
+import time
+import pickle
+import xml.etree.ElementTree as ET
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generator import SiteMapWriter, UrlEntryEncoder
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'generator')
+REPEAT = 5
+BATCH_URLS = SiteMapWriter.batch_urls
+
+def load_inputs(n_urls: int):
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, '*.pkl'))):
+        with open(path, 'rb') as file:
+            yield os.path.basename(path), pickle.load(file)
+    pages = [(f'https://www.example.com/section{url_id % 100}/page{url_id}.html', 1 / (url_id + 1)) for url_id in range(n_urls)]
+    yield f'synthetic {n_urls} urls', pages
+    # One url in 100 has a query string to escape.
+    yield f'synthetic {n_urls} urls, 1% with &', [(f'{url}?a=1&b={url_id}' if url_id % 100 == 0 else url, priority)
+                                                  for url_id, (url, priority) in enumerate(pages)]
+
+def unescaped(pages) -> bytes:
+    '''Formatting before the encoder, an f-string per entry joined into chunks, urls are not escaped.'''
+    chunk = []
+    for url, priority in pages:
+        chunk.append(f"  <url>\n    <loc>{url}</loc>\n    <priority>{priority}</priority>\n  </url>\n")
+    return ''.join(chunk).encode('UTF-8')
+
+def encoded(pages, encoder: UrlEntryEncoder) -> bytes:
+    buffer = bytearray()
+    for start in range(0, len(pages), BATCH_URLS):
+        encoder.write(buffer, pages[start:start + BATCH_URLS])
+    return bytes(buffer)
+
+def best_time(function) -> float:
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def parse(entries: bytes) -> list:
+    root = ET.fromstring(SiteMapWriter.header().encode('UTF-8') + entries + SiteMapWriter.footer.encode('UTF-8'))
+    return [loc.text for loc in root.iter(f'{{{SiteMapWriter.xmlns}}}loc')]
+
+if __name__ == '__main__':
+    # Usage: sitemap_encoder_benchmark.py [n_urls of synthetic pages]
+    n_urls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    methods = [('unescaped f-string', unescaped)]
+    for precision in [None, 1, 4]:
+        encoder = UrlEntryEncoder(precision=precision)
+        methods.append((f'encoder, precision {precision}', lambda pages, encoder=encoder: encoded(pages, encoder)))
+
+    for input_name, pages in load_inputs(n_urls):
+        has_special = any(character in url for url, _ in pages for character in '&<>"\'')
+        entries = encoded(pages, UrlEntryEncoder(precision=None))
+        assert parse(entries) == [url for url, _ in pages], 'escaped urls do not parse back'
+        if not has_special:
+            assert entries == unescaped(pages), 'encoder output differs without special characters'
+        print(f'{input_name}:')
+        for name, method in methods:
+            elapsed = best_time(lambda: method(pages))
+            print(f'  {name:22} {elapsed:.4f} s, {elapsed / len(pages) * 1e9:6.0f} ns/url')
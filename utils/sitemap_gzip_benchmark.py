@@ -0,0 +1,64 @@
+import sys
+import os
+import glob
+import gzip
+import time
+import shutil
+import pickle
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generator import SiteMap, SiteMapWriter
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'generator')
+LEVELS = [1, 6, 9]
+
+def load_inputs(n_urls: int):
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, '*.pkl'))):
+        with open(path, 'rb') as file:
+            yield os.path.basename(path), pickle.load(file)
+    yield f'synthetic {n_urls} urls', [(f'https://www.example.com/section{url_id % 100}/page{url_id}.html', 1 / (url_id + 1))
+                                      for url_id in range(n_urls)]
+
+def save_then_gzip(pages, level: int, output_dir: str) -> str:
+    '''Current practice, `SiteMap.main` then a separate gzip pass over the file.'''
+    plain = os.path.join(output_dir, 'plain.xml')
+    SiteMap(precision=None).main(pages, filename=plain)
+    compressed = plain + '.gz'
+    with open(plain, 'rb') as source, gzip.open(compressed, 'wb', compresslevel=level) as target:
+        shutil.copyfileobj(source, target, 1 << 20)
+    return compressed
+
+def streaming(pages, level: int, output_dir: str, n_workers: int) -> str:
+    compressed = os.path.join(output_dir, f'streaming_{n_workers}.xml.gz')
+    SiteMapWriter(compressed, compresslevel=level, n_workers=n_workers, precision=None).main(pages)
+    return compressed
+
+if __name__ == '__main__':
+    # Usage: sitemap_gzip_benchmark.py [n_urls of synthetic pages] [n_workers]
+    n_urls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    n_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    methods = [('SiteMap + gzip', save_then_gzip),
+               ('SiteMapWriter, 1 process', lambda pages, level, output_dir: streaming(pages, level, output_dir, 1)),
+               (f'SiteMapWriter, {n_workers} processes', lambda pages, level, output_dir: streaming(pages, level, output_dir, n_workers))]
+
+    output_dir = tempfile.mkdtemp()
+    try:
+        for input_name, pages in load_inputs(n_urls):
+            expected = os.path.join(output_dir, 'expected.xml')
+            SiteMap(precision=None).main(pages, filename=expected)
+            with open(expected, 'rb') as file:
+                expected = file.read()
+            print(f'{input_name}: {len(expected) / 2 ** 20:.1f} MiB xml')
+            for level in LEVELS:
+                for name, method in methods:
+                    start = time.perf_counter()
+                    compressed = method(pages, level, output_dir)
+                    elapsed = time.perf_counter() - start
+                    with gzip.open(compressed, 'rb') as file:
+                        assert file.read() == expected, f'{name} output differs'
+                    size = os.path.getsize(compressed)
+                    print(f'  level {level} {name:26} {elapsed:.3f} s, {len(expected) / 2 ** 20 / elapsed:6.1f} MiB/s, '
+                          f'ratio {len(expected) / size:.1f}')
+    finally:
+        shutil.rmtree(output_dir)
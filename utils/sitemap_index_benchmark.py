@@ -0,0 +1,53 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generator import SiteMapIndex, SiteMapWriter
+
+def synthetic_pages(n_urls: int):
+    return [(f'https://www.example.com/section{url_id % 100}/page{url_id}.html', 1 / (url_id + 1))
+            for url_id in range(n_urls)]
+
+def check(pages, output_dir: str, shards) -> None:
+    '''Urls of all shards in order are the same as the single sitemap, and each shard is within limits.'''
+    single = os.path.join(output_dir, 'single.xml')
+    SiteMapWriter(single).main(pages)
+    with open(single, encoding='UTF-8') as file:
+        expected = file.read()
+    header, footer = SiteMapWriter.header(), SiteMapWriter.footer
+    body = []
+    for shard in shards:
+        assert os.path.getsize(shard) <= SiteMapIndex.MAX_BYTES
+        with open(shard, encoding='UTF-8') as file:
+            content = file.read()
+        assert content.startswith(header) and content.endswith(footer)
+        assert content.count('<url>') <= SiteMapIndex.MAX_URLS
+        body.append(content[len(header):-len(footer)])
+    assert header + ''.join(body) + footer == expected, 'shards differ from single sitemap'
+
+if __name__ == '__main__':
+    # Usage: sitemap_index_benchmark.py [n_urls] [max n_workers]
+    n_urls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    pages = synthetic_pages(n_urls)
+
+    output_dir = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        SiteMapWriter(os.path.join(output_dir, 'single.xml')).main(pages)
+        print(f'SiteMapWriter, single file: {time.perf_counter() - start:.3f} s')
+        for n_workers in range(1, max_workers + 1):
+            start = time.perf_counter()
+            shards = SiteMapIndex('https://www.example.com', output_dir, n_workers=n_workers).main(pages)
+            print(f'SiteMapIndex, {n_workers} workers: {time.perf_counter() - start:.3f} s, {len(shards)} shards')
+        check(pages, output_dir, shards)
+
+        # Shards split by bytes before reaching `max_urls`.
+        shards = SiteMapIndex('https://www.example.com', output_dir, max_bytes=1 << 20).main(pages[:100000])
+        check(pages[:100000], output_dir, shards)
+        print(f'max_bytes=1 MiB, 100000 urls: {len(shards)} shards, e.g. {[os.path.basename(shard) for shard in shards[:3]]}')
+    finally:
+        shutil.rmtree(output_dir)
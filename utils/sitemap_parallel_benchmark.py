@@ -0,0 +1,58 @@
+import sys
+import os
+import glob
+import time
+import pickle
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analyzer import RankResult
+from crawler import GraphManager
+from generator import SiteMap, SiteMapParallel
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'generator')
+REPEAT = 5
+
+def load_inputs(n_urls: int):
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, '*.pkl'))):
+        with open(path, 'rb') as file:
+            yield os.path.basename(path), pickle.load(file)
+    yield f'synthetic {n_urls} urls', [(f'https://www.example.com/section{url_id % 100}/page{url_id}.html', 1 / (url_id + 1))
+                                      for url_id in range(n_urls)]
+    # As returned by `Analyzer.main`, urls are looked up from the graph while iterating.
+    graph_manager = GraphManager()
+    graph_manager.intern_many([f'https://www.example.com/section{url_id % 100}/page{url_id}.html' for url_id in range(n_urls)])
+    yield f'RankResult of {n_urls} urls', RankResult.from_weights(graph_manager, 1 / np.arange(1, n_urls + 1))
+
+def best_time(function) -> float:
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+if __name__ == '__main__':
+    # Usage: sitemap_parallel_benchmark.py [n_urls of synthetic pages] [max process_num]
+    n_urls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    max_processes = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    for input_name, pages in load_inputs(n_urls):
+        serial_time = best_time(lambda: SiteMap().main(pages))
+        with open('sitemap_new.xml', 'rb') as file:
+            expected = file.read()
+        print(f'{input_name}: serial {serial_time:.4f} s')
+        for process_num in range(1, max_processes + 1):
+            with SiteMapParallel() as sitemap:
+                parallel_time = best_time(lambda: sitemap.main(pages, process_num))
+                # CPU time of the parent process only, the serial part that limits scaling.
+                start = time.process_time()
+                sitemap.main(pages, process_num)
+                parent_time = time.process_time() - start
+            with open('sitemap_new_threads.xml', 'rb') as file:
+                same = file.read() == expected
+            print(f'  {process_num} processes: {parallel_time:.4f} s, speedup {serial_time / parallel_time:.2f}, parent CPU {parent_time:.4f} s'
+                  f'{"" if same else ", output differs from SiteMap"}')
+    os.remove('sitemap_new.xml')
+    os.remove('sitemap_new_threads.xml')
@@ -0,0 +1,74 @@
+import sys
+import os
+import glob
+import time
+import pickle
+import multiprocessing as mp
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generator import SiteMap, SiteMapWriter
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'generator')
+
+def read_status(field: str) -> int:
+    '''**return** Field of /proc/self/status in bytes, e.g. `VmRSS` or `VmHWM` (peak RSS).'''
+    with open('/proc/self/status') as file:
+        for line in file:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024
+    raise KeyError(field)
+
+def run(name: str, load, connection) -> None:
+    '''Run in a child process: load pages, reset peak RSS, then write sitemap.'''
+    pages = load()
+    with open('/proc/self/clear_refs', 'w') as file:
+        file.write('5')  # Reset VmHWM to current RSS.
+    baseline = read_status('VmRSS')
+    start = time.perf_counter()
+    if name == 'SiteMap':
+        SiteMap(precision=None).main(pages)
+    else:
+        SiteMapWriter('sitemap_new.xml', precision=None).main(pages)
+    elapsed = time.perf_counter() - start
+    connection.send((elapsed, read_status('VmHWM') - baseline))
+
+def measure(name: str, load):
+    '''**return** (seconds, peak RSS above loaded input in bytes, output bytes).'''
+    receiver, sender = mp.Pipe(duplex=False)
+    process = mp.Process(target=run, args=(name, load, sender))
+    process.start()
+    elapsed, peak = receiver.recv()
+    process.join()
+    with open('sitemap_new.xml', 'rb') as file:
+        output = file.read()
+    os.remove('sitemap_new.xml')
+    return elapsed, peak, output
+
+class PickleLoader:
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self):
+        with open(self.path, 'rb') as file:
+            return pickle.load(file)
+
+class SyntheticLoader:
+    def __init__(self, n_urls: int):
+        self.n_urls = n_urls
+
+    def __call__(self):
+        return [(f'https://www.example.com/section{url_id % 100}/page{url_id}.html', 1 / (url_id + 1))
+                for url_id in range(self.n_urls)]
+
+if __name__ == '__main__':
+    # Usage: sitemap_writer_benchmark.py [n_urls of synthetic pages]
+    n_urls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    inputs = [(os.path.basename(path), PickleLoader(path)) for path in sorted(glob.glob(os.path.join(DATA_DIR, '*.pkl')))]
+    inputs.append((f'synthetic {n_urls} urls', SyntheticLoader(n_urls)))
+
+    for input_name, load in inputs:
+        results = {name: measure(name, load) for name in ['SiteMap', 'SiteMapWriter']}
+        assert results['SiteMap'][2] == results['SiteMapWriter'][2], 'outputs differ'
+        print(f'{input_name}: {len(results["SiteMap"][2]) / 2 ** 20:.1f} MiB output')
+        for name, (elapsed, peak, _) in results.items():
+            print(f'  {name:14} {elapsed:.3f} s, peak RSS +{peak / 2 ** 20:.1f} MiB')
@@ -0,0 +1,47 @@
+import sys
+import os
+import glob
+import time
+
+import numpy as np
+
+from graph_layout_benchmark import generate_pages
+from incremental_pagerank_benchmark import generate_site_pages
+from parallel_pagerank_benchmark import DATA_DIR, load_graphs
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import GraphManager
+from analyzer import PageRankSolver
+from analyzer.solvers import sparse_pagerank
+
+def build_graph(pages) -> GraphManager:
+    graph_manager = GraphManager()
+    for source_url, target_urls in pages:
+        graph_manager._add_links(source_url, target_urls)
+    return graph_manager
+
+def bench(graph_manager: GraphManager, damping: float = 0.85, convergence: float = 1e-7, repeat: int = 3) -> None:
+    sources, targets = graph_manager.get_link_arrays()
+    numNodes = graph_manager.get_url_count()
+    exact, _ = sparse_pagerank(np, sources, targets, numNodes, damping, 1e-14)
+    for solver in PageRankSolver:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            weights, residuals = sparse_pagerank(np, sources, targets, numNodes, damping, convergence, solver=solver)
+            times.append(time.perf_counter() - start)
+        print(f'  {solver.value:14} {len(residuals):4} iterations, {min(times):.3f} s, '
+              f'L1 error {np.abs(weights - exact).sum():.1e}')
+
+if __name__ == '__main__':
+    # Usage: solver_benchmark.py [graph_file]...
+    # Without arguments, bundled graphs in data/graph and synthetic graphs are used.
+    graphs = list(load_graphs(sys.argv[1:] or sorted(glob.glob(os.path.join(DATA_DIR, '*.pkl')))))
+    if len(sys.argv) == 1:
+        graphs.append(('site tree 100000 pages', build_graph(generate_site_pages(100000))))
+        graphs.append(('random 20000 pages / 40000 urls', build_graph(generate_pages(20000, 40000, 20))))
+
+    for name, graph_manager in graphs:
+        statistic = graph_manager.get_statistic()
+        print(f'{name}: {statistic["n_resources"]} urls, {statistic["n_links"]} links')
+        bench(graph_manager)
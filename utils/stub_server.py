@@ -0,0 +1,125 @@
+import sys
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class StubSite:
+    '''Synthetic website served on localhost, for crawler testing and benchmarking. \n
+    Page `/page/<i>` links to `fanout` random pages and one image `/img/<i>.png`.
+    If `url_variants`, page links are written in equivalent forms, e.g. `/page/<i>/` or `/page/<i>?utm_source=nav`.'''
+
+    def __init__(self, n_pages: int, fanout: int, latency: float = 0.0, port: int = 0, seed: int = 0,
+                 url_variants: bool = False):
+        rng = random.Random(seed)
+        self.n_pages = n_pages
+        self.latency = latency
+        self.last_response_time = 0.0
+        '''`time.time()` when the latest response was sent.'''
+        self.n_requests = 0
+        self.n_body_bytes = 0
+        self.changed_pages = set()
+        '''Page ids whose validators changed, i.e. modified since served last time.'''
+        self.pages = [
+            self.__render_page(i, rng.sample(range(n_pages), k=min(fanout, n_pages)), rng if url_variants else None)
+            for i in range(n_pages)
+        ]
+
+        site = self
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self): site._handle(self, with_body=True)
+            def do_HEAD(self): site._handle(self, with_body=False)
+            def log_message(self, *args): pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.__thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    @property
+    def domain(self) -> str:
+        return f'127.0.0.1:{self.server.server_address[1]}'
+
+    def start(self) -> 'StubSite':
+        self.__thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handle(self, request: BaseHTTPRequestHandler, with_body: bool) -> None:
+        time.sleep(self.latency)
+
+        # Query, `;` parameters and trailing slash do not change the page.
+        path = request.path.split('?')[0].split(';')[0].rstrip('/')
+        self.n_requests += 1
+        etag = None
+        if path.startswith('/page/') and path[6:].isdigit() and int(path[6:]) < self.n_pages:
+            content_type = 'text/html; charset=utf-8'
+            body = self.pages[int(path[6:])]
+            etag = f'"{path[6:]}-{int(int(path[6:]) in self.changed_pages)}"'
+        elif path.startswith('/img/'):
+            content_type = 'image/png'
+            body = b'\x89PNG\r\n\x1a\n'
+        else:
+            request.send_response(404)
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            self.last_response_time = time.time()
+            return
+
+        if etag and request.headers.get('If-None-Match') == etag:
+            request.send_response(304)
+            request.send_header('ETag', etag)
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            self.last_response_time = time.time()
+            return
+
+        request.send_response(200)
+        request.send_header('Content-Type', content_type)
+        request.send_header('Content-Length', str(len(body)))
+        if etag:
+            request.send_header('ETag', etag)
+            request.send_header('Last-Modified', 'Mon, 02 Dec 2024 08:00:00 GMT')
+        request.end_headers()
+        if with_body:
+            request.wfile.write(body)
+            self.n_body_bytes += len(body)
+        self.last_response_time = time.time()
+
+    __URL_VARIANTS = ['/page/{}', '/page/{}/', '/page/{}?utm_source=nav', '/page/{};jsessionid=A1B2',
+                      '/page/{}?b=2&a=1', '/page/{}?a=1&b=2']
+
+    @staticmethod
+    def __render_page(page_id: int, targets, rng: random.Random = None) -> bytes:
+        links = ''.join(
+            f'<li><a href="{rng.choice(StubSite.__URL_VARIANTS).format(target) if rng else f"/page/{target}"}">'
+            f'Page {target}</a></li>'
+            for target in targets
+        )
+        return (
+            f'<html><head><title>Page {page_id}</title></head><body>'
+            f'<img src="/img/{page_id}.png"><a href=\'/img/{page_id}.png\'>image</a>'
+            f'<ul>{links}</ul></body></html>'
+        ).encode()
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print('Usage: stub_server.py <n_pages> <fanout> [latency] [port]')
+        exit(1)
+
+    site = StubSite(
+        int(sys.argv[1]),
+        int(sys.argv[2]),
+        float(sys.argv[3]) if len(sys.argv) > 3 else 0.0,
+        int(sys.argv[4]) if len(sys.argv) > 4 else 8000,
+    )
+    print(f'Serving {site.base_url}/page/0')
+    site.server.serve_forever()
@@ -0,0 +1,61 @@
+import sys
+import os
+import time
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import CrawlerConfig
+from crawler.url_filter import UrlFilter
+from crawler.url_utils import check_url_allowed
+
+# Filter settings of `crawler_test_config.py`, plus patterns of other shapes.
+CONFIGS = {
+    '校網(資訊公開專區)': CrawlerConfig(index_urls=[], allow_domains=['*info.nycu.edu.tw']),
+    '系網(不含公告區)': CrawlerConfig(index_urls=[], allow_domains=['www.cs.nycu.edu.tw'],
+                               exclude_urls=['www.cs.nycu.edu.tw/announcements*', '*locale=*']),
+    'Python 3.13 文件': CrawlerConfig(index_urls=[], allow_domains=['docs.python.org'],
+                                    include_urls=['docs.python.org/zh-tw/3/*']),
+    '系網(公告區)': CrawlerConfig(index_urls=[], allow_domains=['www.cs.nycu.edu.tw'],
+                             include_urls=['www.cs.nycu.edu.tw/announcements*'], exclude_urls=['*locale=*']),
+    'mixed': CrawlerConfig(index_urls=[], allow_domains=['*.nycu.edu.tw', 'docs.python.org', 'a*.example.com:8080'],
+                           include_urls=['*/zh-tw/*', 'www.cs.nycu.edu.tw/*', '*.nycu.edu.tw/news?id=*'],
+                           exclude_urls=['*.pdf?', '*?page=1+*', '*/print/*']),
+    '全部(排除空字串)': CrawlerConfig(index_urls=[], allow_domains=['*'], include_urls=['*'], exclude_urls=['']),
+    '空字串': CrawlerConfig(index_urls=[], allow_domains=[''], include_urls=['']),
+}
+
+HOSTS = ['info.nycu.edu.tw', 'ir.info.nycu.edu.tw', 'www.cs.nycu.edu.tw', 'docs.python.org', 'www.python.org',
+         'a1.example.com:8080', 'example.com', 'www.nycu.edu.tw', '']
+PATHS = ['/', '/announcements', '/announcements/{n}', '/zh-tw/3/library/{n}.html', '/zh-tw/3/', '/en/3/{n}.html',
+         '/news', '/print/{n}', '/files/{n}.pdf', '/members/prof;jsessionid={n}', '/search']
+QUERIES = ['', '', '', 'locale=en', 'id={n}', 'page=1+2', 'page={n}&locale=zh-TW', 'q=a?b']
+
+def generate_urls(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    urls = []
+    for i in range(n):
+        url = f'{rng.choice(["http", "https"])}://{rng.choice(HOSTS)}{rng.choice(PATHS)}'.format(n=i % 997)
+        query = rng.choice(QUERIES).format(n=i % 991)
+        if query: url += '?' + query
+        if rng.random() < 0.1: url += '#top'
+        urls.append(url)
+    return urls
+
+if __name__ == '__main__':
+    n_urls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    urls = generate_urls(n_urls)
+
+    for name, config in CONFIGS.items():
+        start = time.perf_counter()
+        legacy = [check_url_allowed(url, config.allow_domains, config.include_urls, config.exclude_urls)
+                  for url in urls]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        url_filter = UrlFilter.from_config(config)
+        compiled = [url_filter(url) for url in urls]
+        compiled_time = time.perf_counter() - start
+
+        n_diff = sum(a != b for a, b in zip(legacy, compiled))
+        print(f'{name}: check_url_allowed {legacy_time:.2f} s, UrlFilter {compiled_time:.2f} s, '
+              f'speedup {legacy_time / compiled_time:.1f}x, {sum(compiled)} allowed, {n_diff} verdicts differ')